@@ -13,9 +13,10 @@ celery = Celery(
 )
 celery.conf.timezone = settings.celery_timezone
 CELERY_BEAT_SCHEDULE = {
-    'some-task': {
-        'task': 'app.tasks.some_task',
-        'schedule': crontab(minute=0, hour='*/1'),  # ✔️ Используем crontab объект
+    'recompute-stale-body-metrics': {
+        'task': 'app.tasks.recompute_stale_body_metrics',
+        'schedule': crontab(minute=0, hour=3),  # ✔️ Используем crontab объект
         'args': (),
     }
-}
\ No newline at end of file
+}
+celery.conf.beat_schedule = CELERY_BEAT_SCHEDULE
\ No newline at end of file
@@ -1,13 +1,40 @@
-from pydantic_settings import BaseSettings
+from typing import List, Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import RedisDsn, PostgresDsn, Field
 
 
-class Settings(BaseSettings):
+class PoolSettings(BaseSettings):
+    """Подключения к БД (пул, реплики); читается отдельно от Settings, чтобы session.py
+    не требовал SMTP/Celery-переменных (CLI, бенчмарки)."""
+    db_pool_size: int = Field(5, alias='DB_POOL_SIZE')
+    db_max_overflow: int = Field(10, alias='DB_MAX_OVERFLOW')
+    db_pool_timeout: float = Field(30.0, alias='DB_POOL_TIMEOUT')  # секунд ожидания свободного соединения
+    db_pool_recycle: int = Field(1800, alias='DB_POOL_RECYCLE')  # -1 — не пересоздавать
+    # pre_ping — SELECT 1 на каждом checkout; idle — только если соединение
+    # простаивало дольше DB_POOL_IDLE_CHECK секунд; none — без проверки
+    db_pool_liveness: Literal['pre_ping', 'idle', 'none'] = Field('pre_ping', alias='DB_POOL_LIVENESS')
+    db_pool_idle_check: float = Field(30.0, alias='DB_POOL_IDLE_CHECK')
+    # реплики для @read_only-методов репозиториев, через запятую; пусто — всё на primary
+    database_replica_urls: str = Field('', alias='DATABASE_REPLICA_URLS')
+    # сколько секунд после записи чтения клиента идут на primary (read-your-writes)
+    db_replica_sticky_seconds: float = Field(5.0, alias='DB_REPLICA_STICKY_SECONDS')
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [u.strip() for u in self.database_replica_urls.split(",") if u.strip()]
+
+
+class Settings(PoolSettings):
     database_url: PostgresDsn
     redis_broker_url: RedisDsn = Field(..., alias='CELERY_BROKER_URL')
     redis_result_backend: RedisDsn = Field(..., alias='CELERY_RESULT_BACKEND')
 
     debug: bool = Field(False, alias='DEBUG')
+    # асинхронные (asyncpg) read-эндпоинты вместо синхронных
+    db_async: bool = Field(False, alias='DB_ASYNC')
     secret_key: str = Field(..., alias='SECRET_KEY')
     access_token_expire_minutes: int = Field(30, alias='ACCESS_TOKEN_EXPIRE_MINUTES')
 
@@ -24,4 +51,8 @@ class Settings(BaseSettings):
         extra = "forbid"  # запрещаем лишние переменные, чтобы ловить ошибки
 
 def get_settings() -> Settings:
-    return Settings()
\ No newline at end of file
+    return Settings()
+
+
+def get_pool_settings() -> PoolSettings:
+    return PoolSettings()
\ No newline at end of file
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.domain.models.imports import ImportRowError
 
 
 class AnthropometryCreate(BaseModel):
@@ -26,3 +28,23 @@ class AnthropometryRead(AnthropometryCreate):
         json_encoders = {
             UUID: lambda v: str(v)
         }
+
+
+class LatestMetricsRead(AnthropometryRead):
+    bmi: Optional[float] = None
+    bsa: Optional[float] = None
+    ideal_weight: Optional[float] = None
+    bmr: Optional[float] = None
+    method_bmr: Optional[str] = None
+    method_bsa: Optional[str] = None
+
+
+class AnthropometryIngestRecord(AnthropometryCreate):
+    patient_id: int
+
+
+class AnthropometryIngestReport(BaseModel):
+    inserted: int = Field(..., example=4980)
+    failed: int = Field(..., example=20)
+    without_metrics: int = Field(0, description="Записи пациентов без пола/даты рождения — метрики не посчитаны")
+    errors: List[ImportRowError] = Field(default_factory=list)
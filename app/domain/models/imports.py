@@ -0,0 +1,16 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class InvalidEncoding(ValueError):
+    """Вход импорта — не UTF-8; импорт прерывается целиком."""
+
+
+class DoctorNotFound(ValueError):
+    """doctor_id импорта не указывает на доктора."""
+
+
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="Номер записи во входных данных, с 1", example=17)
+    errors: List[str] = Field(..., example=["birth_date: Input should be a valid date"])
@@ -0,0 +1,21 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """Курсор не декодируется или не соответствует ключу сортировки."""
+
+
+class PageParams(BaseModel):
+    limit: int = Field(50, ge=1, le=500, description="Размер страницы")
+    after: Optional[str] = Field(None, description="Курсор из next_cursor предыдущей страницы")
+    with_total: bool = Field(False, description="Посчитать общее число записей (дополнительный COUNT)")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T] = Field(..., description="Записи текущей страницы")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы; null — это последняя")
+    total: Optional[int] = Field(None, description="Общее число записей, если запрошено with_total")
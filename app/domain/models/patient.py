@@ -1,7 +1,10 @@
 from datetime import date
 from enum import Enum
+from typing import List
 from pydantic import BaseModel, Field
 
+from app.domain.models.imports import ImportRowError
+
 
 class SexEnum(str, Enum):
     male = "male"
@@ -27,3 +30,12 @@ class PatientCreate(BaseModel):
 
 class PatientRead(PatientCreate):
     id: int = Field(..., example=123456)
+
+
+class PatientImportReport(BaseModel):
+    imported: int = Field(..., example=99980)
+    failed: int = Field(..., example=20)
+    linked: int = Field(0, description="Сколько пациентов привязано к доктору")
+    errors: List[ImportRowError] = Field(
+        default_factory=list, description="Ошибки по строкам (не больше MAX_REPORTED_ERRORS)"
+    )
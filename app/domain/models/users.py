@@ -23,5 +23,33 @@ class NotificationRead(BaseModel):
     read: bool = Field(..., example=False)
 
 
+class NotificationsMarkRead(BaseModel):
+    ids: Optional[List[int]] = Field(None, description="Какие уведомления отметить; без ids — все непрочитанные")
+
+
+class UnreadCount(BaseModel):
+    unread: int = Field(..., example=3)
+
+
+class NotificationsMarked(UnreadCount):
+    marked: int = Field(..., example=2)
+
+
+class NotificationRecipients(BaseModel):
+    """Условия выборки получателей; заданные условия объединяются через И."""
+    role: Optional[str] = Field(None, example="doctor")
+    user_ids: Optional[List[UUID]] = None
+    patient_id: Optional[int] = Field(None, description="Врачи с активной связью с пациентом")
+
+
+class NotificationBroadcast(BaseModel):
+    message: str = Field(..., example="Плановые работы в субботу с 22:00")
+    recipients: NotificationRecipients
+
+
+class BroadcastResult(BaseModel):
+    sent: int = Field(..., example=120)
+
+
 class NotificationList(RootModel[List[NotificationRead]]):
     pass
@@ -1,13 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List
 from uuid import UUID
 
+from app.domain.models.pagination import Page, PageParams
+from app.domain.models.users import NotificationRecipients
 from app.infrastructure.db.models import ProfileChangeRequests
 
 
 class IAdminRepository(ABC):
     @abstractmethod
-    def list_requests(self) -> List[ProfileChangeRequests]: ...
+    def list_requests(self, page: PageParams) -> Page: ...
 
     @abstractmethod
     def update_request_status(
@@ -16,3 +17,6 @@ class IAdminRepository(ABC):
 
     @abstractmethod
     def create_notification(self, user_id: UUID, message: str) -> int: ...
+
+    @abstractmethod
+    def broadcast_notification(self, recipients: NotificationRecipients, message: str) -> int: ...
@@ -1,6 +1,6 @@
 import uuid
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class IBodyMetricsRepository(ABC):
@@ -19,3 +19,21 @@ class IBodyMetricsRepository(ABC):
         """Возвращает последнюю запись с объединёнными данными
         (anthropometries ⊕ body_metrics) или None."""
         ...
+
+    @abstractmethod
+    def get_latest_metrics_many(
+            self, patient_ids: List[int]
+    ) -> List[Dict[str, Any]]:
+        """То же для списка пациентов одним запросом; пациенты без
+        антропометрии в результат не попадают."""
+        ...
+
+
+class IAsyncBodyMetricsRepository(ABC):
+    """Асинхронные чтения метрик (DB_ASYNC)."""
+
+    @abstractmethod
+    async def get_latest_metrics(self, patient_id: int) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def get_latest_metrics_many(self, patient_ids: List[int]) -> List[Dict[str, Any]]: ...
@@ -1,5 +1,7 @@
+import datetime
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, Tuple
+from ..models.pagination import Page, PageParams
 from ..models.patient import PatientCreate, PatientRead
 
 class AbstractPatientRepository(ABC):
@@ -12,5 +14,26 @@ class AbstractPatientRepository(ABC):
         ...
 
     @abstractmethod
-    def list_all(self) -> List[PatientRead]:
-        ...
\ No newline at end of file
+    def get_versioned(self, patient_id: int) -> Optional[Tuple[PatientRead, Optional[datetime.datetime]]]:
+        """Пациент и его updated_at (для ETag) одним запросом; None — пациента нет."""
+        ...
+
+    @abstractmethod
+    def list_all(self, page: PageParams) -> Page[PatientRead]:
+        ...
+
+
+class AbstractAsyncPatientRepository(ABC):
+    """Асинхронные чтения пациентов (DB_ASYNC)."""
+
+    @abstractmethod
+    async def get_by_id(self, patient_id: int) -> Optional[PatientRead]:
+        ...
+
+    @abstractmethod
+    async def get_versioned(self, patient_id: int) -> Optional[Tuple[PatientRead, Optional[datetime.datetime]]]:
+        ...
+
+    @abstractmethod
+    async def list_all(self, page: PageParams) -> Page[PatientRead]:
+        ...
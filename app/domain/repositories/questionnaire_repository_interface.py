@@ -1,7 +1,9 @@
+import datetime
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uuid
 
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.questionnaire import (
     QuestionnaireCreate, QuestionnaireUpdate, QuestionnaireRead,
     QuestionCreate, QuestionUpdate, QuestionRead
@@ -11,10 +13,12 @@ from app.domain.models.questionnaire import (
 class IQuestionnaireRepository(ABC):
     # ——— Шаблоны опросников ———
     @abstractmethod
-    def list_questionnaires(self) -> List[Dict[str, Any]]: ...
+    def list_questionnaires(self, page: PageParams) -> Page[Dict[str, Any]]: ...
     @abstractmethod
     def get_questionnaire(self, questionnaire_id: int) -> Dict[str, Any]: ...
     @abstractmethod
+    def get_questionnaire_version(self, questionnaire_id: int) -> Optional[datetime.datetime]: ...
+    @abstractmethod
     def create_questionnaire(self, data: QuestionnaireCreate) -> int: ...
     @abstractmethod
     def update_questionnaire(self, questionnaire_id: int, data: QuestionnaireUpdate) -> None: ...
@@ -37,6 +41,22 @@ class IQuestionnaireRepository(ABC):
     @abstractmethod
     def create_submission(self, patient_id: int, questionnaire_type: str, responses: Dict[str, Any]) -> uuid.UUID: ...
     @abstractmethod
-    def get_submissions_by_patient(self, patient_id: int) -> List[Dict[str, Any]]: ...
+    def get_submissions_by_patient(self, patient_id: int, page: PageParams) -> Page[Dict[str, Any]]: ...
     @abstractmethod
     def add_answer(self, submission_id: uuid.UUID, question_id: int, answer_data: Dict[str, Any]) -> int: ...
+    @abstractmethod
+    def add_answers(self, submission_id: uuid.UUID, answers: List[Dict[str, Any]]) -> List[int]: ...
+
+
+class IAsyncQuestionnaireRepository(ABC):
+    """Асинхронные чтения опросников (DB_ASYNC)."""
+    @abstractmethod
+    async def list_questionnaires(self, page: PageParams) -> Page[Dict[str, Any]]: ...
+    @abstractmethod
+    async def get_questionnaire(self, questionnaire_id: int) -> Dict[str, Any] | None: ...
+    @abstractmethod
+    async def get_questionnaire_version(self, questionnaire_id: int) -> Optional[datetime.datetime]: ...
+    @abstractmethod
+    async def list_questions(self, questionnaire_id: int) -> List[Dict[str, Any]]: ...
+    @abstractmethod
+    async def get_submissions_by_patient(self, patient_id: int, page: PageParams) -> Page[Dict[str, Any]]: ...
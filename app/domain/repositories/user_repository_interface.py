@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
 
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.patient import PatientRead
 from app.domain.models.users import UserUpdate, ProfileChangeRequestCreate
 
@@ -16,7 +17,14 @@ class IUserRepository(ABC):
                                       request: ProfileChangeRequestCreate) -> str: ...
 
     @abstractmethod
-    def list_notifications(self, user_id: UUID) -> list[dict]: ...
+    def list_notifications(self, user_id: UUID, page: PageParams) -> Page[dict]: ...
+
+    @abstractmethod
+    def get_unread_count(self, user_id: UUID) -> Optional[int]: ...
+
+    @abstractmethod
+    def mark_notifications_read(self, user_id: UUID,
+                                ids: Optional[List[int]] = None) -> Tuple[int, Optional[int]]: ...
 
     # --- «докторские» операции ---
     @abstractmethod
@@ -26,10 +34,13 @@ class IUserRepository(ABC):
     def deactivate_patient_link(self, doctor_id: str, patient_id: int) -> None: ...
 
     @abstractmethod
-    def list_patients(self, doctor_id: str) -> List[PatientRead]: ...
+    def list_patients(self, doctor_id: str, page: PageParams) -> Page[PatientRead]: ...
 
     @abstractmethod
     def search_patients(self, doctor_id: str, filters: Dict[str, Any]) -> List[PatientRead]: ...
 
     @abstractmethod
     def get_patient_stats(self, doctor_id: str, all_patients: bool = False) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def get_doctors_stats(self, doctor_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]: ...
@@ -0,0 +1,186 @@
+"""
+nutriform/formulas_batch.py
+
+Векторизованные версии расчётов из `app.formulas` поверх массивов NumPy.
+
+Каждая функция принимает массивы (или скаляры, приводимые к массивам) и
+возвращает массив той же формы. Численно результаты совпадают со
+скалярными функциями из `app.formulas` — порядок арифметических операций
+сохранён, поэтому пересчёт когорт пачкой даёт те же числа, что и
+поштучный.
+
+Пол передаётся булевой маской `is_male` (True — мужчина); подходит и
+int8-массив 0/1. Для преобразования значений `Sex`/строк в маску есть
+`sex_mask`.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Union
+
+import numpy as np
+
+from app.formulas import Sex
+
+ArrayLike = Union[np.ndarray, Iterable[float], float]
+
+
+def _f(values: ArrayLike) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _m(is_male: ArrayLike) -> np.ndarray:
+    return np.asarray(is_male).astype(bool)
+
+
+def sex_mask(values: Iterable[Union[Sex, str]]) -> np.ndarray:
+    """Значения пола (`Sex` или 'male'/'female') → булева маска is_male."""
+    return np.fromiter(
+        (Sex(v) == Sex.MALE for v in values), dtype=bool
+    )
+
+
+def age_years(measured_at: ArrayLike, birth_date: ArrayLike) -> np.ndarray:
+    """Полных лет на дату измерения — как `(measured_at.date() - birth_date).days // 365`."""
+    measured = np.asarray(measured_at, dtype="datetime64[D]")
+    born = np.asarray(birth_date, dtype="datetime64[D]")
+    return (measured - born).astype(np.int64) // 365
+
+
+# ──────────────────────────────────────────────────────────────
+# 1.  Рекомендуемая масса тела
+# ──────────────────────────────────────────────────────────────
+def lorentz_rec_weight(height_cm: ArrayLike, is_male: ArrayLike) -> np.ndarray:
+    male = _m(is_male)
+    delta = (_f(height_cm) - 152) * np.where(male, 1.1, 0.9)
+    base = np.where(male, 48, 45)
+    return base + delta
+
+
+def broca_brugsch_rec_weight(height_cm: ArrayLike) -> np.ndarray:
+    h = _f(height_cm)
+    return np.where(h < 165, h - 100, np.where(h <= 175, h - 105, h - 110))
+
+
+# ──────────────────────────────────────────────────────────────
+# 2.  Потеря массы тела и нутриционный риск
+# ──────────────────────────────────────────────────────────────
+def weight_loss_pct(initial_kg: ArrayLike, current_kg: ArrayLike) -> np.ndarray:
+    initial = _f(initial_kg)
+    return (initial - _f(current_kg)) / initial * 100
+
+
+def high_nutritional_risk(loss_pct: ArrayLike, months: ArrayLike) -> np.ndarray:
+    # порог по сроку: 1 мес — 5 %, 3 — 7.5 %, 6 и любой другой — 10 %
+    m = np.asarray(months)
+    limit = np.select([m == 1, m == 3], [5, 7.5], 10)
+    return _f(loss_pct) > limit
+
+
+# ──────────────────────────────────────────────────────────────
+# 3.  Площадь поверхности тела
+# ──────────────────────────────────────────────────────────────
+def bsa_mosteller(weight_kg: ArrayLike, height_cm: ArrayLike) -> np.ndarray:
+    return np.sqrt(_f(weight_kg) * _f(height_cm) / 3600)
+
+
+def bsa_shuter(weight_kg: ArrayLike, height_cm: ArrayLike) -> np.ndarray:
+    return 0.00949 * _f(weight_kg) ** 0.441 * _f(height_cm) ** 0.655
+
+
+# ──────────────────────────────────────────────────────────────
+# 4.  Индекс массы тела
+# ──────────────────────────────────────────────────────────────
+_BMI_BOUNDS = np.array([16, 18.5, 25, 30, 35, 40])
+_BMI_LABELS = np.array([
+    "Выраженный дефицит", "Недостаточная масса", "Норма", "Предожирение",
+    "Ожирение I", "Ожирение II", "Ожирение III",
+], dtype=object)
+
+
+def bmi(weight_kg: ArrayLike, height_cm: ArrayLike) -> np.ndarray:
+    return 100 * _f(weight_kg) / _f(height_cm) ** 2
+
+
+def bmi_with_amputation(weight_kg: ArrayLike, height_m: ArrayLike, coeff: ArrayLike) -> np.ndarray:
+    base = _f(weight_kg) / _f(height_m) ** 2
+    return base + _f(coeff) * base
+
+
+def bmi_category(value: ArrayLike) -> np.ndarray:
+    # side="right": граница относится к следующей категории (value < 16 → дефицит)
+    return _BMI_LABELS[np.searchsorted(_BMI_BOUNDS, _f(value), side="right")]
+
+
+# ──────────────────────────────────────────────────────────────
+# 5.  Окружность талии и WHR
+# ──────────────────────────────────────────────────────────────
+_WAIST_BOUNDS_MALE = np.array([94, 102])
+_WAIST_BOUNDS_FEMALE = np.array([80, 88])
+_WAIST_LABELS = np.array([
+    "Норма", "Профилактика предотвращения набора веса", "Коррекция массы",
+], dtype=object)
+
+
+def waist_status(waist_cm: ArrayLike, is_male: ArrayLike) -> np.ndarray:
+    waist = _f(waist_cm)
+    # side="left": граница включается в нижнюю категорию (waist <= 94 → норма)
+    idx = np.where(
+        _m(is_male),
+        np.searchsorted(_WAIST_BOUNDS_MALE, waist, side="left"),
+        np.searchsorted(_WAIST_BOUNDS_FEMALE, waist, side="left"),
+    )
+    return _WAIST_LABELS[idx]
+
+
+def whr(waist_cm: ArrayLike, hip_cm: ArrayLike) -> np.ndarray:
+    return _f(waist_cm) / _f(hip_cm)
+
+
+def whr_status(whr_val: ArrayLike, is_male: ArrayLike) -> np.ndarray:
+    limit = np.where(_m(is_male), 0.95, 0.8)
+    labels = np.array(["Оптимально", "Абдоминальное ожирение"], dtype=object)
+    return labels[(_f(whr_val) > limit).astype(np.intp)]
+
+
+# ──────────────────────────────────────────────────────────────
+# 6.  BMR / Основной обмен
+# ──────────────────────────────────────────────────────────────
+def bmr_mifflin(weight_kg: ArrayLike, height_cm: ArrayLike, age: ArrayLike,
+                is_male: ArrayLike) -> np.ndarray:
+    base = 10 * _f(weight_kg) + 6.25 * _f(height_cm) - 5 * _f(age)
+    return base + np.where(_m(is_male), 5, -161)
+
+
+def bmr_harris(weight_kg: ArrayLike, height_cm: ArrayLike, age: ArrayLike,
+               is_male: ArrayLike) -> np.ndarray:
+    w, h, a = _f(weight_kg), _f(height_cm), _f(age)
+    male = 88.362 + 13.397 * w + 4.799 * h - 5.677 * a
+    female = 447.593 + 9.247 * w + 3.098 * h - 4.330 * a
+    return np.where(_m(is_male), male, female)
+
+
+def bmr_katch(ffm_kg: ArrayLike) -> np.ndarray:
+    return 370 + 21.6 * _f(ffm_kg)
+
+
+# ──────────────────────────────────────────────────────────────
+# 7.  Биоимпедансометрия
+# ──────────────────────────────────────────────────────────────
+def fat_percent(fat_kg: ArrayLike, weight_kg: ArrayLike) -> np.ndarray:
+    return _f(fat_kg) / _f(weight_kg) * 100
+
+
+def fat_mass_index(fat_kg: ArrayLike, height_m: ArrayLike) -> np.ndarray:
+    return _f(fat_kg) / _f(height_m) ** 2
+
+
+def ffm_index(ffm_kg: ArrayLike, height_m: ArrayLike) -> np.ndarray:
+    return _f(ffm_kg) / _f(height_m) ** 2
+
+
+def body_water_percent(total_water_kg: ArrayLike, weight_kg: ArrayLike) -> np.ndarray:
+    return _f(total_water_kg) / _f(weight_kg) * 100
+
+
+def ecw_ratio(ecw_kg: ArrayLike, total_water_kg: ArrayLike) -> np.ndarray:
+    return _f(ecw_kg) / _f(total_water_kg)
@@ -6,3 +6,5 @@ from .doctors import router as doctors    # noqa
 from .admin import router as admin        # noqa
 from .questions import router as questions
 from .submissions import router as submissions
+from .exports import router as exports
+from .internal import router as internal
@@ -1,10 +1,12 @@
-from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
 from app.domain.models.profile_change_request import ProfileChangeRequestRead
+from app.domain.models.users import BroadcastResult, NotificationBroadcast
+from app.handlers.pagination import page_params
 from app.infrastructure.db.session import get_db
 from app.infrastructure.repositories.admin_repository import AdminRepository
 from app.use_cases.admin_use_cases import AdminService
@@ -18,13 +20,17 @@ def get_admin_service(db: Session = Depends(get_db)) -> AdminService:
 
 @router.get(
     "/profile-change-requests",
-    response_model=List[ProfileChangeRequestRead],
+    response_model=Page[ProfileChangeRequestRead],
     summary="Список заявок на изменение профиля"
 )
 def list_profile_change_requests(
+        page: PageParams = Depends(page_params),
         svc: AdminService = Depends(get_admin_service),
 ):
-    return svc.list_requests()
+    try:
+        return svc.list_requests(page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.post(
@@ -57,3 +63,22 @@ def reject_request(
         svc.reject(request_id, admin_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Request not found")
+
+
+@router.post(
+    "/notifications/broadcast",
+    response_model=BroadcastResult,
+    summary="Разослать уведомление",
+    description=(
+        "Создаёт уведомление каждому пользователю, подходящему под все заданные условия "
+        "(`role`, `user_ids`, `patient_id` — врачи пациента). Хотя бы одно условие обязательно."
+    ),
+)
+def broadcast_notification(
+        body: NotificationBroadcast,
+        svc: AdminService = Depends(get_admin_service),
+):
+    try:
+        return svc.broadcast(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Recipients selector is empty")
@@ -1,10 +1,19 @@
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from typing import IO, List
+
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.domain.models.anthropometry import AnthropometryCreate, AnthropometryRead
+from app.domain.models.anthropometry import (
+    AnthropometryCreate, AnthropometryIngestReport, AnthropometryRead, LatestMetricsRead
+)
+from app.domain.models.imports import InvalidEncoding
+from app.handlers.uploads import spooled_body
+from app.services.anthropometry_ingest import ingest_anthropometries
 from app.use_cases.body_metrics_use_cases import BodyMetricsService
-from app.infrastructure.db.session import get_db
+from app.infrastructure.db.session import SessionLocal, get_db
+from app.infrastructure.db.unit_of_work import unit_of_work
 from app.infrastructure.repositories.body_metrics_repository import BodyMetricsRepository
 
 router = APIRouter(tags=["Антропометрия"])
@@ -38,6 +47,29 @@ def add_anthropometry(
     return svc.add_anthropometry(patient_id, data)
 
 
+def _ingest(stream: IO[bytes]) -> AnthropometryIngestReport:
+    with unit_of_work(SessionLocal) as session:
+        return ingest_anthropometries(session, stream)
+
+
+@router.post(
+    "/anthropometries/ingest",
+    response_model=AnthropometryIngestReport,
+    summary="Пакетный приём измерений по многим пациентам",
+)
+async def ingest(request: Request):
+    """
+    Тело — NDJSON: по записи `{patient_id, height_cm, weight_kg, measured_at, waist_cm?, hip_cm?}`
+    на строку. Метрики считаются для всей пачки сразу; невалидные записи и записи
+    неизвестных пациентов пропускаются и перечисляются в отчёте. Тело не в UTF-8 — 400.
+    """
+    async with spooled_body(request) as spool:
+        try:
+            return await run_in_threadpool(_ingest, spool)
+        except InvalidEncoding as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.get(
     "/patients/{patient_id}/anthropometries/latest",
     response_model=AnthropometryRead,
@@ -51,3 +83,19 @@ def get_latest(
     if not res:
         raise HTTPException(status_code=404, detail="No metrics found")
     return res
+
+
+@router.get(
+    "/anthropometries/latest",
+    response_model=List[LatestMetricsRead],
+    summary="Последняя антропометрия и метрики для списка пациентов"
+)
+def get_latest_many(
+    patient_ids: List[int] = Query(..., max_length=1000, description="ID пациентов"),
+    svc: BodyMetricsService = Depends(get_service),
+):
+    """
+    Один запрос на весь список — для дашборда доктора.
+    Пациенты без антропометрии в ответ не попадают.
+    """
+    return svc.get_latest_many(patient_ids)
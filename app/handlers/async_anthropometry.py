@@ -0,0 +1,44 @@
+"""
+Асинхронные (asyncpg) GET-эндпоинты антропометрии; подключаются при DB_ASYNC=true.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.anthropometry import AnthropometryRead, LatestMetricsRead
+from app.infrastructure.db.async_session import get_async_db
+from app.infrastructure.repositories.async_body_metrics_repository import AsyncBodyMetricsRepository
+from app.use_cases.body_metrics_use_cases import AsyncBodyMetricsService
+
+router = APIRouter(tags=["Антропометрия"])
+
+def get_service(db: AsyncSession = Depends(get_async_db)) -> AsyncBodyMetricsService:
+    return AsyncBodyMetricsService(AsyncBodyMetricsRepository(db))
+
+
+@router.get(
+    "/patients/{patient_id}/anthropometries/latest",
+    response_model=AnthropometryRead,
+    summary="Последняя антропометрия"
+)
+async def get_latest(
+    patient_id: int,
+    svc: AsyncBodyMetricsService = Depends(get_service),
+):
+    res = await svc.get_latest(patient_id)
+    if not res:
+        raise HTTPException(status_code=404, detail="No metrics found")
+    return res
+
+
+@router.get(
+    "/anthropometries/latest",
+    response_model=List[LatestMetricsRead],
+    summary="Последняя антропометрия и метрики для списка пациентов"
+)
+async def get_latest_many(
+    patient_ids: List[int] = Query(..., max_length=1000, description="ID пациентов"),
+    svc: AsyncBodyMetricsService = Depends(get_service),
+):
+    return await svc.get_latest_many(patient_ids)
@@ -0,0 +1,57 @@
+"""
+Асинхронные (asyncpg) GET-эндпоинты пациентов; подключаются при DB_ASYNC=true
+раньше синхронного роутера, запись остаётся в patients.py.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
+from app.domain.models.patient import PatientRead
+from app.handlers.http_cache import PATIENT_CACHE_CONTROL, is_fresh, make_etag, not_modified, set_cache_headers
+from app.handlers.pagination import page_params
+from app.infrastructure.db.async_session import get_async_db
+from app.infrastructure.repositories.async_patient_repository import AsyncPatientRepository
+from app.use_cases.patient_use_cases import AsyncPatientService
+
+router = APIRouter(prefix="/patients", tags=["Пациенты"])
+
+
+def get_patient_service(db: AsyncSession = Depends(get_async_db)) -> AsyncPatientService:
+    return AsyncPatientService(AsyncPatientRepository(db))
+
+
+@router.get(
+    "/{patient_id}",
+    response_model=PatientRead,
+    summary="Получить пациента"
+)
+async def read_patient(
+        patient_id: int,
+        request: Request,
+        response: Response,
+        svc: AsyncPatientService = Depends(get_patient_service),
+):
+    try:
+        patient, version = await svc.get_versioned_patient(patient_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    etag = make_etag("patient", patient_id, version)
+    if is_fresh(request, etag):
+        return not_modified(etag, PATIENT_CACHE_CONTROL)
+    set_cache_headers(response, etag, PATIENT_CACHE_CONTROL)
+    return patient
+
+
+@router.get(
+    "/",
+    response_model=Page[PatientRead],
+    summary="Список пациентов"
+)
+async def list_patients(
+        page: PageParams = Depends(page_params),
+        svc: AsyncPatientService = Depends(get_patient_service),
+):
+    try:
+        return await svc.list_patients(page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,61 @@
+"""
+Асинхронные (asyncpg) GET-эндпоинты опросников, вопросов и submissions;
+подключаются при DB_ASYNC=true.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
+from app.domain.models.questionnaire import QuestionnaireRead, QuestionRead, SubmissionRead
+from app.handlers.http_cache import TEMPLATE_CACHE_CONTROL, is_fresh, make_etag, not_modified, set_cache_headers
+from app.handlers.pagination import page_params
+from app.infrastructure.db.async_session import get_async_db
+from app.infrastructure.repositories.async_questionnaire_repository import AsyncQuestionnaireRepository
+from app.use_cases.questionnaire_use_cases import AsyncQuestionnaireService
+
+router = APIRouter(tags=["Опросники"])
+
+def get_service(db: AsyncSession = Depends(get_async_db)) -> AsyncQuestionnaireService:
+    return AsyncQuestionnaireService(AsyncQuestionnaireRepository(db))
+
+@router.get("/questionnaires/", response_model=Page[QuestionnaireRead], summary="Список шаблонов опросников")
+async def list_questionnaires(page: PageParams = Depends(page_params), svc: AsyncQuestionnaireService = Depends(get_service)):
+    try:
+        return await svc.list_questionnaires(page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/questionnaires/{qid}", response_model=QuestionnaireRead, summary="Получить шаблон опросника")
+async def read_questionnaire(qid: int, request: Request, response: Response, svc: AsyncQuestionnaireService = Depends(get_service)):
+    version = await svc.get_questionnaire_version(qid)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Questionnaire not found")
+    etag = make_etag("questionnaire", qid, version)
+    if is_fresh(request, etag):
+        return not_modified(etag, TEMPLATE_CACHE_CONTROL)
+    try:
+        questionnaire = await svc.get_questionnaire(qid)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Questionnaire not found")
+    set_cache_headers(response, etag, TEMPLATE_CACHE_CONTROL)
+    return questionnaire
+
+@router.get("/questionnaires/{qid}/questions", response_model=List[QuestionRead], summary="Список вопросов опросника")
+async def list_questions(qid: int, request: Request, response: Response, svc: AsyncQuestionnaireService = Depends(get_service)):
+    version = await svc.get_questionnaire_version(qid)
+    if version is None:
+        return []
+    etag = make_etag("questions", qid, version)
+    if is_fresh(request, etag):
+        return not_modified(etag, TEMPLATE_CACHE_CONTROL)
+    set_cache_headers(response, etag, TEMPLATE_CACHE_CONTROL)
+    return await svc.list_questions(qid)
+
+@router.get("/patients/{patient_id}/submissions/", response_model=Page[SubmissionRead], summary="Список submissions пациента")
+async def get_submissions(patient_id: int, page: PageParams = Depends(page_params), svc: AsyncQuestionnaireService = Depends(get_service)):
+    try:
+        return await svc.get_submissions(patient_id, page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -1,9 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
 from app.domain.models.patient import PatientRead
+from app.handlers.pagination import page_params
 from app.infrastructure.db.session import get_db
 from app.infrastructure.repositories.user_repository import UserRepository
 from app.use_cases.user_use_cases import UserService
@@ -27,15 +29,25 @@ def unlink_patient(doctor_id: str, patient_id: int, svc: UserService = Depends(g
     svc.remove_patient(doctor_id, patient_id)
 
 
-@router.get("/{doctor_id}/patients", response_model=List[PatientRead], summary="Список пациентов доктора")
-def list_patients(doctor_id: str, svc: UserService = Depends(get_service)):
-    return svc.list_patients(doctor_id)
+@router.get("/{doctor_id}/patients", response_model=Page[PatientRead], summary="Список пациентов доктора")
+def list_patients(doctor_id: str, page: PageParams = Depends(page_params), svc: UserService = Depends(get_service)):
+    try:
+        return svc.list_patients(doctor_id, page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/{doctor_id}/patients/search", response_model=List[PatientRead], summary="Поиск пациентов доктора")
-def search_patients(doctor_id: str, full_name: str | None = Query(None), birth_date: str | None = Query(None),
+def search_patients(doctor_id: str,
+                    full_name: str | None = Query(None, max_length=200, description="ФИО или его часть, допускаются опечатки"),
+                    birth_date: str | None = Query(None),
+                    birth_year_from: int | None = Query(None, ge=1900, le=2100),
+                    birth_year_to: int | None = Query(None, ge=1900, le=2100),
+                    limit: int = Query(20, ge=1, le=100),
                     svc: UserService = Depends(get_service)):
-    return svc.search_patients(doctor_id, {"full_name": full_name, "birth_date": birth_date})
+    return svc.search_patients(doctor_id, {"full_name": full_name, "birth_date": birth_date,
+                                           "birth_year_from": birth_year_from, "birth_year_to": birth_year_to,
+                                           "limit": limit})
 
 
 @router.get("/{doctor_id}/stats", summary="Статистика доктора")
@@ -0,0 +1,37 @@
+import datetime
+import uuid
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.infrastructure.db.routing import READ_ONLY
+from app.infrastructure.db.session import SessionLocal
+from app.services.exporter import FORMATS, ExportFilters, export
+
+router = APIRouter(prefix="/exports", tags=["Выгрузки"])
+
+
+def _stream(filters: ExportFilters, fmt: str) -> Iterator[bytes]:
+    # своя сессия: зависимость get_db закрывается до того, как начнётся отдача тела ответа;
+    # выгрузка только читает — её можно отдать реплике
+    with SessionLocal(info={READ_ONLY: True}) as session:
+        yield from export(session, filters, fmt)
+
+
+@router.get("/patients", summary="Потоковая выгрузка пациентов с антропометрией, метриками и submissions")
+def export_patients(
+        format: str = Query("ndjson", description="ndjson или csv"),
+        doctor_id: Optional[uuid.UUID] = Query(None, description="Только пациенты доктора"),
+        date_from: Optional[datetime.date] = Query(None, description="Начало периода (measured_at / submitted_at)"),
+        date_to: Optional[datetime.date] = Query(None, description="Конец периода включительно"),
+        questionnaire_type: Optional[str] = Query(None, description="Тип опросника для submissions"),
+):
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="Unknown export format")
+    filters = ExportFilters(doctor_id, date_from, date_to, questionnaire_type)
+    return StreamingResponse(
+        _stream(filters, format),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="patients.{format}"'},
+    )
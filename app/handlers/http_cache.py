@@ -0,0 +1,42 @@
+"""
+Условные GET: сильные ETag из updated_at записи и ответы 304.
+
+Версия (updated_at) и тело должны браться из одного снимка: если прочитать
+их разными запросами (или с разных серверов), а запись изменится между ними,
+клиент получит старое тело с новым ETag и дальше будет вечно получать на него
+304. Пациент читается вместе с updated_at одним запросом с primary; шаблоны
+опросников — из кэша, где версия хранится рядом с телом.
+"""
+import datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# шаблоны опросников общие для всех и меняются редко
+TEMPLATE_CACHE_CONTROL = "public, max-age=60"
+# данные пациента: не хранить в общих кэшах, перед использованием — ревалидация
+PATIENT_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(kind: str, object_id, updated_at: Optional[datetime.datetime]) -> str:
+    version = updated_at.strftime("%Y%m%d%H%M%S%f") if updated_at else "0"
+    return f'"{kind}-{object_id}-{version}"'
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    """Совпадает ли If-None-Match с `etag` (для GET сравнение слабое, W/ игнорируется)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.config.settings import get_settings
+from app.infrastructure.db.pool import pool_stats
+from app.infrastructure.db.session import engine, replica_engines
+
+router = APIRouter(prefix="/internal", tags=["Служебное"], include_in_schema=False)
+
+
+@router.get("/metrics/db-pool", summary="Состояние пулов соединений БД")
+def db_pool_metrics() -> Dict[str, Any]:
+    stats = {"sync": pool_stats(engine)}
+    if replica_engines:
+        stats["replicas"] = [pool_stats(replica) for replica in replica_engines]
+    if get_settings().db_async:
+        from app.infrastructure.db.async_session import async_engine
+        stats["async"] = pool_stats(async_engine)
+    return stats
@@ -0,0 +1,34 @@
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.infrastructure.db.routing import RoutingState, routing_state
+
+STICKY_COOKIE = "db_primary_until"
+
+
+class ReplicaStickinessMiddleware(BaseHTTPMiddleware):
+    """Read-your-writes для реплик: после записи клиент получает cookie со сроком,
+    до которого его @read_only-чтения идут на primary."""
+
+    def __init__(self, app, sticky_seconds: float):
+        super().__init__(app)
+        self.sticky_seconds = sticky_seconds
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            sticky = float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        # сам объект общий для потоков/задач запроса, поэтому отметку о записи видно здесь
+        state = RoutingState(sticky=sticky)
+        token = routing_state.set(state)
+        try:
+            response = await call_next(request)
+        finally:
+            routing_state.reset(token)
+        if state.wrote:
+            response.set_cookie(STICKY_COOKIE, f"{time.time() + self.sticky_seconds:.3f}",
+                                max_age=int(self.sticky_seconds) + 1, httponly=True, samesite="lax")
+        return response
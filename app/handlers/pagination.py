@@ -0,0 +1,14 @@
+from typing import Optional
+
+from fastapi import Query
+
+from app.domain.models.pagination import PageParams
+
+
+def page_params(
+        limit: int = Query(50, ge=1, le=500, description="Размер страницы"),
+        after: Optional[str] = Query(None, description="Курсор next_cursor предыдущей страницы"),
+        with_total: bool = Query(False, description="Вернуть общее число записей"),
+) -> PageParams:
+    return PageParams(limit=limit, after=after, with_total=with_total)
+
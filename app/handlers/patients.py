@@ -1,10 +1,19 @@
-from typing import List
+import uuid
+from typing import IO, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Body, Request, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.domain.models.patient import PatientCreate, PatientRead
-from app.infrastructure.db.session import get_db
+from app.domain.models.imports import DoctorNotFound, InvalidEncoding
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
+from app.domain.models.patient import PatientCreate, PatientImportReport, PatientRead
+from app.handlers.http_cache import PATIENT_CACHE_CONTROL, is_fresh, make_etag, not_modified, set_cache_headers
+from app.handlers.pagination import page_params
+from app.handlers.uploads import spooled_body
+from app.infrastructure.db.session import SessionLocal, get_db
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.services import patient_import
 from app.use_cases.patient_use_cases import PatientService
 
 router = APIRouter(prefix="/patients", tags=["Пациенты"])
@@ -34,6 +43,37 @@ def create_patient(
     return svc.create_patient(data)
 
 
+def _import(stream: IO[bytes], fmt: str, doctor_id: Optional[uuid.UUID]) -> PatientImportReport:
+    with unit_of_work(SessionLocal) as session:
+        return patient_import.import_patients(session, stream, fmt, doctor_id)
+
+
+@router.post(
+    "/import",
+    response_model=PatientImportReport,
+    summary="Массовый импорт пациентов",
+    description=(
+        "Тело запроса — CSV с заголовком или NDJSON записей `PatientCreate`. Невалидные записи "
+        "пропускаются и перечисляются в отчёте; остальные импортируются одной транзакцией. "
+        "С `doctor_id` все импортированные пациенты привязываются к доктору. Тело не в UTF-8 — 400."
+    ),
+)
+async def import_patients(
+        request: Request,
+        format: str = Query("csv", description="csv или ndjson"),
+        doctor_id: Optional[uuid.UUID] = Query(None, description="Привязать пациентов к доктору"),
+):
+    if format not in patient_import.FORMATS:
+        raise HTTPException(status_code=400, detail="Unknown import format")
+    async with spooled_body(request) as spool:
+        try:
+            return await run_in_threadpool(_import, spool, format, doctor_id)
+        except DoctorNotFound:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+        except InvalidEncoding as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.get(
     "/{patient_id}",
     response_model=PatientRead,
@@ -41,20 +81,32 @@ def create_patient(
 )
 def read_patient(
         patient_id: int,
+        request: Request,
+        response: Response,
         svc: PatientService = Depends(get_patient_service),
 ):
     try:
-        return svc.get_patient(patient_id)
+        patient, version = svc.get_versioned_patient(patient_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Patient not found")
+    etag = make_etag("patient", patient_id, version)
+    if is_fresh(request, etag):
+        return not_modified(etag, PATIENT_CACHE_CONTROL)
+    set_cache_headers(response, etag, PATIENT_CACHE_CONTROL)
+    return patient
 
 
 @router.get(
     "/",
-    response_model=List[PatientRead],
+    response_model=Page[PatientRead],
     summary="Список пациентов"
 )
 def list_patients(
+        page: PageParams = Depends(page_params),
         svc: PatientService = Depends(get_patient_service),
 ):
-    return svc.list_patients()
+    try:
+        return svc.list_patients(page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request, Response
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
 from app.domain.models.questionnaire import QuestionnaireCreate, QuestionnaireRead, QuestionnaireUpdate
+from app.handlers.http_cache import TEMPLATE_CACHE_CONTROL, is_fresh, make_etag, not_modified, set_cache_headers
+from app.handlers.pagination import page_params
 from app.use_cases.questionnaire_use_cases import QuestionnaireService
 from app.infrastructure.db.session import get_db
 from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
@@ -11,20 +13,31 @@ router = APIRouter(prefix="/questionnaires", tags=["Опросники"])
 def get_service(db: Session = Depends(get_db)) -> QuestionnaireService:
     return QuestionnaireService(QuestionnaireRepository(db))
 
-@router.get("/", response_model=List[QuestionnaireRead], summary="Список шаблонов опросников")
-def list_questionnaires(svc: QuestionnaireService = Depends(get_service)):
-    return svc.list_questionnaires()
+@router.get("/", response_model=Page[QuestionnaireRead], summary="Список шаблонов опросников")
+def list_questionnaires(page: PageParams = Depends(page_params), svc: QuestionnaireService = Depends(get_service)):
+    try:
+        return svc.list_questionnaires(page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @router.post("/", response_model=int, status_code=status.HTTP_201_CREATED, summary="Создать шаблон опросника")
 def create_questionnaire(data: QuestionnaireCreate = Body(...), svc: QuestionnaireService = Depends(get_service)):
     return svc.create_questionnaire(data)
 
 @router.get("/{qid}", response_model=QuestionnaireRead, summary="Получить шаблон опросника")
-def read_questionnaire(qid: int, svc: QuestionnaireService = Depends(get_service)):
+def read_questionnaire(qid: int, request: Request, response: Response, svc: QuestionnaireService = Depends(get_service)):
+    version = svc.get_questionnaire_version(qid)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Questionnaire not found")
+    etag = make_etag("questionnaire", qid, version)
+    if is_fresh(request, etag):
+        return not_modified(etag, TEMPLATE_CACHE_CONTROL)
     try:
-        return svc.get_questionnaire(qid)
+        questionnaire = svc.get_questionnaire(qid)
     except ValueError:
         raise HTTPException(status_code=404, detail="Questionnaire not found")
+    set_cache_headers(response, etag, TEMPLATE_CACHE_CONTROL)
+    return questionnaire
 
 @router.put("/{qid}", status_code=status.HTTP_204_NO_CONTENT, summary="Обновить шаблон опросника")
 def update_questionnaire(qid: int, data: QuestionnaireUpdate = Body(...), svc: QuestionnaireService = Depends(get_service)):
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request, Response
 from typing import List
 from app.domain.models.questionnaire import QuestionCreate, QuestionRead, QuestionUpdate
+from app.handlers.http_cache import TEMPLATE_CACHE_CONTROL, is_fresh, make_etag, not_modified, set_cache_headers
 from app.use_cases.questionnaire_use_cases import QuestionnaireService
 from app.infrastructure.db.session import get_db
 from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
@@ -12,7 +13,14 @@ def get_service(db: Session = Depends(get_db)) -> QuestionnaireService:
     return QuestionnaireService(QuestionnaireRepository(db))
 
 @router.get("/questionnaires/{qid}/questions", response_model=List[QuestionRead], summary="Список вопросов опросника")
-def list_questions(qid: int, svc: QuestionnaireService = Depends(get_service)):
+def list_questions(qid: int, request: Request, response: Response, svc: QuestionnaireService = Depends(get_service)):
+    version = svc.get_questionnaire_version(qid)
+    if version is None:
+        return []
+    etag = make_etag("questions", qid, version)
+    if is_fresh(request, etag):
+        return not_modified(etag, TEMPLATE_CACHE_CONTROL)
+    set_cache_headers(response, etag, TEMPLATE_CACHE_CONTROL)
     return svc.list_questions(qid)
 
 @router.post("/questionnaires/{qid}/questions", response_model=int, status_code=status.HTTP_201_CREATED, summary="Добавить вопрос")
@@ -1,7 +1,9 @@
 import uuid
-from fastapi import APIRouter, Depends, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body
 from typing import List
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
 from app.domain.models.questionnaire import SubmissionCreate, SubmissionRead, AnswerCreate
+from app.handlers.pagination import page_params
 from app.use_cases.questionnaire_use_cases import QuestionnaireService
 from app.infrastructure.db.session import get_db
 from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
@@ -16,10 +18,20 @@ def get_service(db: Session = Depends(get_db)) -> QuestionnaireService:
 def create_submission(patient_id: int, data: SubmissionCreate = Body(...), svc: QuestionnaireService = Depends(get_service)):
     return svc.create_submission(patient_id, data)
 
-@router.get("/patients/{patient_id}/submissions/", response_model=List[SubmissionRead], summary="Список submissions пациента")
-def get_submissions(patient_id: int, svc: QuestionnaireService = Depends(get_service)):
-    return svc.get_submissions(patient_id)
+@router.get("/patients/{patient_id}/submissions/", response_model=Page[SubmissionRead], summary="Список submissions пациента")
+def get_submissions(patient_id: int, page: PageParams = Depends(page_params), svc: QuestionnaireService = Depends(get_service)):
+    try:
+        return svc.get_submissions(patient_id, page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @router.post("/submissions/{submission_id}/answers/", response_model=int, status_code=status.HTTP_201_CREATED, summary="Добавить ответ в submission")
 def add_answer(submission_id: uuid.UUID, data: AnswerCreate = Body(...), svc: QuestionnaireService = Depends(get_service)):
     return svc.add_answer(submission_id, data)
+
+@router.post("/submissions/{submission_id}/answers/bulk", response_model=List[int], status_code=status.HTTP_201_CREATED, summary="Добавить все ответы submission одним запросом")
+def add_answers(submission_id: uuid.UUID, data: List[AnswerCreate] = Body(...), svc: QuestionnaireService = Depends(get_service)):
+    try:
+        return svc.add_answers(submission_id, data)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Submission not found")
@@ -0,0 +1,18 @@
+"""Тело запроса во временный файл: импорт читает его синхронно в тредпуле."""
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, IO
+
+from fastapi import Request
+
+# до этого размера тело держится в памяти, дальше — на диске
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+@asynccontextmanager
+async def spooled_body(request: Request) -> AsyncIterator[IO[bytes]]:
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        yield spool
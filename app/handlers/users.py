@@ -1,17 +1,29 @@
+import asyncio
+import json
 import uuid
-from typing import List
+from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, status, Body, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Body, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.config.settings import get_settings
-from app.domain.models.users import UserUpdate, ProfileChangeRequestCreate, NotificationRead
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
+from app.domain.models.users import (
+    UserUpdate, ProfileChangeRequestCreate, NotificationRead, NotificationsMarkRead, NotificationsMarked, UnreadCount
+)
+from app.handlers.pagination import page_params
 from app.infrastructure.db.session import get_db
 from app.infrastructure.repositories.user_repository import UserRepository
+from app.services.notification_hub import notification_hub
 from app.use_cases.user_use_cases import UserService
 
 settings = get_settings()
 
+# комментарий раз в KEEPALIVE_SECONDS не даёт прокси закрыть простаивающий поток
+KEEPALIVE_SECONDS = 15
+
 router = APIRouter(prefix="/users", tags=["Пользователи"])
 
 
@@ -61,11 +73,94 @@ async def request_profile_change(
 
 @router.get(
     "/{user_id}/notifications",
-    response_model=List[NotificationRead],
+    response_model=Page[NotificationRead],
     summary="Получить уведомления пользователя",
 )
 def get_notifications(
         user_id: uuid.UUID,
+        page: PageParams = Depends(page_params),
         svc: UserService = Depends(get_user_service),
 ):
-    return svc.get_notifications(user_id)
+    try:
+        return svc.get_notifications(user_id, page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get(
+    "/{user_id}/notifications/unread-count",
+    response_model=UnreadCount,
+    summary="Число непрочитанных уведомлений",
+)
+def get_unread_count(user_id: uuid.UUID, svc: UserService = Depends(get_user_service)):
+    try:
+        return svc.get_unread_count(user_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
+
+
+@router.post(
+    "/{user_id}/notifications/read",
+    response_model=NotificationsMarked,
+    summary="Отметить уведомления прочитанными",
+    description="Отмечает перечисленные `ids` или, без них, все непрочитанные уведомления пользователя.",
+)
+def mark_notifications_read(
+        user_id: uuid.UUID,
+        body: NotificationsMarkRead = Body(NotificationsMarkRead()),
+        svc: UserService = Depends(get_user_service),
+):
+    try:
+        return svc.mark_notifications_read(user_id, body.ids)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    lines = [f"event: {event['type']}"]
+    if "id" in event:
+        lines.append(f"id: {event['id']}")
+    lines.append("data: " + json.dumps(event, ensure_ascii=False, default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+async def _event_stream(user_id: uuid.UUID, queue: asyncio.Queue, unread: int):
+    try:
+        yield _sse({"type": "unread", "user_id": str(user_id), "unread": unread})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event)
+    finally:
+        # отключение клиента отменяет генератор — подписка снимается здесь
+        notification_hub.unsubscribe(user_id, queue)
+
+
+@router.get(
+    "/{user_id}/notifications/stream",
+    summary="Поток уведомлений (Server-Sent Events)",
+    description=(
+        "Первое событие — `unread` с текущим счётчиком, дальше `notification` на каждое новое "
+        "уведомление и `unread` после отметки прочитанными. `resync` — часть событий потеряна, "
+        "список и счётчик нужно перечитать."
+    ),
+)
+async def stream_notifications(user_id: uuid.UUID, svc: UserService = Depends(get_user_service)):
+    # подписка до чтения счётчика: событие между ними не потеряется
+    queue = await notification_hub.subscribe(user_id)
+    try:
+        unread = (await run_in_threadpool(svc.get_unread_count, user_id)).unread
+    except ValueError:
+        notification_hub.unsubscribe(user_id, queue)
+        raise HTTPException(status_code=404, detail="User not found")
+    except BaseException:
+        notification_hub.unsubscribe(user_id, queue)
+        raise
+    return StreamingResponse(
+        _event_stream(user_id, queue, unread),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
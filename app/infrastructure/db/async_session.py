@@ -0,0 +1,31 @@
+"""
+Асинхронный движок (asyncpg) для read-эндпоинтов.
+
+Подключается только при DB_ASYNC=true (см. app/main.py); URL берётся тот же,
+что и у синхронного движка, с заменой драйвера на asyncpg.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.pool import engine_options, instrument
+from app.infrastructure.db.session import DATABASE_URL, pool_settings
+
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(pool_settings, asyncio=True),
+)
+instrument(async_engine, pool_settings)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    """FastAPI dependency: асинхронная сессия на запрос."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -4,7 +4,8 @@ import uuid
 from typing import List, Optional
 
 from sqlalchemy import ARRAY, BigInteger, CheckConstraint, Date, DateTime, Double, Enum, ForeignKeyConstraint, Integer, \
-    Numeric, PrimaryKeyConstraint, Sequence, String, Text, Time, UniqueConstraint, Uuid, text, Boolean, ForeignKey
+    Numeric, PrimaryKeyConstraint, Sequence, String, Text, Time, UniqueConstraint, Uuid, text, Boolean, ForeignKey, func, Index
+from sqlalchemy import event, inspect
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -23,6 +24,8 @@ class Anthropometries(Base):
             ondelete="CASCADE",
             name="anthropometries_patient_id_fkey",
         ),
+        # последняя антропометрия пациента (DISTINCT ON (patient_id) … measured_at DESC)
+        Index("ix_anthropometries_patient_id_measured_at", "patient_id", text("measured_at DESC")),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
@@ -32,6 +35,9 @@ class Anthropometries(Base):
     patient_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     waist_cm: Mapped[Optional[float]] = mapped_column(Double)
     hip_cm: Mapped[Optional[float]] = mapped_column(Double)
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=func.now()
+    )
 
     patient: Mapped["Patients"] = relationship(
         "Patients", back_populates="anthropometries"
@@ -67,6 +73,11 @@ class BodyMetrics(Base):
     bmr: Mapped[Optional[float]] = mapped_column(Double)
     method_bmr: Mapped[Optional[str]] = mapped_column(Text)
     method_bsa: Mapped[Optional[str]] = mapped_column(Text)
+    # версия набора формул (metrics_recalculator.FORMULA_VERSION) и время расчёта
+    formula_version: Mapped[Optional[int]] = mapped_column(Integer)
+    computed_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime, server_default=text("CURRENT_TIMESTAMP")
+    )
 
     anthropometry: Mapped["Anthropometries"] = relationship(
         "Anthropometries",
@@ -110,7 +121,10 @@ class Patients(Base):
     __tablename__ = 'patients'
     __table_args__ = (
         CheckConstraint("sex = ANY (ARRAY['male'::text, 'female'::text])", name='patients_sex_check'),
-        PrimaryKeyConstraint('id', name='patients_pkey')
+        PrimaryKeyConstraint('id', name='patients_pkey'),
+        # нечёткий поиск по ФИО (UserRepository.search_patients); нужен CREATE EXTENSION pg_trgm
+        Index("ix_patients_full_name_trgm", text("translate(lower(full_name), 'ё', 'е') gin_trgm_ops"),
+              postgresql_using="gin"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, Sequence('patient_id_seq'), primary_key=True)
@@ -118,6 +132,12 @@ class Patients(Base):
     birth_date: Mapped[datetime.date] = mapped_column(Date)
     sex: Mapped[str] = mapped_column(Text)
     place_of_residence: Mapped[Optional[str]] = mapped_column(Text)
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime, server_default=text('CURRENT_TIMESTAMP'), onupdate=func.now()
+    )
+    # последнее изменение входов расчёта метрик (birth_date, sex), NULL — не менялись;
+    # updated_at сдвигает любая правка (ФИО, адрес), для отбора устаревших body_metrics он не годится
+    metrics_inputs_updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime)
 
     anthropometries: Mapped[List['Anthropometries']] = relationship('Anthropometries', back_populates='patient')
     bioimpedance_samples: Mapped[List['BioimpedanceSamples']] = relationship('BioimpedanceSamples',
@@ -131,6 +151,16 @@ class Patients(Base):
                                                                                        back_populates='patient')
 
 
+_METRICS_INPUTS = ("birth_date", "sex")
+
+
+@event.listens_for(Patients, "before_update")
+def _stamp_metrics_inputs(mapper, connection, target: Patients) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _METRICS_INPUTS):
+        target.metrics_inputs_updated_at = func.now()
+
+
 class Questionnaires(Base):
     __tablename__ = 'questionnaires'
     __table_args__ = (
@@ -141,11 +171,19 @@ class Questionnaires(Base):
     name: Mapped[Optional[str]] = mapped_column(String(255))
     type: Mapped[Optional[str]] = mapped_column(Enum('nutrition', 'physical_activity', name='questionnaire_type'))
     created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, server_default=text('CURRENT_TIMESTAMP'))
+    # версия шаблона для ETag: меняется и при изменении его вопросов (QuestionnaireRepository)
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime, server_default=text('CURRENT_TIMESTAMP'), onupdate=func.now()
+    )
 
     questionnaire_questions: Mapped[List['QuestionnaireQuestions']] = relationship('QuestionnaireQuestions',
                                                                                    back_populates='questionnaire')
 
 
+# общий счётчик версий кэша шаблонов опросников (app/services/template_cache.py)
+questionnaire_template_version = Sequence('questionnaire_template_version', metadata=Base.metadata)
+
+
 class Users(Base):
     __tablename__ = 'users'
     __table_args__ = (
@@ -161,6 +199,8 @@ class Users(Base):
     role: Mapped[str] = mapped_column(Text)
     oidc_sub: Mapped[str] = mapped_column(Text)
     position: Mapped[Optional[str]] = mapped_column(Text)
+    # счётчик непрочитанных уведомлений; ведётся в той же транзакции, что и notifications
+    unread_notifications: Mapped[int] = mapped_column(Integer, server_default=text('0'), nullable=False)
 
     patient_user_links: Mapped[List['PatientUserLinks']] = relationship('PatientUserLinks', back_populates='user')
     profile_change_requests: Mapped[List['ProfileChangeRequests']] = relationship('ProfileChangeRequests',
@@ -338,7 +378,10 @@ class ProfileChangeRequests(Base):
     )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
-    submitted_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+    # ключ keyset-пагинации (admin_repository) — без NULL
+    submitted_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False
+    )
     status: Mapped[str] = mapped_column(Text)
     user_id: Mapped[Optional[uuid.UUID]] = mapped_column(Uuid)
     requested_fields: Mapped[Optional[dict]] = mapped_column(JSONB)
@@ -384,10 +427,17 @@ class QuestionnaireSubmissions(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
     questionnaire_type: Mapped[str] = mapped_column(Text)
-    submitted_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+    # ключ keyset-пагинации списка опросов пациента — без NULL
+    submitted_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False
+    )
     patient_id: Mapped[Optional[int]] = mapped_column(BigInteger)
     responses: Mapped[Optional[dict]] = mapped_column(JSONB)
     total_met_minutes: Mapped[Optional[float]] = mapped_column(Double)
+    # состояние инкрементального подсчёта MET (met_calculator.add_answer_met_minutes):
+    # question_order последнего ответа и его days_per_week, если он ждёт пару
+    met_last_order: Mapped[Optional[int]] = mapped_column(Integer)
+    met_pending_days: Mapped[Optional[int]] = mapped_column(Integer)
 
     patient: Mapped[Optional['Patients']] = relationship('Patients', back_populates='questionnaire_submissions')
     questionnaire_answers: Mapped[List['QuestionnaireAnswers']] = relationship('QuestionnaireAnswers',
@@ -454,6 +504,9 @@ class Meals(Base):
 
 class Notifications(Base):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("NOT is_read")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[uuid.UUID] = mapped_column(
@@ -0,0 +1,47 @@
+"""
+Выдача id пациентов из последовательности patient_id_seq блоками.
+
+Процесс резервирует сразу `block_size` значений одним запросом
+(`nextval` по generate_series) и раздаёт их локально, поэтому создание
+пациента не требует проб по таблице, а выборка id из БД амортизируется
+до одного запроса на блок. Значения nextval уникальны между процессами;
+неиспользованный остаток блока при перезапуске просто теряется (дыры в
+нумерации допустимы). После fork дочерний процесс берёт свой блок.
+"""
+import os
+import threading
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+DEFAULT_BLOCK_SIZE = int(os.getenv("PATIENT_ID_BLOCK_SIZE", 50))
+
+_RESERVE_SQL = text("SELECT nextval('patient_id_seq') FROM generate_series(1, :n)")
+
+
+class PatientIdAllocator:
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._ids: List[int] = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _reserve(self, session: Session, n: int) -> List[int]:
+        return list(session.scalars(_RESERVE_SQL, {"n": n}))
+
+    def next_id(self, session: Session) -> int:
+        with self._lock:
+            if self._pid != os.getpid():  # блок родителя после fork не используем
+                self._ids, self._pid = [], os.getpid()
+            if not self._ids:
+                # разворачиваем, чтобы pop() отдавал id по возрастанию
+                self._ids = self._reserve(session, self.block_size)[::-1]
+            return self._ids.pop()
+
+    def take(self, session: Session, n: int) -> List[int]:
+        """`n` id одним запросом, мимо локального блока (массовый импорт)."""
+        return self._reserve(session, n) if n else []
+
+
+patient_id_allocator = PatientIdAllocator()
@@ -0,0 +1,178 @@
+"""
+Пул соединений: параметры из PoolSettings, метрики и проверка живости.
+
+`InstrumentedQueuePool` замеряет ожидание свободного соединения (время в
+`_do_get`) и таймауты; события пула считают checkout/checkin, новые
+соединения и инвалидации, события движка — коммиты и откаты. Снимок
+отдаёт /internal/metrics/db-pool.
+
+Проверка живости (DB_POOL_LIVENESS):
+- pre_ping — штатный `pool_pre_ping`, лишний round trip на каждый checkout;
+- idle — пинг только соединения, простоявшего в пуле дольше
+  DB_POOL_IDLE_CHECK секунд; мёртвое соединение отбрасывается через
+  DisconnectionError, и пул сам берёт/открывает следующее;
+- none — без проверки (ошибку обработает первый запрос).
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config.settings import PoolSettings
+
+_LAST_USED = "last_used"
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.liveness_pings = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.overflow_max = 0
+
+    def record_wait(self, seconds: float, overflow: int) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.overflow_max = max(self.overflow_max, overflow)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "commits": self.commits,
+                "rollbacks": self.rollbacks,
+                "liveness_pings": self.liveness_pings,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                "wait_seconds_avg": round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "overflow_max": self.overflow_max,
+            }
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            **counters,
+        }
+
+
+class _InstrumentedMixin:
+    metrics: PoolMetrics
+
+    def __init__(self, *args, metrics: PoolMetrics = None, **kw):
+        super().__init__(*args, **kw)
+        self.metrics = metrics or PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.incr("timeouts")
+            raise
+        self.metrics.record_wait(time.perf_counter() - started, max(self.overflow(), 0))
+        return conn
+
+    def recreate(self):
+        # engine.dispose() пересоздаёт пул — счётчики переносим в новый
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(settings: PoolSettings, asyncio: bool = False) -> Dict[str, Any]:
+    """kwargs для create_engine/create_async_engine."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_liveness == "pre_ping",
+    }
+
+
+def _ping(dbapi_connection) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def instrument(engine, settings: PoolSettings) -> None:
+    """Вешает счётчики и idle-проверку живости на пул движка (sync или async)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    idle_check = settings.db_pool_idle_check if settings.db_pool_liveness == "idle" else None
+
+    def metrics() -> PoolMetrics:
+        return sync_engine.pool.metrics
+
+    @event.listens_for(sync_engine, "connect")
+    def _connect(dbapi_connection, record):
+        record.info[_LAST_USED] = time.monotonic()
+        metrics().incr("connects")
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, record, proxy):
+        metrics().incr("checkouts")
+        if idle_check is None:
+            return
+        if time.monotonic() - record.info.get(_LAST_USED, 0.0) < idle_check:
+            return
+        metrics().incr("liveness_pings")
+        try:
+            _ping(dbapi_connection)
+        except Exception:
+            # пул инвалидирует запись и повторит checkout с новым соединением
+            raise exc.DisconnectionError()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, record):
+        record.info[_LAST_USED] = time.monotonic()
+        metrics().incr("checkins")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _invalidate(dbapi_connection, record, exception):
+        metrics().incr("invalidations")
+
+    @event.listens_for(sync_engine, "commit")
+    def _commit(conn):
+        metrics().incr("commits")
+
+    @event.listens_for(sync_engine, "rollback")
+    def _rollback(conn):
+        metrics().incr("rollbacks")
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    pool = getattr(engine, "sync_engine", engine).pool
+    return pool.metrics.snapshot(pool)
@@ -0,0 +1,80 @@
+"""
+Маршрутизация чтений на реплики.
+
+Методы репозиториев, помеченные `@read_only`, выполняются на реплике
+(round-robin по DATABASE_REPLICA_URLS); всё остальное, включая flush и
+INSERT/UPDATE/DELETE, идёт на primary. Без реплик поведение прежнее.
+
+Реплика выбирается один раз на транзакцию сессии и закрепляется в
+`session.info` до коммита/отката: запросы одной единицы работы (COUNT и
+страница пагинации, set_config и поиск) видят один и тот же снимок, а не
+реплики с разным отставанием.
+
+Read-your-writes: состояние запроса (`RoutingState`) хранится в contextvar.
+Если в этом запросе уже была запись или клиент писал недавно (см.
+app/handlers/middleware.py), чтения тоже идут на primary.
+"""
+import functools
+import itertools
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.sql.dml import UpdateBase
+
+READ_ONLY = "read_only"
+_REPLICA = "replica"
+
+
+@dataclass
+class RoutingState:
+    sticky: bool = False  # клиент писал в пределах окна DB_REPLICA_STICKY_SECONDS
+    wrote: bool = False   # запись в текущем запросе
+
+
+routing_state: ContextVar[Optional[RoutingState]] = ContextVar("routing_state", default=None)
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kw):
+        super().__init__(*args, **kw)
+        self._replicas = itertools.cycle(replicas) if replicas else None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        state = routing_state.get()
+        if self._flushing or isinstance(clause, UpdateBase):
+            if state is not None:
+                state.wrote = True
+        elif self._replicas is not None and self.info.get(READ_ONLY):
+            if state is None or not (state.sticky or state.wrote):
+                return self._replica()
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def _replica(self) -> Engine:
+        replica = self.info.get(_REPLICA)
+        if replica is None:
+            replica = self.info[_REPLICA] = next(self._replicas)
+        return replica
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _unpin_replica(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_REPLICA, None)
+
+
+def read_only(method):
+    """Метод репозитория только читает — его запросы можно отдать реплике."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kw):
+        info = self.session.info
+        previous = info.get(READ_ONLY, False)
+        info[READ_ONLY] = True
+        try:
+            return method(self, *args, **kw)
+        finally:
+            info[READ_ONLY] = previous
+    return wrapper
@@ -3,6 +3,11 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.config.settings import get_pool_settings
+from app.infrastructure.db.pool import engine_options, instrument
+from app.infrastructure.db.routing import RoutingSession
+from app.infrastructure.db.unit_of_work import unit_of_work
+
 load_dotenv()  # Загружает из .env в переменные окружения
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -10,23 +15,31 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env file!")
 
+pool_settings = get_pool_settings()
+
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
     future=True,
+    **engine_options(pool_settings),
 )
+instrument(engine, pool_settings)
+
+replica_engines = [create_engine(url, future=True, **engine_options(pool_settings))
+                   for url in pool_settings.replica_urls]
+for replica in replica_engines:
+    instrument(replica, pool_settings)
 
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
     bind=engine,
+    replicas=replica_engines,
     autocommit=False,
     autoflush=False,
     future=True,
 )
 
 def get_db():
-    """FastAPI dependency: открывает сессию и гарантированно её закрывает."""
-    db = SessionLocal()
-    try:
+    """FastAPI dependency: unit of work запроса — один коммит после обработчика,
+    откат, если обработчик завершился исключением (в т.ч. HTTPException)."""
+    with unit_of_work(SessionLocal) as db:
         yield db
-    finally:
-        db.close()
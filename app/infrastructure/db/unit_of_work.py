@@ -0,0 +1,46 @@
+"""
+Unit of work: транзакцией владеет граница запроса (get_db) или задачи,
+а не репозитории.
+
+Репозитории только добавляют/изменяют объекты и при необходимости делают
+`flush()` (чтобы получить id); коммит — один на выходе из `unit_of_work`,
+откат — при любом исключении. Побочные эффекты, которые должны случиться
+только после фиксации (сброс кэшей), регистрируются через `on_commit`.
+"""
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_ON_COMMIT = "on_commit"
+
+
+@contextmanager
+def unit_of_work(session_factory: Callable[[], Session]) -> Iterator[Session]:
+    session = session_factory()
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def on_commit(session: Session, callback: Callable[[], None]) -> None:
+    """Вызвать `callback` после успешного коммита текущей транзакции сессии."""
+    session.info.setdefault(_ON_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session: Session) -> None:
+    for callback in session.info.pop(_ON_COMMIT, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_on_commit(session: Session, previous_transaction) -> None:
+    if not session.in_transaction():
+        session.info.pop(_ON_COMMIT, None)
@@ -1,22 +1,25 @@
-from typing import Type
 from uuid import UUID
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.infrastructure.db.models import ProfileChangeRequests, Notifications
+from app.domain.models.pagination import Page, PageParams
+from app.domain.models.users import NotificationRecipients
+
+from app.infrastructure.db.models import ProfileChangeRequests
+from app.infrastructure.db.routing import read_only
 from app.domain.repositories.admin_repository_interface import IAdminRepository
+from app.infrastructure.repositories import notifications
+from app.infrastructure.repositories.pagination import paginate
 
 class AdminRepository(IAdminRepository):
     def __init__(self, session: Session):
         self.session = session
 
-    def list_requests(self) -> list[Type[ProfileChangeRequests]]:
-        return (
-            self.session
-            .query(ProfileChangeRequests)
-            .order_by(ProfileChangeRequests.submitted_at.desc())
-            .all()
-        )
+    @read_only
+    def list_requests(self, page: PageParams) -> Page:
+        R = ProfileChangeRequests
+        return paginate(self.session, select(R), [R.submitted_at, R.id], page, descending=True, scalars=True)
 
     def update_request_status(
             self, request_id: UUID, status: str, admin_id: UUID
@@ -26,11 +29,10 @@ class AdminRepository(IAdminRepository):
             raise ValueError("Request not found")
         req.status = status
         req.reviewed_by = admin_id
-        self.session.commit()
         return req
 
     def create_notification(self, user_id: UUID, message: str) -> int:
-        notif = Notifications(user_id=user_id, message=message)
-        self.session.add(notif)
-        self.session.commit()
-        return notif.id
+        return notifications.create_notification(self.session, user_id, message)
+
+    def broadcast_notification(self, recipients: NotificationRecipients, message: str) -> int:
+        return notifications.fan_out(self.session, recipients, message)
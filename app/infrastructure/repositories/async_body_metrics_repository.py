@@ -0,0 +1,23 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.repositories.body_metrics_repository_interface import IAsyncBodyMetricsRepository
+from app.infrastructure.repositories.body_metrics_repository import BodyMetricsRepository
+
+
+class AsyncBodyMetricsRepository(IAsyncBodyMetricsRepository):
+    """Чтения последних метрик через AsyncSession (запросы — из BodyMetricsRepository)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_latest_metrics(self, patient_id: int) -> Optional[Dict[str, Any]]:
+        row = (await self.session.execute(BodyMetricsRepository._latest_one_query(patient_id))).first()
+        return dict(row._mapping) if row else None
+
+    async def get_latest_metrics_many(self, patient_ids: List[int]) -> List[Dict[str, Any]]:
+        if not patient_ids:
+            return []
+        rows = (await self.session.execute(BodyMetricsRepository._latest_many_query(patient_ids))).all()
+        return [dict(r._mapping) for r in rows]
@@ -0,0 +1,36 @@
+import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.pagination import Page, PageParams
+from app.domain.models.patient import PatientRead
+from app.domain.repositories.patient_repository_interface import AbstractAsyncPatientRepository
+from app.infrastructure.db.models import Patients
+from app.infrastructure.repositories.pagination import paginate_async
+from app.infrastructure.repositories.patient_repository import PATIENT_COLUMNS, patients_from_rows
+
+
+class AsyncPatientRepository(AbstractAsyncPatientRepository):
+    """Чтения пациентов через AsyncSession — те же проекции, что и в PatientRepository."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, patient_id: int) -> Optional[PatientRead]:
+        row = (await self.session.execute(
+            select(*PATIENT_COLUMNS).where(Patients.id == patient_id)
+        )).first()
+        return patients_from_rows([row])[0] if row else None
+
+    async def get_versioned(self, patient_id: int) -> Optional[Tuple[PatientRead, Optional[datetime.datetime]]]:
+        row = (await self.session.execute(
+            select(*PATIENT_COLUMNS, Patients.updated_at).where(Patients.id == patient_id)
+        )).first()
+        return (patients_from_rows([row[:-1]])[0], row.updated_at) if row else None
+
+    async def list_all(self, page: PageParams) -> Page[PatientRead]:
+        result = await paginate_async(self.session, select(*PATIENT_COLUMNS), [Patients.id], page)
+        result.items = patients_from_rows(result.items)
+        return result
@@ -0,0 +1,49 @@
+import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.pagination import Page, PageParams
+from app.domain.repositories.questionnaire_repository_interface import IAsyncQuestionnaireRepository
+from app.infrastructure.db.models import Questionnaires, QuestionnaireSubmissions
+from app.infrastructure.repositories.pagination import paginate_async
+from app.infrastructure.repositories.questionnaire_repository import questions_from_rows, questions_select
+
+QUESTIONNAIRE_COLUMNS = (Questionnaires.id, Questionnaires.name, Questionnaires.type)
+
+
+class AsyncQuestionnaireRepository(IAsyncQuestionnaireRepository):
+    """Чтения опросников и submissions через AsyncSession."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_questionnaires(self, page: PageParams) -> Page[Dict[str, Any]]:
+        result = await paginate_async(self.session, select(*QUESTIONNAIRE_COLUMNS), [Questionnaires.id], page)
+        result.items = [row._asdict() for row in result.items]
+        return result
+
+    async def get_questionnaire(self, questionnaire_id: int) -> Dict[str, Any] | None:
+        row = (await self.session.execute(
+            select(*QUESTIONNAIRE_COLUMNS).where(Questionnaires.id == questionnaire_id)
+        )).first()
+        return row._asdict() if row else None
+
+    async def get_questionnaire_version(self, questionnaire_id: int) -> Optional[datetime.datetime]:
+        row = (await self.session.execute(
+            select(Questionnaires.updated_at).where(Questionnaires.id == questionnaire_id)
+        )).first()
+        return row.updated_at if row else None
+
+    async def list_questions(self, questionnaire_id: int) -> List[Dict[str, Any]]:
+        rows = (await self.session.execute(questions_select(questionnaire_id))).all()
+        return questions_from_rows(rows)
+
+    async def get_submissions_by_patient(self, patient_id: int, page: PageParams) -> Page[Dict[str, Any]]:
+        S = QuestionnaireSubmissions
+        stmt = (select(S.id, S.patient_id, S.questionnaire_type, S.responses, S.total_met_minutes, S.submitted_at)
+                .where(S.patient_id == patient_id))
+        result = await paginate_async(self.session, stmt, [S.submitted_at, S.id], page, descending=True)
+        result.items = [row._asdict() for row in result.items]
+        return result
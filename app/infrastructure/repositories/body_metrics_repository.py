@@ -1,12 +1,17 @@
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.domain.repositories.body_metrics_repository_interface import IBodyMetricsRepository
-from app.infrastructure.db.models import Anthropometries
+from app.infrastructure.db.models import Anthropometries, BodyMetrics
+from app.infrastructure.db.routing import read_only
 from app.services.metrics_recalculator import recompute_body_metrics
 
+# при равном measured_at «последняя» — с большим id, одинаково для одного и многих пациентов
+_LATEST_FIRST = (Anthropometries.measured_at.desc(), Anthropometries.id.desc())
+
 
 class BodyMetricsRepository(IBodyMetricsRepository):  # 👈 наследуем интерфейс
     def __init__(self, session: Session):
@@ -23,6 +28,42 @@ class BodyMetricsRepository(IBodyMetricsRepository):  # 👈 наследуем
         bsa = ((height_cm * weight_kg) / 3600) ** 0.5
         return {"bmi": bmi, "bsa": bsa}
 
+    @staticmethod
+    def _latest_query():
+        """Явная проекция anthropometries ⊕ body_metrics — без ORM-объектов и __dict__."""
+        return (
+            select(
+                Anthropometries.id,
+                Anthropometries.patient_id,
+                Anthropometries.height_cm,
+                Anthropometries.weight_kg,
+                Anthropometries.measured_at,
+                Anthropometries.waist_cm,
+                Anthropometries.hip_cm,
+                BodyMetrics.bmi,
+                BodyMetrics.bsa,
+                BodyMetrics.ideal_weight,
+                BodyMetrics.bmr,
+                BodyMetrics.method_bmr,
+                BodyMetrics.method_bsa,
+            )
+            .outerjoin(BodyMetrics, BodyMetrics.anthropometry_id == Anthropometries.id)
+        )
+
+    @classmethod
+    def _latest_one_query(cls, patient_id: int):
+        return (cls._latest_query()
+                .where(Anthropometries.patient_id == patient_id)
+                .order_by(*_LATEST_FIRST)
+                .limit(1))
+
+    @classmethod
+    def _latest_many_query(cls, patient_ids: List[int]):
+        return (cls._latest_query()
+                .where(Anthropometries.patient_id.in_(patient_ids))
+                .distinct(Anthropometries.patient_id)
+                .order_by(Anthropometries.patient_id, *_LATEST_FIRST))
+
     # ────────────────────────────────────────────────────────
     # public API
     # ────────────────────────────────────────────────────────
@@ -34,10 +75,9 @@ class BodyMetricsRepository(IBodyMetricsRepository):  # 👈 наследуем
 
         self.session.refresh(anthropometry, attribute_names=["patient"])  # ← .patient подгружается
         recompute_body_metrics(self.session, anthropometry)
-
-        self.session.commit()
         return anthropometry.id
 
+    @read_only
     def get_latest_metrics(
             self, patient_id: int
     ) -> Optional[Dict[str, Any]]:
@@ -46,28 +86,16 @@ class BodyMetricsRepository(IBodyMetricsRepository):  # 👈 наследуем
         `{..., "bmi": ..., "bsa": ..., ...}`
         (поля из обеих таблиц).
         """
-        record: Optional[Anthropometries] = (
-            self.session.query(Anthropometries)
-            .options(joinedload(Anthropometries.body_metrics))  # relationship зададим ниже
-            .filter_by(patient_id=patient_id)
-            .order_by(Anthropometries.measured_at.desc())
-            .first()
-        )
-        if not record:
-            return None
+        row = self.session.execute(self._latest_one_query(patient_id)).first()
+        return dict(row._mapping) if row else None
 
-        # convert SQLAlchemy obj → dict, объединяем
-        anth_dict = {
-            k: v
-            for k, v in record.__dict__.items()
-            if not k.startswith("_")
-        }
-        if record.body_metrics:
-            anth_dict.update(
-                {
-                    k: v
-                    for k, v in record.body_metrics.__dict__.items()
-                    if not k.startswith("_") and k != "id"
-                }
-            )
-        return anth_dict
+    @read_only
+    def get_latest_metrics_many(
+            self, patient_ids: List[int]
+    ) -> List[Dict[str, Any]]:
+        """Последние записи для многих пациентов одним `DISTINCT ON (patient_id)`
+        (индекс ix_anthropometries_patient_id_measured_at)."""
+        if not patient_ids:
+            return []
+        rows = self.session.execute(self._latest_many_query(patient_ids)).all()
+        return [dict(r._mapping) for r in rows]
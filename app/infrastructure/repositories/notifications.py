@@ -0,0 +1,155 @@
+"""
+Запись уведомлений и счётчик непрочитанных `users.unread_notifications`.
+
+`fan_out` — рассылка по выборке получателей: строки вставляются одним
+INSERT ... SELECT, счётчики сдвигаются одним UPDATE, события подписчикам
+уходят одним запросом (на Postgres всё это — один запрос), так что число
+запросов не зависит от числа получателей.
+
+Счётчик меняется в той же транзакции, что и строки notifications, поэтому
+читать его дёшево и он не расходится с таблицей. Обе операции блокируют
+строку пользователя, так что параллельные создание и прочтение не теряют
+обновлений. Подписчики получают событие через `notify` после коммита.
+"""
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, Text, case, cast, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.domain.models.users import NotificationRecipients
+from app.infrastructure.db.models import Notifications, PatientUserLinks, Users
+from app.services.notification_hub import CHANNEL, MAX_PAYLOAD_BYTES, notify, notify_many
+
+
+def _shift_unread(session: Session, user_id: UUID, delta) -> Optional[int]:
+    counter = Users.unread_notifications
+    stmt = (
+        update(Users)
+        .where(Users.id == user_id)
+        .values(unread_notifications=delta(counter))
+        .returning(counter)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(stmt).scalar()
+
+
+def create_notification(session: Session, user_id: UUID, message: str) -> int:
+    row = session.execute(
+        insert(Notifications)
+        .values(user_id=user_id, message=message)
+        .returning(Notifications.id, Notifications.created_at)
+    ).one()
+    unread = _shift_unread(session, user_id, lambda counter: counter + 1)
+    notify(session, {
+        "type": "notification",
+        "user_id": str(user_id),
+        "id": row.id,
+        "message": message,
+        "created_at": row.created_at.isoformat(),
+        "unread": unread,
+    })
+    return row.id
+
+
+def recipients_query(recipients: NotificationRecipients) -> Select:
+    """id пользователей, подходящих под все заданные условия выборки."""
+    stmt = select(Users.id)
+    if recipients.role is not None:
+        stmt = stmt.where(Users.role == recipients.role)
+    if recipients.user_ids is not None:
+        stmt = stmt.where(Users.id.in_(recipients.user_ids))
+    if recipients.patient_id is not None:
+        stmt = stmt.where(Users.id.in_(
+            select(PatientUserLinks.user_id)
+            .where(PatientUserLinks.patient_id == recipients.patient_id, PatientUserLinks.status == 'active')
+        ))
+    return stmt
+
+
+def fan_out(session: Session, recipients: NotificationRecipients, message: str) -> int:
+    """Одно уведомление каждому получателю из выборки; возвращает число созданных."""
+    if session.get_bind().dialect.name == "postgresql":
+        return _fan_out_pg(session, recipients, message)
+    rows = session.execute(
+        insert(Notifications)
+        .from_select(["user_id", "message"], recipients_query(recipients).add_columns(literal(message)))
+        .returning(Notifications.id, Notifications.user_id, Notifications.created_at)
+    ).all()
+    if not rows:
+        return 0
+    counter = Users.unread_notifications
+    # по фактически вставленным строкам: повторная выборка могла бы разойтись с ними
+    unread = dict(session.execute(
+        update(Users)
+        .where(Users.id.in_([row.user_id for row in rows]))
+        .values(unread_notifications=counter + 1)
+        .returning(Users.id, counter)
+        .execution_options(synchronize_session=False)
+    ).all())
+    notify_many(session, ({
+        "type": "notification",
+        "user_id": str(row.user_id),
+        "id": row.id,
+        "message": message,
+        "created_at": row.created_at.isoformat(),
+        "unread": unread.get(row.user_id),
+    } for row in rows))
+    return len(rows)
+
+
+def _fan_out_pg(session: Session, recipients: NotificationRecipients, message: str) -> int:
+    """То же одним запросом: INSERT ... SELECT, UPDATE счётчиков и pg_notify в data-modifying CTE."""
+    inserted = (
+        insert(Notifications)
+        .from_select(["user_id", "message"], recipients_query(recipients).add_columns(literal(message)))
+        .returning(Notifications.id, Notifications.user_id, Notifications.created_at)
+        .cte("inserted")
+    )
+    counted = (
+        update(Users)
+        .where(Users.id == inserted.c.user_id)
+        .values(unread_notifications=Users.unread_notifications + 1)
+        .returning(Users.id.label("user_id"), Users.unread_notifications.label("unread"),
+                   inserted.c.id, inserted.c.created_at)
+        .cte("counted")
+    )
+    # длинный текст в событие не помещается (лимит NOTIFY) — клиент дочитает его из списка
+    event_message = message if len(message.encode()) < MAX_PAYLOAD_BYTES // 2 else None
+    payload = func.json_build_object(
+        "type", "notification",
+        "user_id", counted.c.user_id,
+        "id", counted.c.id,
+        "message", literal(event_message, Text),
+        "created_at", counted.c.created_at,
+        "unread", counted.c.unread,
+    )
+    return session.scalar(
+        select(func.count(func.pg_notify(CHANNEL, cast(payload, Text)))).select_from(counted)
+    )
+
+
+def mark_read(session: Session, user_id: UUID,
+              ids: Optional[Sequence[int]] = None) -> Tuple[int, Optional[int]]:
+    """Отметить прочитанными `ids` (None — все); возвращает (отмечено, осталось непрочитанных)."""
+    stmt = (
+        update(Notifications)
+        .where(Notifications.user_id == user_id, Notifications.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if ids is not None:
+        stmt = stmt.where(Notifications.id.in_(ids))
+    marked = session.execute(stmt).rowcount
+    if not marked:
+        return 0, unread_count(session, user_id)
+    unread = _shift_unread(
+        session, user_id, lambda counter: case((counter > marked, counter - marked), else_=0)
+    )
+    notify(session, {"type": "unread", "user_id": str(user_id), "unread": unread})
+    return marked, unread
+
+
+def unread_count(session: Session, user_id: UUID) -> Optional[int]:
+    """None — пользователя нет."""
+    return session.scalar(select(Users.unread_notifications).where(Users.id == user_id))
@@ -0,0 +1,126 @@
+"""
+Keyset-пагинация с непрозрачным курсором.
+
+Курсор — base64(JSON) значений ключа сортировки последней записи страницы.
+Следующая страница выбирается условием `(k1, k2, …) > (v1, v2, …)` (или `<`
+при сортировке по убыванию), поэтому стоимость не зависит от номера страницы.
+
+Колонки ключа должны быть NOT NULL — тогда сравнение идёт по самим колонкам
+и использует индекс. Nullable-колонка сортируется как coalesce(колонка,
+минимум типа): NULL идут первыми по возрастанию и последними по убыванию, в
+курсоре NULL хранится как null. Такой ключ индекс по колонке уже не покрывает.
+"""
+import base64
+import datetime
+import json
+import uuid
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.domain.models.pagination import InvalidCursor, Page, PageParams
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return tuple(_load(col, v) for col, v in zip(columns, values))
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+# чем заменяется NULL в ключе сортировки nullable-колонки
+_NULL_SORTS_AS = {datetime.datetime: datetime.datetime.min, datetime.date: datetime.date.min}
+
+
+def _sort_key(column):
+    if not getattr(column.expression, "nullable", False):
+        return column, None
+    python_type = column.type.python_type
+    if python_type not in _NULL_SORTS_AS:
+        raise TypeError(f"Nullable sort column {column.key} of type {python_type.__name__} is not supported")
+    low = _NULL_SORTS_AS[python_type]
+    return func.coalesce(column, literal(low, column.type)), low
+
+
+def _page_statements(stmt: Select, sort_columns: Sequence, page: PageParams, descending: bool):
+    """(запрос страницы с LIMIT n+1, COUNT-запрос или None)."""
+    count = None
+    if page.with_total:
+        count = select(func.count()).select_from(stmt.order_by(None).subquery())
+    keys, lows = zip(*(_sort_key(c) for c in sort_columns))
+    key = tuple_(*keys)
+    if page.after:
+        values = decode_cursor(page.after, sort_columns)
+        if any(v is None and low is None for v, low in zip(values, lows)):
+            raise InvalidCursor("Invalid cursor")
+        values = tuple_(*(low if v is None else v for v, low in zip(values, lows)))
+        stmt = stmt.where(key < values if descending else key > values)
+    order = [k.desc() for k in keys] if descending else list(keys)
+    return stmt.order_by(*order).limit(page.limit + 1), count
+
+
+def _page(items: List[Any], sort_columns: Sequence, page: PageParams, total: Optional[int]) -> Page:
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        next_cursor = encode_cursor([getattr(items[-1], c.key) for c in sort_columns])
+    return Page(items=items, next_cursor=next_cursor, total=total)
+
+
+def paginate(session: Session, stmt: Select, sort_columns: Sequence, page: PageParams,
+             descending: bool = False, scalars: bool = False) -> Page:
+    """Одна страница `stmt` по ключу `sort_columns` (уникальному в совокупности).
+
+    `scalars=True` — для запросов ORM-сущностей; иначе возвращаются строки,
+    а запрос идёт напрямую через соединение, минуя ORM-обработку результата.
+    Значения ключа берутся у записи по имени колонки, поэтому ключевые
+    колонки должны присутствовать в выборке под своими именами.
+    """
+    stmt, count = _page_statements(stmt, sort_columns, page, descending)
+    total = session.scalar(count) if count is not None else None
+    if scalars:
+        items: List[Any] = session.execute(stmt).scalars().all()
+    else:
+        items = session.connection().execute(stmt).all()
+    return _page(items, sort_columns, page, total)
+
+
+async def paginate_async(session: AsyncSession, stmt: Select, sort_columns: Sequence, page: PageParams,
+                         descending: bool = False) -> Page:
+    """`paginate` для AsyncSession; только запросы колонок (строки)."""
+    stmt, count = _page_statements(stmt, sort_columns, page, descending)
+    total = await session.scalar(count) if count is not None else None
+    items = (await session.execute(stmt)).all()
+    return _page(items, sort_columns, page, total)
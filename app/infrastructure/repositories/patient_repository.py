@@ -1,22 +1,37 @@
-import random
-from typing import Optional, List
+import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.patient import PatientCreate, PatientRead
 from app.domain.repositories.patient_repository_interface import AbstractPatientRepository
 from app.infrastructure.db.models import Patients
+from app.infrastructure.db.routing import read_only
+from app.infrastructure.db.patient_ids import patient_id_allocator
+from app.infrastructure.repositories.pagination import paginate
+
+# Списки читаются проекцией этих колонок: строки без identity map и
+# инструментирования атрибутов, а список моделей валидируется одним вызовом.
+# Пропуск валидации (model_construct) не быстрее: время уходит на сами объекты
+# PatientRead (см. app/tests/benchmarks/bench_list_read_paths.py).
+PATIENT_COLUMNS = (Patients.id, Patients.full_name, Patients.birth_date, Patients.sex, Patients.place_of_residence)
+
+_PATIENT_FIELDS = tuple(c.key for c in PATIENT_COLUMNS)
+_PATIENT_LIST = TypeAdapter(List[PatientRead])
+
+
+def patients_from_rows(rows: Iterable) -> List[PatientRead]:
+    return _PATIENT_LIST.validate_python([dict(zip(_PATIENT_FIELDS, row)) for row in rows])
+
 
 class PatientRepository(AbstractPatientRepository):
     def __init__(self, session: Session):
         self.session = session
 
-    def generate_unique_patient_id(self) -> int:
-        while True:
-            new_id = random.randint(100000, 9999999)
-            if not self.session.query(Patients).get(new_id):
-                return new_id
-
     def create_patient(self, data: PatientCreate) -> int:
-        new_id = self.generate_unique_patient_id()
+        new_id = patient_id_allocator.next_id(self.session)
         patient = Patients(
             id=new_id,
             full_name=data.full_name,
@@ -25,14 +40,24 @@ class PatientRepository(AbstractPatientRepository):
             place_of_residence=data.place_of_residence
         )
         self.session.add(patient)
-        self.session.commit()
         return new_id
 
+    @read_only
     def get_by_id(self, patient_id: int) -> Optional[PatientRead]:
         p = self.session.query(Patients).get(patient_id)
         if not p: return None
         return PatientRead(**p.__dict__)
 
-    def list_all(self) -> List[PatientRead]:
-        xs = self.session.query(Patients).all()
-        return [PatientRead(**x.__dict__) for x in xs]
+    def get_versioned(self, patient_id: int) -> Optional[Tuple[PatientRead, Optional[datetime.datetime]]]:
+        # тело и версия — одной строкой с primary: с реплики пришла бы устаревшая
+        # пара (304 на старую копию, 404 на только что созданного пациента)
+        row = self.session.execute(
+            select(*PATIENT_COLUMNS, Patients.updated_at).where(Patients.id == patient_id)
+        ).first()
+        return (patients_from_rows([row[:-1]])[0], row.updated_at) if row else None
+
+    @read_only
+    def list_all(self, page: PageParams) -> Page[PatientRead]:
+        result = paginate(self.session, select(*PATIENT_COLUMNS), [Patients.id], page)
+        result.items = patients_from_rows(result.items)
+        return result
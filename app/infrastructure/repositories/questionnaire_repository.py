@@ -1,7 +1,10 @@
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import NoResultFound
+import datetime
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from app.infrastructure.db.models import (
     Questionnaires,
@@ -9,27 +12,93 @@ from app.infrastructure.db.models import (
     QuestionnaireSubmissions,
     QuestionnaireAnswers,
 )
+from app.infrastructure.db.routing import read_only
+from app.infrastructure.db.unit_of_work import on_commit
 from app.domain.models.questionnaire import (
     QuestionnaireCreate, QuestionnaireUpdate,
     QuestionCreate, QuestionUpdate, QuestionnaireRead, QuestionRead
 )
+from app.domain.models.pagination import Page, PageParams
 from app.domain.repositories.questionnaire_repository_interface import IQuestionnaireRepository
-from app.services.met_calculator import update_submission_met_minutes
+from app.infrastructure.repositories.pagination import paginate
+from app.services.met_calculator import add_answer_met_minutes, recompute_submission_met_minutes
+from app.services.question_meta import question_meta_cache
+from app.services.template_cache import QuestionnaireTemplate, template_cache
+
+# колонки QuestionRead — списки вопросов читаются проекцией, без ORM-объектов
+QUESTION_COLUMNS = (
+    QuestionnaireQuestions.id, QuestionnaireQuestions.questionnaire_id, QuestionnaireQuestions.question_text,
+    QuestionnaireQuestions.question_order, QuestionnaireQuestions.answers_json,
+    QuestionnaireQuestions.food_group_id, QuestionnaireQuestions.portion_description,
+)
+_QUESTION_FIELDS = tuple(c.key for c in QUESTION_COLUMNS)
+
+
+def questions_select(questionnaire_id: int):
+    """Вопросы опросника в порядке формы — общий запрос для sync- и async-репозитория."""
+    return (select(*QUESTION_COLUMNS)
+            .where(QuestionnaireQuestions.questionnaire_id == questionnaire_id)
+            .order_by(QuestionnaireQuestions.question_order, QuestionnaireQuestions.id))
+
+
+def questions_from_rows(rows) -> List[Dict[str, Any]]:
+    return [dict(zip(_QUESTION_FIELDS, row)) for row in rows]
+
+_QUESTION_LIST = TypeAdapter(List[QuestionRead])
+
 
 class QuestionnaireRepository(IQuestionnaireRepository):
     def __init__(self, session: Session):
         self.session = session
 
+    # — кэш шаблонов —
+    # Шаблоны и вопросы читаются через template_cache и грузятся с primary (без
+    # @read_only): с отстающей реплики в кэш могла бы попасть старая версия.
+    def _load_template(self, questionnaire_id: int) -> QuestionnaireTemplate | None:
+        conn = self.session.connection()
+        q = conn.execute(
+            select(Questionnaires.id, Questionnaires.name, Questionnaires.type, Questionnaires.updated_at)
+            .where(Questionnaires.id == questionnaire_id)
+        ).first()
+        if not q:
+            return None
+        rows = conn.execute(questions_select(questionnaire_id)).all()
+        return QuestionnaireTemplate(q._asdict(), questions_from_rows(rows))
+
+    def _template(self, questionnaire_id: int) -> QuestionnaireTemplate | None:
+        return template_cache.get(self.session, questionnaire_id, lambda: self._load_template(questionnaire_id))
+
+    def _touch(self, *questionnaire_ids: Optional[int]) -> None:
+        """Вопросы — часть шаблона: их изменение сдвигает updated_at (ETag) опросника."""
+        ids = {qid for qid in questionnaire_ids if qid is not None}
+        if ids:
+            self.session.execute(
+                update(Questionnaires).where(Questionnaires.id.in_(ids)).values(updated_at=func.now()),
+                execution_options={"synchronize_session": False},
+            )
+
+    def _templates_changed(self, invalidate_meta=None) -> None:
+        """После коммита: сбросить кэш шаблонов (и общую версию) и, если нужно, кэш MET-классификации."""
+        engine = self.session.get_bind()
+        if invalidate_meta is not None:
+            on_commit(self.session, invalidate_meta)
+        on_commit(self.session, lambda: template_cache.invalidate(engine))
+
     # — шаблоны —
     def create_questionnaire(self, data: QuestionnaireCreate) -> int:
         q = Questionnaires(name=data.name, type=data.type)
         self.session.add(q)
-        self.session.commit()
+        self.session.flush()
+        self._templates_changed()
         return q.id
 
     def get_questionnaire(self, questionnaire_id: int) -> QuestionnaireRead | None:
-        q = self.session.get(Questionnaires, questionnaire_id)
-        return q.__dict__ if q else None
+        template = self._template(questionnaire_id)
+        return template.questionnaire if template else None
+
+    def get_questionnaire_version(self, questionnaire_id: int) -> Optional[datetime.datetime]:
+        template = self._template(questionnaire_id)
+        return template.questionnaire["updated_at"] if template else None
 
     def update_questionnaire(self, questionnaire_id: int, data: QuestionnaireUpdate) -> None:
         q = self.session.get(Questionnaires, questionnaire_id)
@@ -37,53 +106,56 @@ class QuestionnaireRepository(IQuestionnaireRepository):
             raise NoResultFound()
         for field, val in data.dict(exclude_unset=True).items():
             setattr(q, field, val)
-        self.session.commit()
+        self._templates_changed()
 
     def delete_questionnaire(self, questionnaire_id: int) -> None:
         q = self.session.get(Questionnaires, questionnaire_id)
         if not q:
             raise NoResultFound()
         self.session.delete(q)
-        self.session.commit()
+        self._templates_changed(question_meta_cache.invalidate)  # вопросы удалены каскадом
 
-    def list_questionnaires(self) -> List[Dict[str, Any]]:
-        qs = self.session.query(Questionnaires).all()
-        return [q.__dict__ for q in qs]
+    @read_only
+    def list_questionnaires(self, page: PageParams) -> Page[Dict[str, Any]]:
+        stmt = select(Questionnaires.id, Questionnaires.name, Questionnaires.type)
+        result = paginate(self.session, stmt, [Questionnaires.id], page)
+        result.items = [row._asdict() for row in result.items]
+        return result
 
     # — вопросы —
     def create_question(self, data: QuestionCreate) -> int:
         qq = QuestionnaireQuestions(**data.dict())
         self.session.add(qq)
-        self.session.commit()
+        self.session.flush()
+        self._touch(qq.questionnaire_id)
+        self._templates_changed()
         return qq.id
 
     def get_questions(self, questionnaire_id: int) -> List[QuestionRead]:
-        qs = (
-            self.session.query(QuestionnaireQuestions)
-            .filter_by(questionnaire_id=questionnaire_id)
-            .order_by(QuestionnaireQuestions.question_order)
-            .all()
-        )
-        return [QuestionRead(**q.__dict__) for q in qs]
+        template = self._template(questionnaire_id)
+        return _QUESTION_LIST.validate_python(template.questions if template else [])
 
     def update_question(self, question_id: int, data: QuestionUpdate) -> None:
         qq = self.session.get(QuestionnaireQuestions, question_id)
         if not qq:
             raise NoResultFound()
+        previous = qq.questionnaire_id
         for field, val in data.dict(exclude_unset=True).items():
             setattr(qq, field, val)
-        self.session.commit()
+        self._touch(previous, qq.questionnaire_id)
+        self._templates_changed()
 
     def delete_question(self, question_id: int) -> None:
         qq = self.session.get(QuestionnaireQuestions, question_id)
         if not qq:
             raise NoResultFound()
         self.session.delete(qq)
-        self.session.commit()
+        self._touch(qq.questionnaire_id)
+        self._templates_changed()
 
     def list_questions(self, questionnaire_id: int) -> List[Dict[str, Any]]:
-        qs = self.session.query(QuestionnaireQuestions).filter_by(questionnaire_id=questionnaire_id).all()
-        return [q.__dict__ for q in qs]
+        template = self._template(questionnaire_id)
+        return [dict(q) for q in template.questions] if template else []
 
     def get_question(self, question_id: int) -> Dict[str, Any]:
         q = self.session.get(QuestionnaireQuestions, question_id)
@@ -94,47 +166,79 @@ class QuestionnaireRepository(IQuestionnaireRepository):
     def create_question(self, data: QuestionCreate) -> int:
         q = QuestionnaireQuestions(**data.dict())
         self.session.add(q)
-        self.session.commit()
+        self.session.flush()
+        self._touch(q.questionnaire_id)
+        self._templates_changed()
         return q.id
 
     def update_question(self, question_id: int, data: QuestionUpdate) -> None:
         q = self.session.get(QuestionnaireQuestions, question_id)
         if not q:
             raise ValueError("Question not found")
+        previous = q.questionnaire_id
         for field, val in data.dict(exclude_unset=True).items():
             setattr(q, field, val)
-        self.session.commit()
+        self._touch(previous, q.questionnaire_id)
+        self._templates_changed(lambda: question_meta_cache.invalidate(question_id))
 
     def delete_question(self, question_id: int) -> None:
         q = self.session.get(QuestionnaireQuestions, question_id)
         if not q:
             raise ValueError("Question not found")
         self.session.delete(q)
-        self.session.commit()
+        self._touch(q.questionnaire_id)
+        self._templates_changed(lambda: question_meta_cache.invalidate(question_id))
 
     # ——— Submissions и Answers ——— (существующие) — версии без изменений —
     def create_submission(self, patient_id: int, questionnaire_type: str, responses: Dict[str, Any]) -> uuid.UUID:
         submission = QuestionnaireSubmissions(id=uuid.uuid4(), patient_id=patient_id,
                                               questionnaire_type=questionnaire_type, responses=responses)
         self.session.add(submission)
-        self.session.commit()
         return submission.id
 
-    def get_submissions_by_patient(self, patient_id: int) -> List[Dict[str, Any]]:
-        subs = self.session.query(QuestionnaireSubmissions).filter_by(patient_id=patient_id).all()
-        return [s.__dict__ for s in subs]
+    @read_only
+    def get_submissions_by_patient(self, patient_id: int, page: PageParams) -> Page[Dict[str, Any]]:
+        S = QuestionnaireSubmissions
+        stmt = (select(S.id, S.patient_id, S.questionnaire_type, S.responses, S.total_met_minutes, S.submitted_at)
+                .where(S.patient_id == patient_id))
+        result = paginate(self.session, stmt, [S.submitted_at, S.id], page, descending=True)
+        result.items = [row._asdict() for row in result.items]
+        return result
 
     def add_answer(self, submission_id: uuid.UUID, question_id: int, answer_data: Dict[str, Any]) -> int:
         answer_data.pop("question_id", None)
+        # блокируем submission: дельта MET — read-modify-write по total_met_minutes
+        submission = self.session.get(QuestionnaireSubmissions, submission_id, with_for_update=True)
         ans = QuestionnaireAnswers(submission_id=submission_id, question_id=question_id, **answer_data)
         self.session.add(ans)
         self.session.flush()  # сразу получить ID
 
         # 🔁 после добавления — обновляем total MET
-        submission = self.session.get(QuestionnaireSubmissions, submission_id)
         if submission:
-            all_answers = submission.questionnaire_answers
-            update_submission_met_minutes(self.session, submission_id, all_answers)
+            add_answer_met_minutes(self.session, submission, ans)
 
-        self.session.commit()
         return ans.id
+
+    def add_answers(self, submission_id: uuid.UUID, answers: List[Dict[str, Any]]) -> List[int]:
+        """Вставляет все ответы одним INSERT … RETURNING и считает MET один раз."""
+        submission = self.session.get(QuestionnaireSubmissions, submission_id, with_for_update=True)
+        if not submission:
+            raise ValueError("Submission not found")
+        columns = ("question_id", "days_per_week", "met_minutes", "frequency_eat")
+        rows = [
+            {"submission_id": submission_id, **{c: a.get(c) for c in columns}}
+            for a in answers
+        ]
+        ids = []
+        if rows:
+            ids = list(self.session.scalars(
+                insert(QuestionnaireAnswers).returning(QuestionnaireAnswers.id, sort_by_parameter_order=True),
+                rows,
+            ))
+        recompute_submission_met_minutes(self.session, submission_id)
+        return ids
+
+    def recompute_met_minutes(self, submission_id: uuid.UUID) -> float:
+        """Полный пересчёт MET по всем ответам (проверка инкрементального значения)."""
+        recompute_submission_met_minutes(self.session, submission_id)
+        return self.session.get(QuestionnaireSubmissions, submission_id).total_met_minutes
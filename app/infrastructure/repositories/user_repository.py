@@ -1,17 +1,39 @@
 import datetime
 import uuid
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-from sqlalchemy import func
+from sqlalchemy import Integer, cast, func, literal, literal_column, select
 from sqlalchemy.orm import Session
 
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.patient import PatientRead
 from app.domain.models.users import UserUpdate, ProfileChangeRequestCreate
 from app.domain.repositories.user_repository_interface import IUserRepository
 from app.infrastructure.db.models import (
     Users, ProfileChangeRequests, PatientUserLinks, Patients,
-    Anthropometries, QuestionnaireSubmissions, Notifications
+    Anthropometries, BodyMetrics, QuestionnaireSubmissions, Notifications
 )
+from app.infrastructure.db.routing import read_only
+from app.infrastructure.repositories import notifications
+from app.infrastructure.repositories.pagination import paginate
+from app.infrastructure.repositories.patient_repository import PATIENT_COLUMNS, patients_from_rows
+
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# порог word_similarity (для оператора <% в pg_trgm по умолчанию 0.6)
+SEARCH_SIMILARITY_THRESHOLD = 0.5
+# ростер не больше этого проверяется перебором, без GIN-индекса
+ROSTER_SCAN_LIMIT = 2000
+
+
+def search_key(column):
+    """Нормализованное ФИО — то же выражение, что в индексе ix_patients_full_name_trgm."""
+    return func.translate(func.lower(column), literal_column("'ё'"), literal_column("'е'"))
+
+
+def normalize_name(value: str) -> str:
+    return " ".join(value.lower().replace("ё", "е").split())
 
 
 class UserRepository(IUserRepository):
@@ -37,8 +59,6 @@ class UserRepository(IUserRepository):
             if value is not None:
                 setattr(user, field, value)
 
-        self.session.commit()
-
     def create_profile_change_request(
         self, user_id: str, request: ProfileChangeRequestCreate
     ) -> str:
@@ -50,7 +70,6 @@ class UserRepository(IUserRepository):
             submitted_at=datetime.datetime.utcnow()
         )
         self.session.add(req)
-        self.session.commit()
         return str(req.id)
 
     # --------------------------------------------------
@@ -68,71 +87,167 @@ class UserRepository(IUserRepository):
                 status='active'
             )
             self.session.add(link)
-        self.session.commit()
 
     def deactivate_patient_link(self, doctor_id: str, patient_id: int) -> None:
         link = self.session.get(PatientUserLinks, (doctor_id, patient_id))
         if not link:
             raise ValueError("Link not found")
         link.status = 'inactive'
-        self.session.commit()
 
-    def _base_query(self, doctor_id: str):
-        return (self.session.query(Patients)
+    def _patients_select(self, doctor_id: str):
+        """Проекция PATIENT_COLUMNS по активным пациентам доктора."""
+        return (select(*PATIENT_COLUMNS)
                 .join(PatientUserLinks,
                       (PatientUserLinks.patient_id == Patients.id)
                       & (PatientUserLinks.user_id == doctor_id)
                       & (PatientUserLinks.status == 'active')))
 
-    def list_patients(self, doctor_id: str) -> List[PatientRead]:
-        patients = self._base_query(doctor_id).all()
-        return [PatientRead(**p.__dict__) for p in patients]
-
+    @read_only
+    def list_patients(self, doctor_id: str, page: PageParams) -> Page[PatientRead]:
+        result = paginate(self.session, self._patients_select(doctor_id), [Patients.id], page)
+        result.items = patients_from_rows(result.items)
+        return result
+
+    @staticmethod
+    def _roster_size(conn, doctor_id: str) -> int:
+        """Число активных пациентов доктора, но не больше ROSTER_SCAN_LIMIT + 1."""
+        links = (select(PatientUserLinks.patient_id)
+                 .where(PatientUserLinks.user_id == doctor_id, PatientUserLinks.status == 'active')
+                 .limit(ROSTER_SCAN_LIMIT + 1).subquery())
+        return conn.execute(select(func.count()).select_from(links)).scalar_one()
+
+    @read_only
     def search_patients(self, doctor_id: str, filters: Dict[str, Any]) -> List[PatientRead]:
-        q = self._base_query(doctor_id)
-        if name := filters.get("full_name"):
-            q = q.filter(Patients.full_name.ilike(f"%{name}%"))
+        """Нечёткий поиск по ФИО среди пациентов доктора, лучшие совпадения первыми.
+
+        Запрос и ФИО сравниваются в нижнем регистре с ё → е. Запрос короче
+        трёх символов ищется как префикс, длиннее — по word_similarity из
+        pg_trgm (опечатки, перестановка слов, часть ФИО): каждое слово
+        запроса от трёх букв должно найтись в ФИО. Префикс и поиск по
+        большому ростеру используют GIN-индекс ix_patients_full_name_trgm;
+        ростер до ROSTER_SCAN_LIMIT пациентов дешевле перебрать.
+        """
+        stmt = self._patients_select(doctor_id)
         if bd := filters.get("birth_date"):
-            q = q.filter(Patients.birth_date == bd)
-        return [PatientRead(**p.__dict__) for p in q.all()]
-
-    def get_patient_stats(self, doctor_id: str, all_patients: bool=False) -> Dict[str, Any]:
-        if all_patients:
-            Sub = Patients.__table__
+            stmt = stmt.where(Patients.birth_date == bd)
+        if year_from := filters.get("birth_year_from"):
+            stmt = stmt.where(Patients.birth_date >= datetime.date(year_from, 1, 1))
+        if year_to := filters.get("birth_year_to"):
+            stmt = stmt.where(Patients.birth_date < datetime.date(year_to + 1, 1, 1))
+        limit = min(filters.get("limit") or SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+
+        query = normalize_name(filters.get("full_name") or "")
+        key = search_key(Patients.full_name)
+        # одно соединение на все запросы: set_config локален для транзакции
+        # этого соединения, на другой реплике порог бы не действовал
+        conn = self.session.connection()
+        if len(query) >= 3:
+            # по слову на условие: индекс пересекает их битовые карты, а весь
+            # запрос целиком совпал бы с каждым однофамильцем или тёзкой
+            words = [word for word in query.split() if len(word) >= 3] or [query]
+            patient_id = Patients.id
+            if self._roster_size(conn, doctor_id) <= ROSTER_SCAN_LIMIT:
+                # планировщик оценивает <% в ~100 строк и идёт по индексу через
+                # всю таблицу; MATERIALIZED не даёт ему и word_similarity
+                # проверять раньше, чем выбран ростер
+                roster = stmt.cte("roster").prefix_with("MATERIALIZED")
+                key, patient_id = search_key(roster.c.full_name), roster.c.id
+                stmt = select(roster).where(*(func.word_similarity(word, key) >= SEARCH_SIMILARITY_THRESHOLD
+                                              for word in words))
+            else:
+                conn.execute(select(func.set_config(
+                    "pg_trgm.word_similarity_threshold", str(SEARCH_SIMILARITY_THRESHOLD), True)))
+                stmt = stmt.where(*(literal(word).op("<%")(key) for word in words))
+            stmt = stmt.order_by(func.word_similarity(query, key).desc(), patient_id)
+        elif query:
+            stmt = stmt.where(key.startswith(query, autoescape=True)).order_by(key, Patients.id)
         else:
-            Sub = self._base_query(doctor_id).subquery()
-
-        count = self.session.query(func.count()).select_from(Sub).scalar()
-        avg_age = self.session.query(
-            func.avg(func.date_part('year', func.age(func.current_date(), Sub.c.birth_date)))
-        ).scalar()
-
-        avg_bmi = (self.session.query(func.avg(Anthropometries.bmi))
-                   .join(Sub, Anthropometries.patient_id == Sub.c.id)
-                   .scalar())
-
-        surveys = (self.session.query(func.count(QuestionnaireSubmissions.id))
-                   .join(Sub, QuestionnaireSubmissions.patient_id == Sub.c.id)
-                   .scalar())
+            stmt = stmt.order_by(Patients.id)
+        return patients_from_rows(conn.execute(stmt.limit(limit)).all())
+
+    @staticmethod
+    def _stats_query(scope):
+        """Статистика по группам `scope` (group_id, patient_id) одним запросом.
+
+        BMI и число опросов предагрегируются по пациенту (и только по
+        пациентам из scope), чтобы join не размножал строки пациентов.
+        """
+        patient_ids = select(scope.c.patient_id)
+        bmi = (select(Anthropometries.patient_id,
+                      func.sum(BodyMetrics.bmi).label("bmi_sum"),
+                      func.count(BodyMetrics.bmi).label("bmi_count"))
+               .join(BodyMetrics, BodyMetrics.anthropometry_id == Anthropometries.id)
+               .where(Anthropometries.patient_id.in_(patient_ids))
+               .group_by(Anthropometries.patient_id)
+               .subquery())
+        surveys = (select(QuestionnaireSubmissions.patient_id, func.count().label("surveys"))
+                   .where(QuestionnaireSubmissions.patient_id.in_(patient_ids))
+                   .group_by(QuestionnaireSubmissions.patient_id)
+                   .subquery())
+        return (
+            select(
+                scope.c.group_id,
+                func.count(Patients.id).label("total_patients"),
+                func.avg(func.date_part('year', func.age(func.current_date(), Patients.birth_date)))
+                .label("average_age"),
+                (func.sum(bmi.c.bmi_sum) / func.nullif(func.sum(bmi.c.bmi_count), 0)).label("average_bmi"),
+                cast(func.coalesce(func.sum(surveys.c.surveys), 0), Integer).label("total_surveys"),
+            )
+            .select_from(scope)
+            .outerjoin(Patients, Patients.id == scope.c.patient_id)
+            .outerjoin(bmi, bmi.c.patient_id == Patients.id)
+            .outerjoin(surveys, surveys.c.patient_id == Patients.id)
+            .group_by(scope.c.group_id)
+        )
 
+    @staticmethod
+    def _stats_row(row) -> Dict[str, Any]:
+        if row is None:
+            return {"total_patients": 0, "average_age": None, "average_bmi": None, "total_surveys": 0}
         return {
-            "total_patients": count or 0,
-            "average_age": avg_age,
-            "average_bmi": avg_bmi,
-            "total_surveys": surveys or 0
+            "total_patients": row.total_patients,
+            "average_age": row.average_age,
+            "average_bmi": row.average_bmi,
+            "total_surveys": row.total_surveys,
         }
 
-    def list_notifications(self, user_id: uuid.UUID) -> List[Dict[str, Any]]:
-        rows = (
-            self.session.query(Notifications)
-            .filter_by(user_id=user_id)
-            .order_by(Notifications.created_at.desc())
-            .all()
-        )
-        return [r.__dict__ for r in rows]
+    @read_only
+    def get_doctors_stats(self, doctor_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Статистика по активным пациентам всех докторов (или одного) — GROUP BY user_id."""
+        scope = (select(Users.id.label("group_id"), PatientUserLinks.patient_id)
+                 .select_from(Users)
+                 .outerjoin(PatientUserLinks, (PatientUserLinks.user_id == Users.id)
+                            & (PatientUserLinks.status == 'active')))
+        if doctor_id is None:
+            scope = scope.where(Users.role == 'doctor')
+        else:
+            scope = scope.where(Users.id == doctor_id)
+        rows = self.session.execute(self._stats_query(scope.cte("scope")))
+        return {str(row.group_id): self._stats_row(row) for row in rows}
+
+    @read_only
+    def get_patient_stats(self, doctor_id: str, all_patients: bool=False) -> Dict[str, Any]:
+        if all_patients:
+            scope = select(literal(0).label("group_id"), Patients.id.label("patient_id")).cte("scope")
+            return self._stats_row(self.session.execute(self._stats_query(scope)).first())
+        return self.get_doctors_stats(doctor_id).get(str(doctor_id), self._stats_row(None))
+
+    @read_only
+    def list_notifications(self, user_id: uuid.UUID, page: PageParams) -> Page[Dict[str, Any]]:
+        stmt = select(Notifications).where(Notifications.user_id == user_id)
+        result = paginate(self.session, stmt, [Notifications.created_at, Notifications.id], page,
+                          descending=True, scalars=True)
+        result.items = [r.__dict__ for r in result.items]
+        return result
+
+    @read_only
+    def get_unread_count(self, user_id: uuid.UUID) -> Optional[int]:
+        return notifications.unread_count(self.session, user_id)
+
+    def mark_notifications_read(self, user_id: uuid.UUID,
+                                ids: Optional[List[int]] = None) -> Tuple[int, Optional[int]]:
+        return notifications.mark_read(self.session, user_id, ids)
 
     # маленький хелпер, чтобы другие сервисы могли создавать уведомления
     def _create_notification(self, user_id: uuid.UUID, message: str) -> None:
-        note = Notifications(user_id=user_id, message=message)
-        self.session.add(note)
-        self.session.commit()
+        notifications.create_notification(self.session, user_id, message)
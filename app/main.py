@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from app.config.settings import get_settings
-from app.handlers import anthropometry, patients, users, questionnaires, doctors, admin, questions, submissions
+from app.handlers import anthropometry, patients, users, questionnaires, doctors, admin, questions, submissions, exports, internal
+from app.services.notification_hub import notification_hub
 
 settings = get_settings()
 
@@ -12,6 +13,24 @@ app = FastAPI(
     redoc_url=None  # 👈 Отключаем ReDoc, если не нужно
 )
 
+if settings.db_async:
+    # асинхронные GET-роуты регистрируются первыми и перекрывают синхронные;
+    # запись по-прежнему обслуживают синхронные роутеры ниже
+    from app.handlers.async_patients import router as async_patients
+    from app.handlers.async_anthropometry import router as async_anthropometry
+    from app.handlers.async_questionnaires import router as async_questionnaires
+    from app.infrastructure.db.async_session import async_engine
+
+    app.include_router(async_patients)
+    app.include_router(async_anthropometry)
+    app.include_router(async_questionnaires)
+    app.add_event_handler("shutdown", async_engine.dispose)
+
+if settings.replica_urls:
+    from app.handlers.middleware import ReplicaStickinessMiddleware
+
+    app.add_middleware(ReplicaStickinessMiddleware, sticky_seconds=settings.db_replica_sticky_seconds)
+
 app.include_router(patients)
 app.include_router(users)
 app.include_router(doctors)
@@ -20,6 +39,10 @@ app.include_router(questions)
 app.include_router(submissions)
 app.include_router(anthropometry)
 app.include_router(admin)
+app.include_router(exports)
+app.include_router(internal)
+
+app.add_event_handler("shutdown", notification_hub.close)
 
 
 
@@ -0,0 +1,110 @@
+"""
+Пакетный приём измерений с весов/ростомеров: NDJSON записей
+`{patient_id, height_cm, weight_kg, measured_at, waist_cm?, hip_cm?}`
+по многим пациентам.
+
+Записи валидируются потоково и обрабатываются пачками по CHUNK_ROWS, так
+что память не зависит от объёма входа. На пачку: пол и дата рождения всех
+её пациентов — одним запросом, метрики — одним векторным проходом
+(`compute_body_metrics_batch`), anthropometries и body_metrics — по одному
+multi-row INSERT. Записи неизвестных пациентов попадают в отчёт с номером.
+
+Ошибки проверки приходят по ходу чтения, а «пациент не найден» — при
+обработке пачки, то есть позже ошибок следующих записей. Поэтому в отчёт
+попадают первые MAX_REPORTED_ERRORS ошибок по номеру записи, а не по времени
+обнаружения. Вход не в UTF-8 — `InvalidEncoding`, приём прерывается целиком.
+
+Коммитит вызывающий (unit of work).
+"""
+import heapq
+import uuid
+from typing import IO, Dict, List, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.domain.models.anthropometry import AnthropometryIngestRecord, AnthropometryIngestReport
+from app.domain.models.imports import ImportRowError
+from app.infrastructure.db.models import Anthropometries, Patients
+from app.services.metrics_recalculator import compute_body_metrics_batch, upsert_body_metrics
+from app.services.patient_import import MAX_REPORTED_ERRORS, iter_validated
+
+# 8 параметров на строку body_metrics: 2000 строк укладываются в лимит bind-параметров
+CHUNK_ROWS = 2000
+
+_FIELDS = ("height_cm", "weight_kg", "measured_at", "waist_cm", "hip_cm")
+
+
+class _ErrorLog:
+    """Первые MAX_REPORTED_ERRORS ошибок по номеру записи (куча с наибольшим номером наверху)."""
+
+    def __init__(self, report: AnthropometryIngestReport):
+        self.report = report
+        self._heap: List[Tuple[int, List[str]]] = []
+
+    def add(self, row: int, errors: List[str]) -> None:
+        self.report.failed += 1
+        heapq.heappush(self._heap, (-row, errors))  # номера записей уникальны
+        if len(self._heap) > MAX_REPORTED_ERRORS:
+            heapq.heappop(self._heap)
+
+    def rows(self) -> List[ImportRowError]:
+        return [ImportRowError(row=-row, errors=errors) for row, errors in sorted(self._heap, reverse=True)]
+
+
+def _load_patients(session: Session, patient_ids) -> Dict[int, Tuple]:
+    rows = session.execute(
+        select(Patients.id, Patients.birth_date, Patients.sex).where(Patients.id.in_(set(patient_ids)))
+    )
+    return {row.id: (row.birth_date, row.sex) for row in rows}
+
+
+def ingest_chunk(session: Session, chunk: List[Tuple[int, AnthropometryIngestRecord]],
+                 report: AnthropometryIngestReport, errors: _ErrorLog) -> None:
+    patients = _load_patients(session, (record.patient_id for _, record in chunk))
+    rows = []
+    for row, record in chunk:
+        if record.patient_id not in patients:
+            errors.add(row, ["patient_id: Patient not found"])
+            continue
+        rows.append({"id": uuid.uuid4(), "patient_id": record.patient_id,
+                     **{name: getattr(record, name) for name in _FIELDS}})
+    if not rows:
+        return
+    # executemany по Core-таблице: драйвер склеивает строки в multi-row VALUES
+    # (insertmanyvalues), а скомпилированный INSERT берётся из кэша
+    session.execute(insert(Anthropometries.__table__), rows)
+    report.inserted += len(rows)
+
+    # без пола/даты рождения метрики не считаются (как и в metrics_backfill)
+    computable = [r for r in rows if None not in patients[r["patient_id"]]]
+    report.without_metrics += len(rows) - len(computable)
+    if not computable:
+        return
+    born, sex = zip(*(patients[r["patient_id"]] for r in computable))
+    metrics = compute_body_metrics_batch(
+        [r["height_cm"] for r in computable],
+        [r["weight_kg"] for r in computable],
+        [r["measured_at"].date() for r in computable],
+        born,
+        sex,
+    )
+    upsert_body_metrics(session, [r["id"] for r in computable], metrics)
+
+
+def ingest_anthropometries(session: Session, stream: IO[bytes]) -> AnthropometryIngestReport:
+    report = AnthropometryIngestReport(inserted=0, failed=0)
+    errors = _ErrorLog(report)
+    chunk: List[Tuple[int, AnthropometryIngestRecord]] = []
+    for row, result in iter_validated(stream, "ndjson", AnthropometryIngestRecord):
+        if not isinstance(result, AnthropometryIngestRecord):
+            errors.add(row, result)
+            continue
+        chunk.append((row, result))
+        if len(chunk) >= CHUNK_ROWS:
+            ingest_chunk(session, chunk, report, errors)
+            chunk = []
+    if chunk:
+        ingest_chunk(session, chunk, report, errors)
+    report.errors = errors.rows()
+    return report
@@ -0,0 +1,188 @@
+"""
+Потоковая выгрузка клинических данных пациентов в NDJSON/CSV.
+
+Одна плоская запись на антропометрию (вместе с body_metrics) и на
+submission, с полями пациента. Оба запроса читаются серверными курсорами
+(`yield_per`) в порядке patient_id и сливаются `heapq.merge`, поэтому
+записи одного пациента идут подряд, а память не зависит от объёма выгрузки.
+
+    python -m app.services.exporter --format csv [--doctor-id <uuid>] \
+        [--date-from 2025-01-01] [--date-to 2025-12-31] [--questionnaire-type nutrition] [-o out.csv]
+"""
+import argparse
+import csv
+import datetime
+import heapq
+import io
+import json
+import sys
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import literal, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import (
+    Anthropometries, BodyMetrics, PatientUserLinks, Patients, QuestionnaireSubmissions,
+)
+
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+COLUMNS = [
+    "record_type", "patient_id", "full_name", "birth_date", "sex",
+    "anthropometry_id", "measured_at", "height_cm", "weight_kg", "waist_cm", "hip_cm",
+    "bmi", "bsa", "bmr", "ideal_weight",
+    "submission_id", "questionnaire_type", "submitted_at", "total_met_minutes", "responses",
+]
+
+
+@dataclass
+class ExportFilters:
+    doctor_id: Optional[uuid.UUID] = None
+    date_from: Optional[datetime.date] = None
+    date_to: Optional[datetime.date] = None  # включительно
+    questionnaire_type: Optional[str] = None
+
+
+def _patient_columns():
+    return Patients.id.label("patient_id"), Patients.full_name, Patients.birth_date, Patients.sex
+
+
+def _for_doctor(stmt, filters: ExportFilters):
+    if filters.doctor_id is None:
+        return stmt
+    return stmt.join(PatientUserLinks, (PatientUserLinks.patient_id == Patients.id)
+                     & (PatientUserLinks.user_id == filters.doctor_id)
+                     & (PatientUserLinks.status == 'active'))
+
+
+def _in_range(column, filters: ExportFilters) -> list:
+    conditions = []
+    if filters.date_from:
+        conditions.append(column >= filters.date_from)
+    if filters.date_to:
+        conditions.append(column < filters.date_to + datetime.timedelta(days=1))
+    return conditions
+
+
+def anthropometry_query(filters: ExportFilters):
+    A, M = Anthropometries, BodyMetrics
+    stmt = (
+        select(literal("anthropometry").label("record_type"), *_patient_columns(),
+               A.id.label("anthropometry_id"), A.measured_at, A.height_cm, A.weight_kg, A.waist_cm, A.hip_cm,
+               M.bmi, M.bsa, M.bmr, M.ideal_weight)
+        .join(Patients, Patients.id == A.patient_id)
+        .outerjoin(M, M.anthropometry_id == A.id)
+        .where(*_in_range(A.measured_at, filters))
+        .order_by(A.patient_id, A.measured_at, A.id)
+    )
+    return _for_doctor(stmt, filters)
+
+
+def submission_query(filters: ExportFilters):
+    S = QuestionnaireSubmissions
+    stmt = (
+        select(literal("submission").label("record_type"), *_patient_columns(),
+               S.id.label("submission_id"), S.questionnaire_type, S.submitted_at, S.total_met_minutes,
+               S.responses)
+        .join(Patients, Patients.id == S.patient_id)
+        .where(*_in_range(S.submitted_at, filters))
+        .order_by(S.patient_id, S.submitted_at, S.id)
+    )
+    if filters.questionnaire_type:
+        stmt = stmt.where(S.questionnaire_type == filters.questionnaire_type)
+    return _for_doctor(stmt, filters)
+
+
+def _stream(session: Session, stmt) -> Iterator[Dict[str, Any]]:
+    for row in session.execute(stmt.execution_options(yield_per=YIELD_PER)):
+        yield row._asdict()
+
+
+def iter_records(session: Session, filters: ExportFilters) -> Iterator[Dict[str, Any]]:
+    """Записи всех пациентов, сгруппированные по patient_id."""
+    return heapq.merge(
+        _stream(session, anthropometry_query(filters)),
+        _stream(session, submission_query(filters)),
+        key=lambda r: r["patient_id"],
+    )
+
+
+def _default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, default=_default) + "\n"
+
+
+def iter_csv(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=COLUMNS, restval="")
+    writer.writeheader()
+    for record in records:
+        if record.get("responses") is not None:
+            record["responses"] = json.dumps(record["responses"], ensure_ascii=False, default=_default)
+        writer.writerow(record)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def _chunked(lines: Iterable[str], size: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Склеивает строки в куски ~`size` байт, чтобы не писать в сокет построчно."""
+    parts: List[bytes] = []
+    length = 0
+    for line in lines:
+        data = line.encode()
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b"".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def export(session: Session, filters: ExportFilters, fmt: str = "ndjson") -> Iterator[bytes]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    records = iter_records(session, filters)
+    return _chunked(iter_csv(records) if fmt == "csv" else iter_ndjson(records))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Выгрузка данных пациентов в NDJSON/CSV")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--doctor-id", type=uuid.UUID, default=None)
+    parser.add_argument("--date-from", type=datetime.date.fromisoformat, default=None)
+    parser.add_argument("--date-to", type=datetime.date.fromisoformat, default=None)
+    parser.add_argument("--questionnaire-type", default=None)
+    parser.add_argument("-o", "--output", default="-", help="файл; по умолчанию stdout")
+    args = parser.parse_args(argv)
+
+    from app.infrastructure.db.routing import READ_ONLY
+    from app.infrastructure.db.session import SessionLocal
+
+    filters = ExportFilters(args.doctor_id, args.date_from, args.date_to, args.questionnaire_type)
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        with SessionLocal(info={READ_ONLY: True}) as session:
+            for chunk in export(session, filters, args.format):
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
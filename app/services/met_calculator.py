@@ -1,52 +1,131 @@
 from decimal import Decimal
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.infrastructure.db.models import QuestionnaireAnswers
 from app.infrastructure.db.models import QuestionnaireSubmissions
+from app.services.question_meta import NO_QUESTION, SITTING_QUESTION_KEYWORDS, is_sedentary, question_meta_cache
 
-SITTING_QUESTION_KEYWORDS = [
-    "сколько времени в день вы обычно проводите сидя"
-]
+__all__ = ["compute_met_minutes", "update_submission_met_minutes", "recompute_submission_met_minutes",
+           "apply_answer", "add_answer_met_minutes", "SITTING_QUESTION_KEYWORDS", "is_sedentary"]
 
-__all__ = ["compute_met_minutes", "update_submission_met_minutes"]
-def is_sedentary(question_text: str) -> bool:
-    return any(kw.lower() in question_text.lower() for kw in SITTING_QUESTION_KEYWORDS)
 
+def _scan(items: Sequence[Tuple[bool, Optional[int], Optional[Decimal]]]) -> Tuple[Decimal, Optional[int]]:
+    """Проход по (sedentary, days_per_week, met_minutes), уже упорядоченным по question_order.
 
-def compute_met_minutes(answers: List[QuestionnaireAnswers]) -> float:
+    Возвращает сумму и days_per_week последнего ответа, если он ещё ждёт пару.
+    """
     total = Decimal("0.0")
-    paired = []
-
-    answers_sorted = sorted(answers, key=lambda a: a.question.question_order or 0)
+    pending = None
 
     i = 0
-    while i < len(answers_sorted):
-        ans = answers_sorted[i]
-        q_text = ans.question.question_text if ans.question else ""
+    while i < len(items):
+        sedentary, days_per_week, met_minutes = items[i]
 
-        if is_sedentary(q_text) and ans.met_minutes:
-            total += Decimal(ans.met_minutes) * 7
+        if sedentary and met_minutes:
+            total += Decimal(met_minutes) * 7
             i += 1
             continue
 
-        if ans.days_per_week and i + 1 < len(answers_sorted):
-            next_ans = answers_sorted[i + 1]
-            if next_ans.met_minutes:
-                total += Decimal(ans.days_per_week) * Decimal(next_ans.met_minutes)
+        if days_per_week and i + 1 < len(items):
+            next_met = items[i + 1][2]
+            if next_met:
+                total += Decimal(days_per_week) * Decimal(next_met)
                 i += 2
                 continue
 
+        if days_per_week and i + 1 == len(items):
+            pending = days_per_week  # последний ответ: пара может прийти следующим ответом
         i += 1  # неудачная пара, просто идем дальше
 
+    return total, pending
+
+
+def _order(answer: QuestionnaireAnswers) -> int:
+    return (answer.question.question_order if answer.question else None) or 0
+
+
+def compute_met_minutes(answers: List[QuestionnaireAnswers]) -> float:
+    answers_sorted = sorted(answers, key=_order)
+    total, _ = _scan([
+        (is_sedentary(ans.question.question_text if ans.question else ""), ans.days_per_week, ans.met_minutes)
+        for ans in answers_sorted
+    ])
     return float(total)
 
 
+def apply_answer(total: float, pending_days: Optional[int], sedentary: bool,
+                 days_per_week: Optional[int], met_minutes) -> Tuple[float, Optional[int]]:
+    """Дельта для ответа, добавленного в конец опросника (по question_order).
+
+    Эквивалентно шагу `_scan` для последнего элемента: ответ либо закрывает
+    пару с ожидающим days_per_week, либо сам становится началом пары.
+    """
+    if pending_days and met_minutes:
+        return total + float(Decimal(pending_days) * Decimal(met_minutes)), None
+    if sedentary and met_minutes:
+        return total + float(Decimal(met_minutes) * 7), None
+    return total, days_per_week or None
+
+
 def update_submission_met_minutes(session: Session, submission_id, answers: List[QuestionnaireAnswers]):
-    total = compute_met_minutes(answers)
+    """Полный пересчёт по переданным ORM-ответам."""
     submission = session.get(QuestionnaireSubmissions, submission_id)
     if not submission:
         raise ValueError("Submission not found")
-    submission.total_met_minutes = total
-    session.commit()
+    submission.total_met_minutes = compute_met_minutes(answers)
+    # состояние дельт не восстанавливаем — следующий ответ выполнит полный пересчёт
+    submission.met_last_order = None
+    submission.met_pending_days = None
+    session.flush()
+
+
+def recompute_submission_met_minutes(session: Session, submission_id) -> None:
+    """Полный пересчёт total_met_minutes и состояния инкрементального подсчёта.
+
+    Путь проверки для дельт. Читаются только строки ответов; порядок и
+    классификация вопросов берутся из `question_meta_cache`.
+    """
+    submission = session.get(QuestionnaireSubmissions, submission_id)
+    if not submission:
+        raise ValueError("Submission not found")
+    rows = session.execute(
+        select(QuestionnaireAnswers.question_id, QuestionnaireAnswers.days_per_week,
+               QuestionnaireAnswers.met_minutes)
+        .where(QuestionnaireAnswers.submission_id == submission_id)
+        .order_by(QuestionnaireAnswers.id)
+    ).all()
+    meta = question_meta_cache.get_many(session, (r.question_id for r in rows))
+    scored = sorted(
+        ((meta.get(r.question_id, NO_QUESTION), r.days_per_week, r.met_minutes) for r in rows),
+        key=lambda item: item[0].question_order,
+    )
+    total, pending = _scan([(m.sedentary, days, met) for m, days, met in scored])
+    submission.total_met_minutes = float(total)
+    submission.met_last_order = max((m.question_order for m, _, _ in scored), default=None)
+    submission.met_pending_days = pending
+
+
+def add_answer_met_minutes(session: Session, submission: QuestionnaireSubmissions,
+                           answer: QuestionnaireAnswers) -> None:
+    """Обновляет total_met_minutes после вставки `answer` (коммит — на стороне вызывающего).
+
+    Ответ, пришедший по порядку вопросов, применяется дельтой за O(1). Если
+    состояние неизвестно (первый ответ, старые submissions) или ответ пришёл
+    не по порядку, выполняется полный пересчёт.
+    """
+    meta = question_meta_cache.get(session, answer.question_id)
+    if submission.met_last_order is not None and meta.question_order >= submission.met_last_order:
+        submission.total_met_minutes, submission.met_pending_days = apply_answer(
+            submission.total_met_minutes or 0.0,
+            submission.met_pending_days,
+            meta.sedentary,
+            answer.days_per_week,
+            answer.met_minutes,
+        )
+        submission.met_last_order = meta.question_order
+        return
+
+    recompute_submission_met_minutes(session, submission.id)
@@ -0,0 +1,127 @@
+"""
+Set-based пересчёт questionnaire_submissions.total_met_minutes в SQL.
+
+Те же правила, что и `met_calculator._scan`: ответы упорядочены по
+(question_order, id); сидячий вопрос с met_minutes даёт met × 7, иначе
+ответ с days_per_week образует пару со следующим ответом (lead(met_minutes))
+и даёт days × met, а оба ответа пропускаются.
+
+Нумерация и следующий ответ считаются оконными функциями. Сам проход
+жадный — пара «съедает» следующий ответ, — поэтому он выражен рекурсивным
+CTE, который шагает по row_number сразу для всех submissions порции:
+глубина рекурсии равна числу ответов в опроснике, а не числу submissions.
+Одна порция — один UPDATE … FROM на сервере.
+
+Какие вопросы считаются «сидячими», решает тот же классификатор, что и
+в Python (`question_meta.sedentary_question_ids`), — это избавляет SQL от
+зависимости от локали lower() для кириллицы.
+"""
+import logging
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Double, Numeric, and_, case, cast, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import QuestionnaireAnswers, QuestionnaireQuestions, QuestionnaireSubmissions
+from app.services.question_meta import sedentary_question_ids
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def build_met_update(sedentary_ids: List[int], batch_size: int = DEFAULT_BATCH_SIZE,
+                     after: Optional[uuid.UUID] = None,
+                     questionnaire_type: Optional[str] = "physical_activity"):
+    """UPDATE одной порции submissions (keyset по id) с RETURNING id."""
+    S, A, Q = QuestionnaireSubmissions, QuestionnaireAnswers, QuestionnaireQuestions
+
+    batch = select(S.id).order_by(S.id).limit(batch_size)
+    if questionnaire_type:
+        batch = batch.where(S.questionnaire_type == questionnaire_type)
+    if after is not None:
+        batch = batch.where(S.id > after)
+    batch = batch.cte("batch")
+
+    window = dict(partition_by=A.submission_id, order_by=(func.coalesce(Q.question_order, 0), A.id))
+    ordered = (
+        select(
+            A.submission_id,
+            func.row_number().over(**window).label("rn"),
+            func.coalesce(A.days_per_week, 0).label("days"),
+            func.coalesce(A.met_minutes, 0).label("met"),
+            func.coalesce(func.lead(A.met_minutes).over(**window), 0).label("next_met"),
+            A.question_id.in_(sedentary_ids).label("sedentary"),
+        )
+        .select_from(A)
+        .join(batch, batch.c.id == A.submission_id)
+        .outerjoin(Q, Q.id == A.question_id)
+        .cte("ordered")
+    )
+
+    walk = select(
+        batch.c.id.label("submission_id"),
+        literal(1).label("rn"),
+        cast(literal(0), Numeric).label("total"),
+    ).cte("walk", recursive=True)
+    sedentary_step = and_(ordered.c.sedentary, ordered.c.met != 0)
+    pair_step = and_(ordered.c.days != 0, ordered.c.next_met != 0)
+    walk = walk.union_all(
+        select(
+            walk.c.submission_id,
+            walk.c.rn + case((sedentary_step, 1), (pair_step, 2), else_=1),
+            walk.c.total + case(
+                (sedentary_step, ordered.c.met * 7),
+                (pair_step, ordered.c.days * ordered.c.next_met),
+                else_=0,
+            ),
+        )
+        .select_from(walk)
+        .join(ordered, and_(ordered.c.submission_id == walk.c.submission_id, ordered.c.rn == walk.c.rn))
+    )
+
+    last_step = select(
+        walk.c.submission_id,
+        walk.c.total,
+        func.row_number().over(partition_by=walk.c.submission_id, order_by=walk.c.rn.desc()).label("k"),
+    ).subquery("last_step")
+
+    return (
+        update(S)
+        .where(S.id == last_step.c.submission_id, last_step.c.k == 1)
+        .values(
+            total_met_minutes=cast(last_step.c.total, Double),
+            # состояние дельт сбрасывается: следующий ответ пересчитает submission целиком
+            met_last_order=None,
+            met_pending_days=None,
+        )
+        .returning(S.id)
+    )
+
+
+def recompute_met_batch(session: Session, sedentary_ids: List[int], batch_size: int = DEFAULT_BATCH_SIZE,
+                        after: Optional[uuid.UUID] = None) -> Tuple[int, Optional[uuid.UUID]]:
+    """Пересчитывает одну порцию; возвращает (число submissions, следующий чекпоинт)."""
+    ids = session.scalars(
+        build_met_update(sedentary_ids, batch_size, after),
+        execution_options={"synchronize_session": False},
+    ).all()
+    return len(ids), max(ids, default=None)
+
+
+def recompute_all_met_minutes(session: Session, batch_size: int = DEFAULT_BATCH_SIZE,
+                              after: Optional[uuid.UUID] = None,
+                              on_batch: Optional[Callable[[int, uuid.UUID], None]] = None) -> int:
+    """Пересчитывает все physical_activity submissions порциями, коммитя каждую."""
+    sedentary_ids = sedentary_question_ids(session)
+    total = 0
+    while True:
+        count, after = recompute_met_batch(session, sedentary_ids, batch_size, after)
+        if not count:
+            return total
+        session.commit()
+        total += count
+        logger.info("met recompute: %d submissions, last_id=%s", total, after)
+        if on_batch:
+            on_batch(total, after)
@@ -0,0 +1,162 @@
+"""
+Массовый пересчёт body_metrics по всем антропометриям.
+
+Антропометрии читаются вместе с полом/датой рождения пациента порциями по
+keyset-чекпоинту (`anthropometries.id > :after ORDER BY id LIMIT :n`),
+метрики считаются одним векторным проходом на порцию и записываются
+multi-row upsert'ом по `anthropometry_id`. Каждая порция коммитится
+отдельно, поэтому прерванный прогон продолжается с последнего `last_id`.
+
+В режиме `only_stale` выбираются только устаревшие строки: без метрик, с
+пустыми bmi/bsa/bmr, со старой `formula_version` или такие, у которых после
+`computed_at` изменилась антропометрия (`updated_at`) либо пол/дата рождения
+пациента (`metrics_inputs_updated_at`; правка ФИО или адреса пересчёта не требует).
+
+    python -m app.services.metrics_backfill --chunk-size 5000 [--after <uuid>] [--stale-only]
+"""
+import argparse
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import Anthropometries, BodyMetrics, Patients
+from app.services.metrics_recalculator import FORMULA_VERSION, compute_body_metrics_batch, upsert_body_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+@dataclass
+class BackfillReport:
+    rows: int = 0
+    chunks: int = 0
+    last_id: Optional[uuid.UUID] = None
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def stale_condition():
+    return or_(
+        BodyMetrics.id.is_(None),
+        BodyMetrics.formula_version.is_(None),
+        BodyMetrics.formula_version < FORMULA_VERSION,
+        BodyMetrics.bmi.is_(None),
+        BodyMetrics.bsa.is_(None),
+        BodyMetrics.bmr.is_(None),
+        BodyMetrics.computed_at.is_(None),
+        Anthropometries.updated_at > BodyMetrics.computed_at,
+        Patients.metrics_inputs_updated_at > BodyMetrics.computed_at,
+    )
+
+
+def metrics_source_query():
+    """(id, height_cm, weight_kg, measured_at, birth_date, sex) — всё, что нужно для расчёта."""
+    return (
+        select(
+            Anthropometries.id,
+            Anthropometries.height_cm,
+            Anthropometries.weight_kg,
+            Anthropometries.measured_at,
+            Patients.birth_date,
+            Patients.sex,
+        )
+        .join(Patients, Patients.id == Anthropometries.patient_id)
+        .where(
+            Anthropometries.height_cm.is_not(None),
+            Anthropometries.weight_kg.is_not(None),
+            Anthropometries.measured_at.is_not(None),
+            Patients.birth_date.is_not(None),
+            Patients.sex.is_not(None),
+        )
+    )
+
+
+def iter_anthropometry_chunks(session: Session, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              after: Optional[uuid.UUID] = None,
+                              only_stale: bool = False) -> Iterator[List[Row]]:
+    """Порции строк `metrics_source_query` в порядке id."""
+    while True:
+        stmt = metrics_source_query().order_by(Anthropometries.id).limit(chunk_size)
+        if only_stale:
+            stmt = (stmt.outerjoin(BodyMetrics, BodyMetrics.anthropometry_id == Anthropometries.id)
+                    .where(stale_condition()))
+        if after is not None:
+            stmt = stmt.where(Anthropometries.id > after)
+        rows = session.execute(stmt).all()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1].id
+
+
+def load_anthropometry_rows(session: Session, anthropometry_ids: Sequence[uuid.UUID]) -> List[Row]:
+    stmt = metrics_source_query().where(Anthropometries.id.in_(anthropometry_ids))
+    return session.execute(stmt).all()
+
+
+def recompute_chunk(session: Session, rows: List[Row]) -> int:
+    if not rows:
+        return 0
+    ids, height, weight, measured_at, birth_date, sex = zip(*rows)
+    metrics = compute_body_metrics_batch(height, weight, measured_at, birth_date, sex)
+    return upsert_body_metrics(session, ids, metrics)
+
+
+def backfill_body_metrics(session: Session, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          after: Optional[uuid.UUID] = None, max_rows: Optional[int] = None,
+                          on_chunk: Optional[Callable[[BackfillReport], None]] = None,
+                          only_stale: bool = False) -> BackfillReport:
+    """Пересчитывает метрики начиная с чекпоинта `after`; `report.last_id` — следующий чекпоинт."""
+    report = BackfillReport(last_id=after)
+    for rows in iter_anthropometry_chunks(session, chunk_size, after, only_stale):
+        report.rows += recompute_chunk(session, rows)
+        report.chunks += 1
+        report.last_id = rows[-1].id
+        session.commit()  # чекпоинт: всё до last_id уже записано
+
+        logger.info("body_metrics backfill: %d rows, %.0f rows/s, last_id=%s",
+                    report.rows, report.rows_per_second, report.last_id)
+        if on_chunk:
+            on_chunk(report)
+        if max_rows is not None and report.rows >= max_rows:
+            break
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Пересчёт body_metrics по всем антропометриям")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--after", type=uuid.UUID, default=None,
+                        help="keyset-чекпоинт: продолжить после этого anthropometry id")
+    parser.add_argument("--max-rows", type=int, default=None)
+    parser.add_argument("--stale-only", action="store_true",
+                        help="пересчитать только устаревшие строки")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    from app.infrastructure.db.session import SessionLocal
+
+    with SessionLocal() as session:
+        report = backfill_body_metrics(session, args.chunk_size, args.after, args.max_rows,
+                                       only_stale=args.stale_only)
+    print(f"done: {report.rows} rows in {report.elapsed:.1f}s "
+          f"({report.rows_per_second:.0f} rows/s), last_id={report.last_id}")
+
+
+if __name__ == "__main__":
+    main()
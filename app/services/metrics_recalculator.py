@@ -1,10 +1,21 @@
+from typing import Dict, List, Sequence
 from uuid import uuid4
 
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app import formulas_batch
 from app.formulas import bmi, bsa_mosteller, bmr_mifflin, Sex
 from app.infrastructure.db.models import Anthropometries, BodyMetrics
 
+METHOD_BSA = "Mosteller"
+METHOD_BMR = "Mifflin-St Jeor"
+# Увеличивать при любом изменении формул/методов выше: строки body_metrics
+# со старой версией считаются устаревшими и пересчитываются ночным джобом.
+FORMULA_VERSION = 1
+
 
 def recompute_body_metrics(session: Session, anthropometry: Anthropometries):
     if not anthropometry.patient:
@@ -23,7 +34,61 @@ def recompute_body_metrics(session: Session, anthropometry: Anthropometries):
         bmi=bmi_val,
         bsa=bsa_val,
         bmr=bmr_val,
-        method_bsa="Mosteller",
-        method_bmr="Mifflin-St Jeor"
+        method_bsa=METHOD_BSA,
+        method_bmr=METHOD_BMR,
+        formula_version=FORMULA_VERSION,
     )
     session.add(metrics)
+
+
+def compute_body_metrics_batch(height_cm: Sequence[float], weight_kg: Sequence[float],
+                               measured_at: Sequence, birth_date: Sequence,
+                               sex: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Пачечный аналог `recompute_body_metrics`: те же формулы за один векторный проход."""
+    height = np.asarray(height_cm, dtype=np.float64)
+    weight = np.asarray(weight_kg, dtype=np.float64)
+    age = formulas_batch.age_years(measured_at, birth_date)
+    is_male = formulas_batch.sex_mask(sex)
+    return {
+        "bmi": formulas_batch.bmi(weight, height),
+        "bsa": formulas_batch.bsa_mosteller(weight, height),
+        "bmr": formulas_batch.bmr_mifflin(weight, height, age, is_male),
+    }
+
+
+def upsert_body_metrics(session: Session, anthropometry_ids: Sequence,
+                        metrics: Dict[str, np.ndarray]) -> int:
+    """Пишет body_metrics одним multi-row INSERT … ON CONFLICT (anthropometry_id) DO UPDATE."""
+    if not len(anthropometry_ids):
+        return 0
+    rows: List[dict] = [
+        {
+            "id": uuid4(),
+            "anthropometry_id": anthropometry_id,
+            "bmi": float(bmi_val),
+            "bsa": float(bsa_val),
+            "bmr": float(bmr_val),
+            "method_bsa": METHOD_BSA,
+            "method_bmr": METHOD_BMR,
+            "formula_version": FORMULA_VERSION,
+        }
+        for anthropometry_id, bmi_val, bsa_val, bmr_val
+        in zip(anthropometry_ids, metrics["bmi"], metrics["bsa"], metrics["bmr"])
+    ]
+    # executemany: строки склеиваются в multi-row VALUES драйвером (insertmanyvalues),
+    # без компиляции отдельного огромного INSERT на каждую пачку
+    stmt = pg_insert(BodyMetrics.__table__)
+    stmt = stmt.on_conflict_do_update(
+        constraint="unq_body_metrics_anthropometry_id",
+        set_={
+            "bmi": stmt.excluded.bmi,
+            "bsa": stmt.excluded.bsa,
+            "bmr": stmt.excluded.bmr,
+            "method_bsa": stmt.excluded.method_bsa,
+            "method_bmr": stmt.excluded.method_bmr,
+            "formula_version": stmt.excluded.formula_version,
+            "computed_at": func.now(),
+        },
+    )
+    session.execute(stmt, rows)
+    return len(rows)
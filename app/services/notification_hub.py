@@ -0,0 +1,209 @@
+"""
+Доставка уведомлений в реальном времени (SSE /users/{id}/notifications/stream).
+
+Запись уведомления в той же транзакции делает `notify`: на Postgres это
+pg_notify(CHANNEL, payload) — событие уходит слушателям только после коммита,
+а при откате не уходит вовсе. Каждый процесс API держит одно LISTEN-соединение
+(asyncpg) и раскладывает события по очередям своих подписчиков.
+
+Без Postgres (SQLite в тестах) брокером служит сам хаб: событие публикуется
+локально после коммита через `on_commit`.
+
+Если подписчик не успевает читать (очередь переполнена) или LISTEN-соединение
+рвалось, вместо потерянных событий подписчик получает `resync` — клиент
+перечитывает список и счётчик непрочитанных.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.unit_of_work import on_commit
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifications"
+QUEUE_SIZE = 100
+RECONNECT_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 30.0
+# лимит payload у NOTIFY — 8000 байт
+MAX_PAYLOAD_BYTES = 7900
+
+RESYNC = {"type": "resync"}
+
+
+def _listen_dsn() -> Optional[str]:
+    from app.infrastructure.db.session import engine
+
+    if engine.url.get_backend_name() != "postgresql":
+        return None
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _encode(event: Dict[str, Any]) -> str:
+    payload = json.dumps(event, ensure_ascii=False, default=str)
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES and "message" in event:
+        # длинный текст клиент дочитает из списка уведомлений
+        payload = json.dumps({**event, "message": None}, ensure_ascii=False, default=str)
+    return payload
+
+
+_NOTIFY_MANY_SQL = text(f"SELECT count(pg_notify('{CHANNEL}', p)) FROM unnest(CAST(:payloads AS text[])) AS p")
+
+
+def notify(session: Session, event: Dict[str, Any]) -> None:
+    """Отправить событие подписчикам `event["user_id"]` после коммита транзакции сессии."""
+    payload = _encode(event)
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(select(func.pg_notify(CHANNEL, payload)))
+    else:
+        on_commit(session, lambda: notification_hub.publish(payload))
+
+
+def notify_many(session: Session, events: Iterable[Dict[str, Any]]) -> None:
+    """Как `notify`, но все события одним запросом."""
+    payloads = [_encode(event) for event in events]
+    if not payloads:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(_NOTIFY_MANY_SQL, {"payloads": payloads})
+    else:
+        def publish_all():
+            for payload in payloads:
+                notification_hub.publish(payload)
+        on_commit(session, publish_all)
+
+
+class NotificationHub:
+    def __init__(self, dsn: Callable[[], Optional[str]] = _listen_dsn, queue_size: int = QUEUE_SIZE):
+        self._dsn = dsn
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._conn = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def subscribe(self, user_id) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(str(user_id), set()).add(queue)
+        await self._ensure_listener()
+        return queue
+
+    def unsubscribe(self, user_id, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(str(user_id))
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[str(user_id)]
+
+    def publish(self, payload: str) -> None:
+        """Локальная публикация; потокобезопасна (вызывается из on_commit в тредпуле)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # в этом процессе ещё никто не подписывался
+        loop.call_soon_threadsafe(self._dispatch, payload)
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            await conn.close()
+
+    # --- доставка ---
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            user_id = str(event["user_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("notification hub: malformed payload %r", payload[:200])
+            return
+        for queue in tuple(self._subscribers.get(user_id, ())):
+            self._put(queue, event)
+
+    def _broadcast(self, event: Dict[str, Any]) -> None:
+        for queues in tuple(self._subscribers.values()):
+            for queue in tuple(queues):
+                self._put(queue, event)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    # --- LISTEN ---
+    async def _ensure_listener(self) -> None:
+        if self._conn is not None or self._reconnecting():
+            return
+        dsn = self._dsn()
+        if dsn is None:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._conn is not None:
+                return
+            try:
+                await self._connect(dsn)
+            except Exception:
+                logger.exception("notification hub: LISTEN connection failed")
+                self._schedule_reconnect()
+
+    async def _connect(self, dsn: str) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(dsn)
+        await conn.add_listener(CHANNEL, self._on_notify)
+        conn.add_termination_listener(self._on_terminate)
+        self._conn = conn
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self._dispatch(payload)
+
+    def _on_terminate(self, conn) -> None:
+        if conn is not self._conn:
+            return
+        self._conn = None
+        if not self._closed:
+            logger.warning("notification hub: LISTEN connection lost")
+            self._schedule_reconnect()
+
+    def _reconnecting(self) -> bool:
+        return self._reconnect_task is not None and not self._reconnect_task.done()
+
+    def _schedule_reconnect(self) -> None:
+        if not self._reconnecting() and self._loop is not None:
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = RECONNECT_SECONDS
+        # без подписчиков переподключаться незачем — соединение поднимет следующий subscribe
+        while not self._closed and self._subscribers and self._conn is None:
+            await asyncio.sleep(delay)
+            dsn = self._dsn()
+            if dsn is None:
+                return
+            try:
+                await self._connect(dsn)
+            except Exception:
+                logger.warning("notification hub: reconnect failed, retry in %.0fs", delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                continue
+            # пока соединения не было, события терялись
+            self._broadcast(RESYNC)
+
+
+notification_hub = NotificationHub()
@@ -0,0 +1,185 @@
+"""
+Массовый импорт пациентов из CSV/NDJSON записей `PatientCreate`.
+
+Вход читается и валидируется потоково: валидные записи копятся пачками по
+CHUNK_ROWS, на пачку id берутся одним запросом к patient_id_seq, строки
+грузятся COPY (на других СУБД — executemany). Невалидные записи не
+останавливают импорт и попадают в отчёт с номером записи. С `doctor_id`
+каждый импортированный пациент в той же транзакции привязывается к доктору.
+
+Коммитит вызывающий (unit of work): либо импортированы все валидные строки,
+либо ни одной.
+
+    python -m app.services.patient_import --format csv [--doctor-id <uuid>] patients.csv
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import sys
+import uuid
+from typing import IO, Any, Iterator, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, insert, select
+from sqlalchemy.orm import Session
+
+from app.domain.models.imports import DoctorNotFound, ImportRowError, InvalidEncoding
+from app.domain.models.patient import PatientCreate, PatientImportReport
+from app.infrastructure.db.models import PatientUserLinks, Patients, Users
+from app.infrastructure.db.patient_ids import patient_id_allocator
+
+CHUNK_ROWS = 5000
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("csv", "ndjson")
+
+PATIENT_COLUMNS = ("id", "full_name", "birth_date", "sex", "place_of_residence")
+LINK_COLUMNS = ("user_id", "patient_id", "added_at", "status")
+
+
+def iter_raw(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(номер записи с 1, сырая запись) — dict, либо исключение разбора строки.
+
+    Байты не в UTF-8 — `InvalidEncoding`: текст декодируется блоками с
+    упреждением, так что номер испорченной записи неизвестен.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            yield from enumerate(csv.DictReader(text), start=1)
+            return
+        row = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                yield row, json.loads(line)
+            except ValueError as exc:
+                yield row, exc
+    except UnicodeDecodeError as exc:
+        raise InvalidEncoding(f"Input is not valid UTF-8: {exc.reason}") from exc
+    finally:
+        text.detach()  # поток закрывает владелец
+
+
+def _describe(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in exc.errors()]
+
+
+def iter_validated(stream: IO[bytes], fmt: str,
+                   model: Type[BaseModel] = PatientCreate) -> Iterator[Tuple[int, Any]]:
+    """(номер записи, экземпляр `model`) или (номер записи, список ошибок)."""
+    for row, raw in iter_raw(stream, fmt):
+        if isinstance(raw, Exception):
+            yield row, [f"row: invalid JSON ({raw})"]
+            continue
+        try:
+            yield row, model.model_validate(raw)
+        except ValidationError as exc:
+            yield row, _describe(exc)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return r"\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def copy_rows(session: Session, table: Table, columns: Sequence[str], rows: List[Sequence[Any]]) -> None:
+    """Загрузить строки COPY ... FROM STDIN в транзакции сессии (не на Postgres — executemany)."""
+    if not rows:
+        return
+    # clause=insert(...) — чтобы маршрутизатор учёл запись и отдал primary
+    conn = session.connection(bind_arguments={"clause": insert(table)})
+    if conn.dialect.name != "postgresql":
+        session.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+        return
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+
+
+def _load(session: Session, chunk: List[PatientCreate], doctor_id: Optional[uuid.UUID]) -> None:
+    ids = patient_id_allocator.take(session, len(chunk))
+    copy_rows(session, Patients.__table__, PATIENT_COLUMNS, [
+        (new_id, p.full_name, p.birth_date, p.sex.value, p.place_of_residence)
+        for new_id, p in zip(ids, chunk)
+    ])
+    if doctor_id is not None:
+        now = datetime.datetime.utcnow()
+        copy_rows(session, PatientUserLinks.__table__, LINK_COLUMNS,
+                  [(doctor_id, new_id, now, "active") for new_id in ids])
+
+
+def import_patients(session: Session, stream: IO[bytes], fmt: str = "csv",
+                    doctor_id: Optional[uuid.UUID] = None) -> PatientImportReport:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    if doctor_id is not None and session.scalar(
+            select(Users.id).where(Users.id == doctor_id, Users.role == "doctor")) is None:
+        raise DoctorNotFound("Doctor not found")
+
+    report = PatientImportReport(imported=0, failed=0)
+    chunk: List[PatientCreate] = []
+    for row, result in iter_validated(stream, fmt):
+        if isinstance(result, PatientCreate):
+            chunk.append(result)
+            if len(chunk) >= CHUNK_ROWS:
+                _load(session, chunk, doctor_id)
+                report.imported += len(chunk)
+                chunk = []
+            continue
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(row=row, errors=result))
+    if chunk:
+        _load(session, chunk, doctor_id)
+        report.imported += len(chunk)
+    if doctor_id is not None:
+        report.linked = report.imported
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Импорт пациентов из CSV/NDJSON")
+    parser.add_argument("input", help="файл; - для stdin")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--doctor-id", type=uuid.UUID, default=None, help="привязать всех к доктору")
+    parser.add_argument("--dry-run", action="store_true", help="проверить и загрузить без коммита")
+    args = parser.parse_args(argv)
+
+    from app.infrastructure.db.session import SessionLocal
+    from app.infrastructure.db.unit_of_work import unit_of_work
+
+    stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        if args.dry_run:
+            with SessionLocal() as session:
+                report = import_patients(session, stream, args.format, args.doctor_id)
+                session.rollback()
+        else:
+            with unit_of_work(SessionLocal) as session:
+                report = import_patients(session, stream, args.format, args.doctor_id)
+    except ValueError as exc:  # неизвестный доктор, вход не в UTF-8
+        sys.exit(str(exc))
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    json.dump(report.model_dump(), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
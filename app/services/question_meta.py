@@ -0,0 +1,100 @@
+"""
+Кэш классификации вопросов для подсчёта MET.
+
+Для каждого вопроса один раз считаются признаки, нужные скорингу, — порядок
+и флаг вопроса о сидячем времени. Кэш общий на процесс и ключуется id
+вопроса. `QuestionnaireRepository` после коммита изменения вопросов сбрасывает
+записи локально, а в остальных процессах кэш сбрасывается целиком, когда
+сдвигается общая версия шаблонов (см. app/services/template_cache.py) — то
+есть не позже чем через TEMPLATE_CACHE_CHECK_SECONDS.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import QuestionnaireQuestions
+from app.services.template_cache import TemplateCache, template_cache
+
+SITTING_QUESTION_KEYWORDS = [
+    "сколько времени в день вы обычно проводите сидя"
+]
+
+# ключевые слова приводятся к нижнему регистру один раз, а не на каждом ответе
+_SITTING = tuple(kw.lower() for kw in SITTING_QUESTION_KEYWORDS)
+
+
+@dataclass(frozen=True)
+class QuestionMeta:
+    question_order: int
+    sedentary: bool
+
+
+def is_sedentary(question_text: str) -> bool:
+    text = question_text.lower()
+    return any(kw in text for kw in _SITTING)
+
+
+def classify_question(question_text: Optional[str], question_order: Optional[int]) -> QuestionMeta:
+    return QuestionMeta(question_order=question_order or 0, sedentary=is_sedentary(question_text or ""))
+
+
+def sedentary_question_ids(session: Session) -> List[int]:
+    """id всех вопросов о сидячем времени — для set-based пересчёта в SQL."""
+    rows = session.execute(
+        select(QuestionnaireQuestions.id, QuestionnaireQuestions.question_text)
+    ).all()
+    return [row.id for row in rows if is_sedentary(row.question_text or "")]
+
+
+# ответ без вопроса: порядок 0, без флагов
+NO_QUESTION = classify_question(None, None)
+
+
+class QuestionMetaCache:
+    def __init__(self, versions: TemplateCache = template_cache):
+        self._versions = versions  # источник общей версии шаблонов
+        self._data: Dict[int, QuestionMeta] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get_many(self, session: Session, question_ids: Iterable[int]) -> Dict[int, QuestionMeta]:
+        version = self._versions.version(session)
+        with self._lock:
+            if version != self._version:
+                self._data.clear()
+                self._version = version
+        ids = {qid for qid in question_ids if qid is not None}
+        found = {qid: self._data[qid] for qid in ids if qid in self._data}
+        missing = ids - found.keys()
+        if missing:
+            rows = session.execute(
+                select(QuestionnaireQuestions.id, QuestionnaireQuestions.question_text,
+                       QuestionnaireQuestions.question_order)
+                .where(QuestionnaireQuestions.id.in_(missing))
+            ).all()
+            loaded = {row.id: classify_question(row.question_text, row.question_order) for row in rows}
+            with self._lock:
+                # за время загрузки версия могла смениться — тогда результат не сохраняем
+                if self._version == version:
+                    self._data.update(loaded)
+            found.update(loaded)
+        return found
+
+    def get(self, session: Session, question_id: Optional[int]) -> QuestionMeta:
+        if question_id is None:
+            return NO_QUESTION
+        return self.get_many(session, [question_id]).get(question_id, NO_QUESTION)
+
+    def invalidate(self, question_id: Optional[int] = None) -> None:
+        """Сбросить один вопрос или (без аргумента) весь кэш."""
+        with self._lock:
+            if question_id is None:
+                self._data.clear()
+            else:
+                self._data.pop(question_id, None)
+
+
+question_meta_cache = QuestionMetaCache()
@@ -0,0 +1,111 @@
+"""
+Кэш шаблонов опросников в памяти процесса: шаблон и его вопросы в порядке
+question_order, ключ — id опросника.
+
+Согласованность между процессами (воркеры uvicorn, Celery) держится на общем
+счётчике версий — последовательности `questionnaire_template_version`.
+`QuestionnaireRepository` после коммита изменения шаблона или вопроса вызывает
+`invalidate`: локальный кэш сбрасывается сразу, а nextval сдвигает общую
+версию. Остальные процессы сверяют свою версию с общей не чаще раза в
+TEMPLATE_CACHE_CHECK_SECONDS и при расхождении сбрасывают кэш целиком — то
+есть чужое изменение становится видно не позже чем через этот интервал.
+
+Версия сдвигается только после коммита: иначе другой процесс мог бы успеть
+перечитать и закэшировать ещё не зафиксированное состояние под новой версией.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import questionnaire_template_version
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_SECONDS = float(os.getenv("TEMPLATE_CACHE_CHECK_SECONDS", 1.0))
+
+
+@dataclass(frozen=True)
+class QuestionnaireTemplate:
+    """Записи общие для всех читателей — не изменять."""
+    questionnaire: Dict[str, Any]
+    questions: List[Dict[str, Any]]
+
+
+_READ_VERSION_SQL = text(f"SELECT last_value FROM {questionnaire_template_version.name}")
+
+
+def read_shared_version(session: Session) -> int:
+    return session.scalar(_READ_VERSION_SQL)
+
+
+def bump_shared_version(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(questionnaire_template_version.next_value().select())
+
+
+class TemplateCache:
+    def __init__(self, check_interval: float = VERSION_CHECK_SECONDS,
+                 read_version: Callable[[Session], int] = read_shared_version,
+                 bump_version: Callable[[Any], None] = bump_shared_version):
+        self.check_interval = check_interval
+        self._read_version = read_version
+        self._bump_version = bump_version
+        self._data: Dict[int, QuestionnaireTemplate] = {}
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def version(self, session: Session) -> Optional[int]:
+        """Текущая общая версия (не чаще check_interval); при смене — сброс кэша.
+
+        По ней же сбрасывают свои данные кэши, производные от шаблонов
+        (`question_meta.QuestionMetaCache`).
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._version
+        version = self._read_version(session)
+        with self._lock:
+            if version != self._version:
+                self._data.clear()
+                self._version = version
+            self._checked_at = now
+        return version
+
+    def get(self, session: Session, questionnaire_id: int,
+            load: Callable[[], Optional[QuestionnaireTemplate]]) -> Optional[QuestionnaireTemplate]:
+        """Шаблон из памяти или (промах) через `load`; отсутствующие опросники не кэшируются."""
+        version = self.version(session)
+        template = self._data.get(questionnaire_id)
+        if template is not None:
+            return template
+        template = load()
+        if template is not None:
+            with self._lock:
+                # за время загрузки кэш могли сбросить — тогда результат не сохраняем
+                if self._version == version:
+                    self._data[questionnaire_id] = template
+        return template
+
+    def invalidate(self, engine=None) -> None:
+        """Сбросить локальный кэш; с `engine` — ещё и сдвинуть общую версию."""
+        with self._lock:
+            self._data.clear()
+            self._version = None
+            self._checked_at = float("-inf")
+        if engine is None:
+            return
+        try:
+            self._bump_version(engine)
+        except Exception:
+            # изменение уже закоммичено; остальные процессы подхватят его при следующем сдвиге версии
+            logger.exception("template cache: failed to bump shared version")
+
+
+template_cache = TemplateCache()
@@ -1,25 +1,28 @@
+import asyncio
 import os
+import uuid
 from email.message import EmailMessage
+from typing import Iterable, List, Optional
 
 from aiosmtplib import send
-from celery import shared_task
+from celery import group
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
 
 from app.infrastructure.db.session import SessionLocal
 from app.infrastructure.repositories.user_repository import UserRepository
-from formulas import bsa_mosteller, bmr_mifflin, Sex
+from app.services import met_sql, metrics_backfill
 from .celery_app import celery
 from .infrastructure.db.models import Users
 
 
 @celery.task
 def send_admin_report():
-    # собрать статистику по врачам и пациентам
-    db = SessionLocal()
-    repo = UserRepository(db)
-    stats = {}
-    # например, по каждому доктору
-    for user in db.query(Users).filter(Users.role == "doctor"):
-        stats[user.email] = repo.get_patient_stats(str(user.id), all_patients=True)
+    # статистика по всем врачам одним сгруппированным запросом
+    with SessionLocal() as db:
+        emails = dict(db.execute(select(Users.id, Users.email).where(Users.role == "doctor")).all())
+        by_doctor = UserRepository(db).get_doctors_stats()
+    stats = {emails[uuid.UUID(doctor_id)]: s for doctor_id, s in by_doctor.items()}
     # собрать письмо
     text = "\n".join(f"{email}: {s}" for email, s in stats.items())
     msg = EmailMessage()
@@ -27,19 +30,71 @@ def send_admin_report():
     msg["From"] = os.getenv("FROM_EMAIL")
     msg["To"] = os.getenv("ADMIN_EMAIL")
     msg.set_content(text)
-    send(
+    asyncio.run(send(
         msg,
         hostname=os.getenv("SMTP_HOST"),
         port=int(os.getenv("SMTP_PORT", 587)),
         start_tls=True,
         username=os.getenv("SMTP_USER"),
         password=os.getenv("SMTP_PASS"),
-    )
+    ))
 
 
-@shared_task
-def recalc_body_metrics(patient_id: int, weight: float, height: float,
-                        age: int, sex_str: str):
-    sex = Sex(sex_str)
-    bsa = bsa_mosteller(weight, height)
-    bmr = bmr_mifflin(weight, height, age, sex)
+# Один message = одна порция id. Порция должна быть заметно дороже накладных
+# расходов брокера, но не настолько большой, чтобы prefetch'нутые воркером
+# сообщения надолго застревали за одной долгой задачей.
+RECALC_CHUNK_SIZE = int(os.getenv("RECALC_CHUNK_SIZE", 1000))
+
+
+def enqueue_body_metrics_recalc(anthropometry_ids: Iterable, chunk_size: int = RECALC_CHUNK_SIZE) -> int:
+    """Ставит пересчёт в очередь порциями по `chunk_size` id; возвращает число сообщений."""
+    ids = [str(i) for i in anthropometry_ids]
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    if chunks:
+        group(recalc_body_metrics.s(chunk) for chunk in chunks).apply_async()
+    return len(chunks)
+
+
+@celery.task(acks_late=True, autoretry_for=(DBAPIError,), retry_backoff=True, max_retries=5)
+def recalc_body_metrics(anthropometry_ids: List[str]) -> int:
+    """Пересчитывает body_metrics для порции антропометрий одной транзакцией.
+
+    Запись идёт upsert'ом по anthropometry_id, поэтому повтор после сбоя
+    (retry или повторная доставка при acks_late) безопасен.
+    """
+    ids = [uuid.UUID(i) for i in anthropometry_ids]
+    with SessionLocal() as db, db.begin():
+        rows = metrics_backfill.load_anthropometry_rows(db, ids)
+        return metrics_backfill.recompute_chunk(db, rows)
+
+
+@celery.task
+def backfill_body_metrics(after: Optional[str] = None,
+                          chunk_size: int = metrics_backfill.DEFAULT_CHUNK_SIZE,
+                          rows_per_task: int = 200_000, only_stale: bool = False):
+    """Пересчёт body_metrics порциями; продолжает сам себя с keyset-чекпоинта."""
+    with SessionLocal() as db:
+        report = metrics_backfill.backfill_body_metrics(
+            db, chunk_size, uuid.UUID(after) if after else None, max_rows=rows_per_task,
+            only_stale=only_stale,
+        )
+    if report.rows >= rows_per_task:
+        backfill_body_metrics.delay(str(report.last_id), chunk_size, rows_per_task, only_stale)
+    return {
+        "rows": report.rows,
+        "rows_per_second": round(report.rows_per_second, 1),
+        "last_id": str(report.last_id) if report.last_id else None,
+    }
+
+
+@celery.task
+def recompute_stale_body_metrics():
+    """Ночной инкрементальный пересчёт: только устаревшие строки body_metrics."""
+    return backfill_body_metrics.delay(only_stale=True).id
+
+
+@celery.task
+def recompute_met_minutes(batch_size: int = met_sql.DEFAULT_BATCH_SIZE):
+    """Set-based пересчёт total_met_minutes для всех physical_activity submissions."""
+    with SessionLocal() as db:
+        return met_sql.recompute_all_met_minutes(db, batch_size)
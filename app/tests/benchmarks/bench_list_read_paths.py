@@ -0,0 +1,109 @@
+"""
+Бенчмарк чтения списков: ORM-сущности + Model(**obj.__dict__) против
+проекции колонок, прочитанной через соединение, и валидации списка моделей
+одним вызовом TypeAdapter.
+
+Пациенты и вопросы вставляются во временной транзакции, которая в конце
+откатывается, так что запускать можно на любой базе из DATABASE_URL:
+
+    python -m app.tests.benchmarks.bench_list_read_paths [--rows 20000] [--repeat 5]
+
+(файл не собирается pytest — имя не начинается с test_)
+
+Для пациентов печатается и разбивка проекции: сами строки (запрос и dict на
+строку, без моделей) и сборка моделей через `model_construct` вместо
+валидации. На PostgreSQL 16 при 20k строк запрос со строками занимает
+~40-50 мс, валидация моделей ~80-130 мс, а `model_construct` не быстрее
+(~120-140 мс): нижняя граница — создание самих объектов PatientRead, ~3 мкс
+на строку даже без проверок. Поэтому для пациентов выигрыш ~2.5-2.8x, ниже
+цели 3-5x. Это принятый компромисс: эндпоинты отдают PatientRead, и FastAPI
+всё равно собрал бы модели при проверке response_model. Вопросы читаются из
+кэша шаблонов, выигрыш там ~8-11x.
+"""
+import argparse
+import datetime
+import time
+
+from sqlalchemy import insert, select
+
+from app.domain.models.patient import PatientRead
+from app.domain.models.questionnaire import QuestionRead
+from app.infrastructure.db.models import Patients, QuestionnaireQuestions, Questionnaires
+from app.infrastructure.repositories.patient_repository import _PATIENT_FIELDS, PATIENT_COLUMNS, patients_from_rows
+from app.infrastructure.repositories.questionnaire_repository import QUESTION_COLUMNS, QuestionnaireRepository
+
+BASE_ID = 900_000_000
+
+
+def _seed(session, rows: int) -> int:
+    session.execute(insert(Patients), [
+        {"id": BASE_ID + i, "full_name": f"Пациент {i}", "birth_date": datetime.date(1950 + i % 50, 1, 1),
+         "sex": "male" if i % 2 else "female", "place_of_residence": "Москва"}
+        for i in range(rows)
+    ])
+    qid = session.scalar(insert(Questionnaires).values(name="bench", type="nutrition").returning(Questionnaires.id))
+    session.execute(insert(QuestionnaireQuestions), [
+        {"questionnaire_id": qid, "question_text": f"Вопрос {i}", "question_order": i, "answers_json": {"a": 1}}
+        for i in range(rows)
+    ])
+    return qid
+
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.infrastructure.db.session import SessionLocal
+
+    with SessionLocal() as session:
+        qid = _seed(session, args.rows)
+        patients = Patients.id >= BASE_ID
+
+        def orm_patients():
+            session.expunge_all()
+            return [PatientRead(**p.__dict__) for p in session.scalars(select(Patients).where(patients))]
+
+        def projected_patients():
+            return patients_from_rows(session.connection().execute(select(*PATIENT_COLUMNS).where(patients)).all())
+
+        def orm_questions():
+            session.expunge_all()
+            stmt = (select(QuestionnaireQuestions).where(QuestionnaireQuestions.questionnaire_id == qid)
+                    .order_by(QuestionnaireQuestions.question_order))
+            return [QuestionRead(**q.__dict__) for q in session.scalars(stmt)]
+
+        def projected_questions():
+            return QuestionnaireRepository(session).get_questions(qid)
+
+        for name, old, new in (("patients", orm_patients, projected_patients),
+                               ("questions", orm_questions, projected_questions)):
+            assert [m.model_dump() for m in old()] == [m.model_dump() for m in new()]
+            t_old, t_new = _timeit(old, args.repeat), _timeit(new, args.repeat)
+            print(f"{name:10s} {args.rows} rows: orm {t_old * 1000:8.1f} ms ({args.rows / t_old:9.0f} rows/s)  "
+                  f"projection {t_new * 1000:8.1f} ms ({args.rows / t_new:9.0f} rows/s)  x{t_old / t_new:.1f}")
+
+        stmt = select(*PATIENT_COLUMNS).where(patients)
+        rows = session.connection().execute(stmt).all()
+        breakdown = {
+            "rows only": lambda: [dict(zip(_PATIENT_FIELDS, r)) for r in session.connection().execute(stmt).all()],
+            "validate": lambda: patients_from_rows(rows),
+            "model_construct": lambda: [PatientRead.model_construct(**dict(zip(_PATIENT_FIELDS, r))) for r in rows],
+        }
+        print("patients breakdown: " + "  ".join(
+            f"{name} {_timeit(fn, args.repeat) * 1000:.1f} ms" for name, fn in breakdown.items()))
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Бенчмарк нечёткого поиска пациентов (UserRepository.search_patients).
+
+Во временной транзакции создаются N пациентов со сгенерированными русскими
+ФИО и доктор, у которого в ростере первые --roster из них (по умолчанию все),
+затем выполняются поисковые запросы с опечатками по пациентам ростера;
+печатаются p50/p95/p99. В конце транзакция откатывается.
+Нужны pg_trgm и индекс ix_patients_full_name_trgm:
+
+    python -m app.tests.benchmarks.bench_patient_search [--rows 1000000] [--roster 1000] [--queries 300]
+
+(файл не собирается pytest — имя не начинается с test_)
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.infrastructure.repositories.user_repository import UserRepository
+
+BASE_ID = 900_000_000
+
+SYLLABLES = ["ко", "ва", "ле", "ми", "ро", "ба", "ту", "за", "пе", "ни", "се", "да", "гу", "ло", "че",
+             "ры", "жи", "фе", "ша", "бе", "ки", "мо", "ра", "ви", "ну", "ще", "хо", "лю", "те", "ёл"]
+SUFFIXES = ["ов", "ев", "ин", "ский", "ова", "ева", "ина", "ская"]
+FIRST_NAMES = ["Иван", "Пётр", "Алексей", "Сергей", "Дмитрий", "Андрей", "Мария", "Анна", "Елена", "Ольга",
+               "Наталья", "Татьяна", "Юлия", "Алёна", "Михаил", "Николай"]
+PATRONYMICS = ["Иванович", "Петрович", "Сергеевич", "Андреевич", "Ивановна", "Петровна", "Сергеевна",
+               "Алексеевна", "Николаевич", "Николаевна"]
+
+
+def _array(values):
+    return "(ARRAY[" + ", ".join(f"'{v}'" for v in values) + "])"
+
+
+def _surname_sql(g: str) -> str:
+    n = len(SYLLABLES)
+    s = _array(SYLLABLES)
+    return (f"initcap({s}[1 + {g} % {n}] || {s}[1 + ({g} / {n}) % {n}] || {s}[1 + ({g} / {n * n}) % {n}]"
+            f" || {_array(SUFFIXES)}[1 + ({g} / {n ** 3}) % {len(SUFFIXES)}])")
+
+
+def _seed(session, rows: int, roster: int, doctor_id: uuid.UUID) -> None:
+    session.execute(text("INSERT INTO users (id, email, full_name, role, oidc_sub) "
+                         "VALUES (:id, 'bench@example.com', 'bench', 'doctor', :id)"), {"id": doctor_id})
+    # перемешиваем g, чтобы соседние id не давали одинаковых фамилий
+    g = "((g::bigint * 7919) % :n)"
+    session.execute(text(f"""
+        INSERT INTO patients (id, full_name, birth_date, sex, place_of_residence)
+        SELECT :base + g,
+               {_surname_sql(g)} || ' ' || {_array(FIRST_NAMES)}[1 + g % {len(FIRST_NAMES)}]
+                   || ' ' || {_array(PATRONYMICS)}[1 + (g / 3) % {len(PATRONYMICS)}],
+               date '1940-01-01' + (g * 37) % 25000,
+               CASE WHEN g % 2 = 0 THEN 'male' ELSE 'female' END,
+               'Москва'
+        FROM generate_series(1, :n) AS g
+    """), {"base": BASE_ID, "n": rows})
+    session.execute(text("""
+        INSERT INTO patient_user_links (user_id, patient_id, added_at, status)
+        SELECT :doctor, id, now(), 'active' FROM patients WHERE id > :base AND id <= :base + :roster
+    """), {"doctor": doctor_id, "base": BASE_ID, "roster": roster})
+    session.execute(text("ANALYZE patients"))
+    session.execute(text("ANALYZE patient_user_links"))
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    surname = name.split()[0]
+    chars = list(surname)
+    i = rng.randrange(len(chars))
+    if rng.random() < 0.5:
+        chars[i] = rng.choice("аеиоу")
+    else:
+        del chars[i]
+    words = ["".join(chars)]
+    if rng.random() < 0.5:
+        words.append(name.split()[1])  # иногда ещё и имя
+    return " ".join(words)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--roster", type=int)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from app.infrastructure.db.session import SessionLocal
+
+    rng = random.Random(args.seed)
+    with SessionLocal() as session:
+        if not session.scalar(text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")):
+            raise SystemExit("pg_trgm не установлен: CREATE EXTENSION pg_trgm;")
+        doctor_id = uuid.uuid4()
+        started = time.perf_counter()
+        roster = args.roster or args.rows
+        _seed(session, args.rows, roster, doctor_id)
+        print(f"seeded {args.rows} patients ({roster} in roster) in {time.perf_counter() - started:.0f}s")
+
+        sample = session.scalars(text("SELECT full_name FROM patients WHERE id > :base AND id <= :base + :roster "
+                                      "ORDER BY random() LIMIT :k"),
+                                 {"base": BASE_ID, "roster": roster, "k": args.queries}).all()
+        repo = UserRepository(session)
+        timings, hits = [], 0
+        for name in sample:
+            query = _typo(rng, name)
+            t0 = time.perf_counter()
+            found = repo.search_patients(str(doctor_id), {"full_name": query, "limit": 20})
+            timings.append((time.perf_counter() - t0) * 1000)
+            hits += any(p.full_name == name for p in found)
+
+        q = statistics.quantiles(timings, n=100)
+        print(f"{len(timings)} queries: p50 {q[49]:.1f} ms  p95 {q[94]:.1f} ms  p99 {q[98]:.1f} ms  "
+              f"recall@20 {hits / len(timings):.0%}")
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
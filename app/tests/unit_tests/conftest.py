@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+# обработчики читают Settings при импорте; к этим адресам тесты не подключаются
+for name, value in {
+    "DATABASE_URL": "postgresql+psycopg2://nutriform@localhost/nutriform_test",
+    "CELERY_BROKER_URL": "redis://localhost:6379/0",
+    "CELERY_RESULT_BACKEND": "redis://localhost:6379/1",
+    "SECRET_KEY": "test",
+    "SMTP_HOST": "localhost",
+    "SMTP_PORT": "25",
+    "SMTP_USER": "test",
+    "SMTP_PASS": "test",
+    "FROM_EMAIL": "test@localhost",
+    "ADMIN_EMAIL": "admin@localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+# JSONB-колонки моделей в SQLite-тестах создаются как JSON
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+# CHECK пола и trigram-индекс модели Patients — только для Postgres с pg_trgm;
+# тестам нужна одна и та же таблица на SQLite и PostgreSQL
+_PATIENTS_DDL = text(
+    "CREATE TABLE patients (id BIGINT PRIMARY KEY, full_name TEXT, birth_date DATE, sex TEXT, "
+    "place_of_residence TEXT DEFAULT '', updated_at TIMESTAMP, metrics_inputs_updated_at TIMESTAMP)"
+)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "pg: нужен PostgreSQL из TEST_DATABASE_URL, без него тест пропускается")
+
+
+@pytest.fixture
+def pg_url():
+    """URL тестовой базы PostgreSQL; без TEST_DATABASE_URL тест пропускается."""
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return url
+
+
+@pytest.fixture
+def pg_connection(pg_url):
+    """Соединение с тестовой базой PostgreSQL в транзакции, которая откатывается после теста.
+
+    Таблицы тест создаёт сам (DDL в PostgreSQL транзакционен); сессии поверх
+    соединения коммитят только savepoint'ы.
+    """
+    engine = create_engine(pg_url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            yield conn
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+@pytest.fixture
+def create_patients_table():
+    """Функция `(conn) -> None`: создать patients без Postgres-специфичных ограничений и индексов."""
+    return lambda conn: conn.execute(_PATIENTS_DDL)
@@ -0,0 +1,90 @@
+import importlib
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.db.models import Anthropometries
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.services import anthropometry_ingest
+from app.services.anthropometry_ingest import ingest_anthropometries
+
+
+@pytest.fixture
+def factory(tmp_path, monkeypatch, create_patients_table):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    with engine.begin() as conn:
+        create_patients_table(conn)
+        conn.execute(text("INSERT INTO patients (id, birth_date, sex) VALUES "
+                          "(1, '1990-05-20', 'male'), (2, '1971-01-02', 'female')"))
+    Anthropometries.__table__.create(engine)
+    monkeypatch.setattr(anthropometry_ingest, "CHUNK_ROWS", 2)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def upserts(monkeypatch):
+    calls = []
+    # upsert body_metrics — ON CONFLICT ON CONSTRAINT, только для Postgres
+    monkeypatch.setattr(anthropometry_ingest, "upsert_body_metrics",
+                        lambda session, ids, metrics: calls.append((list(ids), metrics)))
+    return calls
+
+
+def _ndjson(*records):
+    return io.BytesIO("\n".join(r if isinstance(r, str) else json.dumps(r) for r in records).encode())
+
+
+def test_ingest_batches_metrics_and_reports_bad_rows(factory, upserts):
+    stream = _ndjson(
+        {"patient_id": 1, "height_cm": 180, "weight_kg": 80, "measured_at": "2025-05-14T10:30:00"},
+        {"patient_id": 99, "height_cm": 170, "weight_kg": 70, "measured_at": "2025-05-14T10:30:00"},
+        {"patient_id": 2, "height_cm": 162.5, "weight_kg": 58.3, "measured_at": "2025-05-14T10:30:00Z",
+         "waist_cm": 70},
+        '{"patient_id": 1, "height_cm": "tall"}',
+        {"patient_id": 1, "height_cm": 181, "weight_kg": 81, "measured_at": "2025-06-14T10:30:00"},
+    )
+    with unit_of_work(factory) as session:
+        report = ingest_anthropometries(session, stream)
+
+    assert (report.inserted, report.failed) == (3, 2)
+    assert [e.row for e in report.errors] == [2, 4]
+    assert report.errors[0].errors == ["patient_id: Patient not found"]
+    assert [len(ids) for ids, _ in upserts] == [1, 2]  # по вызову на пачку, а не на запись
+    assert upserts[0][1]["bmi"][0] == pytest.approx(100 * 80 / 180 ** 2)
+
+    with factory() as session:
+        rows = session.execute(text("SELECT patient_id, waist_cm FROM anthropometries ORDER BY measured_at")).all()
+        assert sorted(rows) == [(1, None), (1, None), (2, 70.0)]
+        stored = set(session.scalars(text("SELECT id FROM anthropometries")))
+    assert {i.hex for ids, _ in upserts for i in ids} == stored
+
+
+def test_error_cap_keeps_first_rows_not_first_found(factory, upserts, monkeypatch):
+    monkeypatch.setattr(anthropometry_ingest, "MAX_REPORTED_ERRORS", 2)
+    valid = {"height_cm": 180, "weight_kg": 80, "measured_at": "2025-05-14T10:30:00"}
+    # «пациент не найден» для записи 1 выясняется только с пачкой [1, 4] — после ошибок 2 и 3
+    stream = _ndjson({"patient_id": 99, **valid}, "{", "{", {"patient_id": 1, **valid})
+    with unit_of_work(factory) as session:
+        report = ingest_anthropometries(session, stream)
+    assert report.failed == 3
+    assert [e.row for e in report.errors] == [1, 2]
+
+
+def test_ingest_endpoint_rejects_non_utf8(factory, upserts, monkeypatch):
+    handlers = importlib.import_module("app.handlers.anthropometry")
+    monkeypatch.setattr(handlers, "SessionLocal", factory)
+    app = FastAPI()
+    app.include_router(handlers.router)
+    client = TestClient(app)
+
+    record = {"patient_id": 2, "height_cm": 170, "weight_kg": 60, "measured_at": "2025-05-14T10:30:00"}
+    response = client.post("/anthropometries/ingest", content=json.dumps(record).encode())
+    assert response.status_code == 200 and response.json()["inserted"] == 1
+
+    response = client.post("/anthropometries/ingest", content=b'{"patient_id": 2, "note": "\xc2\xe5\xf1"}\n')
+    assert response.status_code == 400 and "UTF-8" in response.json()["detail"]
@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.domain.models.pagination import PageParams
+from app.infrastructure.db.models import (
+    Anthropometries, Base, BodyMetrics, FoodGroups, QuestionnaireQuestions, Questionnaires, QuestionnaireSubmissions
+)
+from app.infrastructure.repositories import questionnaire_repository
+from app.infrastructure.repositories.async_body_metrics_repository import AsyncBodyMetricsRepository
+from app.infrastructure.repositories.async_patient_repository import AsyncPatientRepository
+from app.infrastructure.repositories.async_questionnaire_repository import AsyncQuestionnaireRepository
+from app.infrastructure.repositories.body_metrics_repository import BodyMetricsRepository
+from app.infrastructure.repositories.patient_repository import PatientRepository
+from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
+from app.services.template_cache import TemplateCache
+
+pytestmark = pytest.mark.pg
+
+MAY = datetime.datetime(2025, 5, 14, 10, 30)
+
+
+@pytest.fixture
+def db(pg_url, create_patients_table, monkeypatch):
+    """Данные в отдельной схеме и закоммичены: asyncpg работает через своё соединение.
+
+    Строки вставляются не в порядке сортировки, чтобы запрос без ORDER BY
+    (или без tie-break) вернул другой результат.
+    """
+    schema = f"test_{uuid.uuid4().hex}"
+    engine = create_engine(pg_url, connect_args={"options": f"-csearch_path={schema}"})
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        with engine.begin() as conn:
+            create_patients_table(conn)
+            Base.metadata.create_all(conn, tables=[
+                FoodGroups.__table__, Questionnaires.__table__, QuestionnaireQuestions.__table__,
+                QuestionnaireSubmissions.__table__,
+                Anthropometries.__table__, BodyMetrics.__table__,
+            ])
+            conn.execute(text("INSERT INTO patients (id, full_name, birth_date, sex, place_of_residence, updated_at) "
+                              "VALUES (3, 'Ельцова Мария', '1990-11-02', 'female', 'Тверь', :at), "
+                              "(1, 'Ёлкина Анна', '1990-05-20', 'female', 'Москва', :at), "
+                              "(2, 'Елисеев Пётр', '1985-01-01', 'male', '', :at)"), {"at": MAY})
+            conn.execute(Questionnaires.__table__.insert(), {"id": 1, "name": "IPAQ", "type": "physical_activity"})
+            conn.execute(QuestionnaireQuestions.__table__.insert(), [
+                {"id": qid, "questionnaire_id": 1, "question_text": f"q{qid}", "question_order": order}
+                for qid, order in [(10, 2), (12, 1), (11, 1), (13, None)]
+            ])
+            conn.execute(QuestionnaireSubmissions.__table__.insert(), [
+                {"id": uuid.UUID(int=n), "questionnaire_type": "nutrition", "patient_id": 1, "submitted_at": MAY}
+                for n in (2, 1, 3)
+            ])
+            # у пациента 1 два замера в одно время — «последний» с большим id
+            for n, patient_id, measured_at in [(4, 1, MAY), (5, 1, MAY), (6, 1, MAY - datetime.timedelta(days=1)),
+                                               (7, 2, MAY)]:
+                conn.execute(Anthropometries.__table__.insert(), {
+                    "id": uuid.UUID(int=n), "patient_id": patient_id, "height_cm": 180.0, "weight_kg": 70.0 + n,
+                    "measured_at": measured_at})
+                conn.execute(BodyMetrics.__table__.insert(),
+                             {"id": uuid.uuid4(), "anthropometry_id": uuid.UUID(int=n), "bmi": 20.0 + n})
+        # кэш шаблонов без общей последовательности версий
+        monkeypatch.setattr(questionnaire_repository, "template_cache", TemplateCache(read_version=lambda s: 1))
+        async_url = make_url(pg_url).set(drivername="postgresql+asyncpg")
+        yield engine, async_url, schema
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        engine.dispose()
+
+
+def _sync(db, call):
+    engine, _, _ = db
+    with Session(bind=engine) as session:
+        return call(session)
+
+
+def _async(db, call):
+    _, url, schema = db
+
+    async def run():
+        engine = create_async_engine(url, connect_args={"server_settings": {"search_path": schema}})
+        try:
+            async with AsyncSession(engine) as session:
+                return await call(session)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def test_patients_match(db):
+    page = PageParams(limit=2)
+    sync = _sync(db, lambda s: PatientRepository(s).list_all(page))
+    assert [p.id for p in sync.items] == [1, 2]
+    assert _async(db, lambda s: AsyncPatientRepository(s).list_all(page)) == sync
+
+    for patient_id in (1, 2, 404):
+        assert _async(db, lambda s: AsyncPatientRepository(s).get_by_id(patient_id)) == \
+            _sync(db, lambda s: PatientRepository(s).get_by_id(patient_id))
+        assert _async(db, lambda s: AsyncPatientRepository(s).get_versioned(patient_id)) == \
+            _sync(db, lambda s: PatientRepository(s).get_versioned(patient_id))
+
+
+def test_questions_and_submissions_match(db):
+    sync = _sync(db, lambda s: QuestionnaireRepository(s).list_questions(1))
+    assert [q["id"] for q in sync] == [11, 12, 10, 13]  # question_order, затем id
+    assert _async(db, lambda s: AsyncQuestionnaireRepository(s).list_questions(1)) == sync
+
+    page = PageParams(limit=2)
+    sync = _sync(db, lambda s: QuestionnaireRepository(s).get_submissions_by_patient(1, page))
+    assert [row["id"] for row in sync.items] == [uuid.UUID(int=3), uuid.UUID(int=2)]
+    assert _async(db, lambda s: AsyncQuestionnaireRepository(s).get_submissions_by_patient(1, page)) == sync
+
+
+def test_latest_metrics_match_including_ties(db):
+    sync_one = _sync(db, lambda s: BodyMetricsRepository(s).get_latest_metrics(1))
+    assert sync_one["id"] == uuid.UUID(int=5)
+    assert _async(db, lambda s: AsyncBodyMetricsRepository(s).get_latest_metrics(1)) == sync_one
+
+    sync_many = _sync(db, lambda s: BodyMetricsRepository(s).get_latest_metrics_many([1, 2, 3]))
+    assert [row["id"] for row in sync_many] == [uuid.UUID(int=5), uuid.UUID(int=7)]
+    assert _async(db, lambda s: AsyncBodyMetricsRepository(s).get_latest_metrics_many([1, 2, 3])) == sync_many
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from app.domain.models.pagination import Page, PageParams
+from app.use_cases.patient_use_cases import AsyncPatientService
+from app.use_cases.questionnaire_use_cases import AsyncQuestionnaireService
+
+
+class DummyPatientRepo:
+    async def get_by_id(self, patient_id):
+        return None
+
+    async def list_all(self, page):
+        return Page(items=[], next_cursor=None, total=0)
+
+
+class DummyQuestionnaireRepo:
+    async def get_questionnaire(self, questionnaire_id):
+        return {"id": 1, "name": "q", "type": "nutrition"} if questionnaire_id == 1 else None
+
+    async def list_questionnaires(self, page):
+        return Page(items=[{"id": 1, "name": "q", "type": "nutrition"}], next_cursor="x", total=None)
+
+
+def test_missing_patient_raises_value_error():
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncPatientService(DummyPatientRepo()).get_patient(1))
+
+
+def test_questionnaires_are_mapped_to_read_models():
+    svc = AsyncQuestionnaireService(DummyQuestionnaireRepo())
+    assert asyncio.run(svc.get_questionnaire(1)).name == "q"
+    with pytest.raises(ValueError):
+        asyncio.run(svc.get_questionnaire(2))
+    page = asyncio.run(svc.list_questionnaires(PageParams()))
+    assert page.items[0].type == "nutrition" and page.next_cursor == "x"
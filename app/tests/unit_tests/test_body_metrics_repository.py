@@ -0,0 +1,44 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import Anthropometries, BodyMetrics
+from app.infrastructure.repositories.body_metrics_repository import BodyMetricsRepository
+
+pytestmark = pytest.mark.pg
+
+MAY = datetime.datetime(2025, 5, 14, 10, 30)
+
+
+def test_latest_metrics_many(pg_connection, create_patients_table):
+    create_patients_table(pg_connection)
+    pg_connection.execute(text("INSERT INTO patients (id) VALUES (1), (2), (3)"))
+    Anthropometries.__table__.create(pg_connection)
+    BodyMetrics.__table__.create(pg_connection)
+
+    def measure(n, patient_id, measured_at, bmi=None):
+        pg_connection.execute(Anthropometries.__table__.insert(), {
+            "id": uuid.UUID(int=n), "patient_id": patient_id, "height_cm": 180.0, "weight_kg": 80.0 + n,
+            "measured_at": measured_at})
+        if bmi is not None:
+            pg_connection.execute(BodyMetrics.__table__.insert(),
+                                  {"id": uuid.uuid4(), "anthropometry_id": uuid.UUID(int=n), "bmi": bmi})
+
+    measure(1, 1, MAY - datetime.timedelta(days=30), bmi=24.0)
+    measure(2, 1, MAY, bmi=25.0)
+    measure(3, 1, MAY - datetime.timedelta(days=1))
+    measure(4, 2, MAY)  # два замера в одно время: побеждает больший id
+    measure(5, 2, MAY)
+    # у пациента 3 замеров нет
+
+    with Session(bind=pg_connection) as session:
+        repo = BodyMetricsRepository(session)
+        latest = {row["patient_id"]: row for row in repo.get_latest_metrics_many([1, 2, 3, 404])}
+        assert sorted(latest) == [1, 2]
+        assert (latest[1]["id"], latest[1]["bmi"]) == (uuid.UUID(int=2), 25.0)
+        assert (latest[2]["id"], latest[2]["bmi"]) == (uuid.UUID(int=5), None)
+        assert [repo.get_latest_metrics(p)["id"] for p in (1, 2)] == [latest[1]["id"], latest[2]["id"]]
+        assert repo.get_latest_metrics_many([]) == []
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.config.settings import PoolSettings
+from app.infrastructure.db.pool import engine_options, instrument, pool_stats
+
+
+def _engine(tmp_path, **overrides):
+    settings = PoolSettings(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=0.05, **overrides)
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **engine_options(settings))
+    instrument(engine, settings)
+    return engine
+
+
+def test_counts_checkouts_and_timeouts(tmp_path):
+    engine = _engine(tmp_path, DB_POOL_LIVENESS="none")
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 4 and stats["checkins"] == 4
+    assert stats["connects"] == 1 and stats["timeouts"] == 1
+    assert stats["checked_out"] == 0 and stats["size"] == 1
+
+
+def test_idle_liveness_replaces_dead_connection(tmp_path):
+    engine = _engine(tmp_path, DB_POOL_LIVENESS="idle", DB_POOL_IDLE_CHECK=0)
+    with engine.connect() as conn:
+        conn.connection.dbapi_connection.close()  # соединение «умерло» в пуле
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+    stats = pool_stats(engine)
+    assert stats["liveness_pings"] >= 1
+    assert stats["invalidations"] == 1 and stats["connects"] == 2
+
+
+def test_metrics_survive_dispose(tmp_path):
+    engine = _engine(tmp_path, DB_POOL_LIVENESS="none")
+    with engine.connect():
+        pass
+    engine.dispose()
+    assert pool_stats(engine)["checkouts"] == 1
@@ -0,0 +1,100 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import (
+    Anthropometries, Base, BodyMetrics, PatientUserLinks, Patients, QuestionnaireSubmissions, Users
+)
+from app.infrastructure.repositories.user_repository import UserRepository
+
+pytestmark = pytest.mark.pg
+
+ALICE, BOB, CAROL = (uuid.UUID(int=n) for n in (1, 2, 3))
+ADMIN = uuid.UUID(int=9)
+
+
+def _old_stats(conn, doctor_id):
+    """Прежний расчёт: отдельный запрос на каждую величину по активным пациентам доктора."""
+    scope = ("FROM patients p JOIN patient_user_links l ON l.patient_id = p.id "
+             "AND l.user_id = :doctor AND l.status = 'active'")
+    params = {"doctor": doctor_id}
+    return {
+        "total_patients": conn.execute(text(f"SELECT count(*) {scope}"), params).scalar(),
+        "average_age": conn.execute(
+            text(f"SELECT avg(date_part('year', age(current_date, p.birth_date))) {scope}"), params).scalar(),
+        "average_bmi": conn.execute(text(
+            f"SELECT avg(m.bmi) {scope} JOIN anthropometries a ON a.patient_id = p.id "
+            "JOIN body_metrics m ON m.anthropometry_id = a.id"), params).scalar(),
+        "total_surveys": conn.execute(
+            text(f"SELECT count(s.id) {scope} JOIN questionnaire_submissions s ON s.patient_id = p.id"),
+            params).scalar(),
+    }
+
+
+@pytest.fixture
+def conn(pg_connection, create_patients_table):
+    create_patients_table(pg_connection)
+    Base.metadata.create_all(pg_connection, tables=[
+        Users.__table__, PatientUserLinks.__table__, Anthropometries.__table__,
+        BodyMetrics.__table__, QuestionnaireSubmissions.__table__,
+    ])
+    pg_connection.execute(Patients.__table__.insert(), [
+        {"id": 1, "full_name": "A", "birth_date": datetime.date(1980, 3, 1), "sex": "male"},
+        {"id": 2, "full_name": "B", "birth_date": datetime.date(1995, 7, 15), "sex": "female"},
+        {"id": 3, "full_name": "C", "birth_date": datetime.date(1960, 1, 20), "sex": "female"},
+    ])
+    pg_connection.execute(Users.__table__.insert(), [
+        {"id": user_id, "email": f"{name}@x", "full_name": name, "role": role, "oidc_sub": name}
+        for user_id, name, role in [(ALICE, "alice", "doctor"), (BOB, "bob", "doctor"),
+                                    (CAROL, "carol", "doctor"), (ADMIN, "admin", "admin")]
+    ])
+    now = datetime.datetime(2025, 5, 14, 10, 30)
+    pg_connection.execute(PatientUserLinks.__table__.insert(), [
+        {"user_id": ALICE, "patient_id": 1, "added_at": now, "status": "active"},
+        {"user_id": ALICE, "patient_id": 2, "added_at": now, "status": "active"},
+        {"user_id": ALICE, "patient_id": 3, "added_at": now, "status": "inactive"},
+        {"user_id": BOB, "patient_id": 2, "added_at": now, "status": "active"},
+        {"user_id": BOB, "patient_id": 3, "added_at": now, "status": "active"},
+        # у CAROL активных пациентов нет
+        {"user_id": CAROL, "patient_id": 1, "added_at": now, "status": "inactive"},
+    ])
+    # у пациента 1 — два замера с BMI и один без body_metrics, у 2 — один, у 3 — ни одного
+    for n, patient_id, bmi in [(1, 1, 24.0), (2, 1, 26.0), (3, 1, None), (4, 2, 19.5)]:
+        pg_connection.execute(Anthropometries.__table__.insert(), {
+            "id": uuid.UUID(int=n), "patient_id": patient_id, "height_cm": 170.0, "weight_kg": 70.0,
+            "measured_at": now})
+        if bmi is not None:
+            pg_connection.execute(BodyMetrics.__table__.insert(),
+                                  {"id": uuid.uuid4(), "anthropometry_id": uuid.UUID(int=n), "bmi": bmi})
+    pg_connection.execute(QuestionnaireSubmissions.__table__.insert(), [
+        {"id": uuid.uuid4(), "questionnaire_type": "nutrition", "patient_id": patient_id}
+        for patient_id in (1, 1, 2, 3, 3, 3)
+    ])
+    return pg_connection
+
+
+def _normalized(stats):
+    return {k: (pytest.approx(float(v)) if v is not None else None) for k, v in stats.items()}
+
+
+def test_grouped_stats_match_per_doctor_queries(conn):
+    with Session(bind=conn) as session:
+        repo = UserRepository(session)
+        stats = repo.get_doctors_stats()
+        assert sorted(stats) == sorted(str(d) for d in (ALICE, BOB, CAROL))
+        for doctor_id in (ALICE, BOB, CAROL):
+            expected = _old_stats(conn, doctor_id)
+            assert stats[str(doctor_id)] == _normalized(expected)
+            assert repo.get_patient_stats(str(doctor_id)) == _normalized(expected)
+
+        assert stats[str(CAROL)] == {"total_patients": 0, "average_age": None,
+                                     "average_bmi": None, "total_surveys": 0}
+        assert (stats[str(ALICE)]["total_patients"], stats[str(ALICE)]["total_surveys"]) == (2, 3)
+        assert stats[str(ALICE)]["average_bmi"] == pytest.approx((24.0 + 26.0 + 19.5) / 3)
+        assert repo.get_patient_stats(str(uuid.UUID(int=404))) == stats[str(CAROL)]
+
+        everyone = repo.get_patient_stats(str(ALICE), all_patients=True)
+        assert (everyone["total_patients"], everyone["total_surveys"]) == (3, 6)
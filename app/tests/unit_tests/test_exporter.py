@@ -0,0 +1,40 @@
+import csv
+import datetime
+import io
+import json
+import uuid
+
+from app.services.exporter import COLUMNS, _chunked, iter_csv, iter_ndjson
+
+RECORDS = [
+    {"record_type": "anthropometry", "patient_id": 1, "full_name": "Иванов", "birth_date": datetime.date(1980, 1, 1),
+     "sex": "male", "anthropometry_id": uuid.uuid4(), "measured_at": datetime.datetime(2025, 1, 1, 9, 30),
+     "height_cm": 170.0, "weight_kg": 70.5, "waist_cm": None, "hip_cm": None,
+     "bmi": 24.39, "bsa": 1.82, "bmr": 1600.0, "ideal_weight": None},
+    {"record_type": "submission", "patient_id": 1, "full_name": "Иванов", "birth_date": datetime.date(1980, 1, 1),
+     "sex": "male", "submission_id": uuid.uuid4(), "questionnaire_type": "nutrition",
+     "submitted_at": datetime.datetime(2025, 1, 5), "total_met_minutes": None, "responses": {"q": "да, 2"}},
+]
+
+
+def test_ndjson_lines():
+    lines = list(iter_ndjson(RECORDS))
+    assert all(line.endswith("\n") for line in lines)
+    first, second = (json.loads(line) for line in lines)
+    assert first["measured_at"] == "2025-01-01T09:30:00" and first["bmi"] == 24.39
+    assert second["responses"] == {"q": "да, 2"} and second["submission_id"] == str(RECORDS[1]["submission_id"])
+
+
+def test_csv_rows():
+    text = "".join(iter_csv(dict(r) for r in RECORDS))
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert list(rows[0]) == COLUMNS
+    assert rows[0]["record_type"] == "anthropometry" and rows[0]["submission_id"] == ""
+    assert json.loads(rows[1]["responses"]) == {"q": "да, 2"}
+
+
+def test_chunked_keeps_bytes():
+    lines = [f"строка {i}\n" for i in range(1000)]
+    chunks = list(_chunked(lines, size=256))
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode() == "".join(lines)
@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app import formulas, formulas_batch
+from app.formulas import Sex
+
+RNG = np.random.default_rng(20250514)
+N = 500
+
+WEIGHT = RNG.uniform(35, 180, N)
+HEIGHT = RNG.uniform(140, 210, N)
+AGE = RNG.integers(18, 95, N)
+IS_MALE = RNG.integers(0, 2, N).astype(bool)
+SEX = [Sex.MALE if m else Sex.FEMALE for m in IS_MALE]
+
+
+def _scalar(fn, *columns):
+    return np.array([fn(*args) for args in zip(*columns)])
+
+
+class TestFormulasBatchParity:
+    @pytest.mark.parametrize("name", ["bmi", "bsa_mosteller", "bsa_shuter"])
+    def test_weight_height(self, name):
+        expected = _scalar(getattr(formulas, name), WEIGHT, HEIGHT)
+        actual = getattr(formulas_batch, name)(WEIGHT, HEIGHT)
+        np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+    @pytest.mark.parametrize("name", ["bmr_mifflin", "bmr_harris"])
+    def test_bmr(self, name):
+        expected = _scalar(getattr(formulas, name), WEIGHT, HEIGHT, AGE, SEX)
+        actual = getattr(formulas_batch, name)(WEIGHT, HEIGHT, AGE, IS_MALE)
+        np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+    def test_int8_sex_mask(self):
+        mask = IS_MALE.astype(np.int8)
+        np.testing.assert_array_equal(
+            formulas_batch.bmr_mifflin(WEIGHT, HEIGHT, AGE, mask),
+            formulas_batch.bmr_mifflin(WEIGHT, HEIGHT, AGE, IS_MALE),
+        )
+
+    def test_rec_weight(self):
+        np.testing.assert_allclose(
+            formulas_batch.lorentz_rec_weight(HEIGHT, IS_MALE),
+            _scalar(formulas.lorentz_rec_weight, HEIGHT, SEX), rtol=1e-12,
+        )
+        heights = np.concatenate([HEIGHT, [164.9, 165, 175, 175.1]])
+        np.testing.assert_allclose(
+            formulas_batch.broca_brugsch_rec_weight(heights),
+            _scalar(formulas.broca_brugsch_rec_weight, heights), rtol=1e-12,
+        )
+
+    def test_weight_loss_and_katch(self):
+        current = WEIGHT * RNG.uniform(0.8, 1.0, N)
+        np.testing.assert_allclose(
+            formulas_batch.weight_loss_pct(WEIGHT, current),
+            _scalar(formulas.weight_loss_pct, WEIGHT, current), rtol=1e-12,
+        )
+        np.testing.assert_allclose(
+            formulas_batch.bmr_katch(WEIGHT * 0.7),
+            _scalar(formulas.bmr_katch, WEIGHT * 0.7), rtol=1e-12,
+        )
+
+    def test_high_nutritional_risk_including_bounds(self):
+        loss = np.concatenate([RNG.uniform(0, 20, N), [5, 5.01, 7.5, 7.51, 10, 10.01]])
+        months = RNG.choice([1, 2, 3, 6, 12], loss.shape)
+        risk = formulas_batch.high_nutritional_risk(loss, months)
+        assert risk.dtype == bool
+        assert list(risk) == [formulas.high_nutritional_risk(l, m) for l, m in zip(loss, months)]
+        assert list(formulas_batch.high_nutritional_risk([5, 5.01, 7.5, 7.51], [1, 1, 3, 3])) == \
+            [False, True, False, True]
+
+    def test_bio_impedance(self):
+        fat, h_m = WEIGHT * 0.25, HEIGHT / 100
+        cases = [
+            ("fat_percent", (fat, WEIGHT)),
+            ("fat_mass_index", (fat, h_m)),
+            ("ffm_index", (WEIGHT - fat, h_m)),
+            ("body_water_percent", (WEIGHT * 0.55, WEIGHT)),
+            ("ecw_ratio", (WEIGHT * 0.2, WEIGHT * 0.55)),
+            ("bmi_with_amputation", (WEIGHT, h_m, np.full(N, 0.065))),
+        ]
+        for name, args in cases:
+            np.testing.assert_allclose(
+                getattr(formulas_batch, name)(*args),
+                _scalar(getattr(formulas, name), *args), rtol=1e-12, err_msg=name,
+            )
+
+    def test_bmi_category_including_bounds(self):
+        values = np.concatenate([
+            formulas_batch.bmi(WEIGHT, HEIGHT) * 100,
+            [15.99, 16, 18.5, 24.99, 25, 30, 35, 40, 55],
+        ])
+        assert list(formulas_batch.bmi_category(values)) == [formulas.bmi_category(v) for v in values]
+
+    def test_waist_status_including_bounds(self):
+        waist = np.concatenate([RNG.uniform(60, 130, N), [80, 80.1, 88, 88.1, 94, 94.1, 102, 102.1]])
+        is_male = np.resize(IS_MALE, waist.shape)
+        sex = [Sex.MALE if m else Sex.FEMALE for m in is_male]
+        assert list(formulas_batch.waist_status(waist, is_male)) == \
+            [formulas.waist_status(w, s) for w, s in zip(waist, sex)]
+
+    def test_whr_status(self):
+        waist, hip = RNG.uniform(60, 130, N), RNG.uniform(80, 140, N)
+        ratios = np.concatenate([formulas_batch.whr(waist, hip), [0.8, 0.95]])
+        is_male = np.resize(IS_MALE, ratios.shape)
+        sex = [Sex.MALE if m else Sex.FEMALE for m in is_male]
+        np.testing.assert_allclose(ratios[:N], _scalar(formulas.whr, waist, hip), rtol=1e-12)
+        assert list(formulas_batch.whr_status(ratios, is_male)) == \
+            [formulas.whr_status(r, s) for r, s in zip(ratios, sex)]
+
+
+def test_sex_mask_and_age_years():
+    assert list(formulas_batch.sex_mask([Sex.MALE, "female", "male"])) == [True, False, True]
+
+    measured = [datetime(2025, 5, 14, 10, 30), datetime(2024, 2, 29, 23, 59)]
+    born = [date(1990, 5, 20), date(2000, 3, 1)]
+    expected = [(m.date() - b).days // 365 for m, b in zip(measured, born)]
+    assert list(formulas_batch.age_years(measured, born)) == expected
@@ -37,3 +37,34 @@ def test_mixed_combination():
         DummyAnswer("Сколько времени в день вы обычно проводите сидя", 3, met_minutes=1.5)
     ]
     assert compute_met_minutes(answers) == pytest.approx(2*3.0 + 1.5*7)  # 6 + 10.5 = 16.5
+
+
+def test_incremental_apply_matches_full_recompute():
+    import random
+
+    from app.services.met_calculator import apply_answer, is_sedentary
+
+    rng = random.Random(7)
+    texts = ["Сколько раз в неделю вы бегаете", "Сколько минут в день вы бегаете",
+             "Сколько времени в день вы обычно проводите сидя"]
+    for _ in range(200):
+        answers = [
+            DummyAnswer(rng.choice(texts), order,
+                        days_per_week=rng.choice([None, 0, 2, 5]),
+                        met_minutes=rng.choice([None, 0, 1.5, 30.0]))
+            for order in range(rng.randint(0, 12))
+        ]
+        total, pending = 0.0, None
+        for i, ans in enumerate(answers):
+            total, pending = apply_answer(total, pending, is_sedentary(ans.question.question_text),
+                                          ans.days_per_week, ans.met_minutes)
+            assert total == pytest.approx(compute_met_minutes(answers[:i + 1]))
+
+
+def test_question_classification():
+    from app.services.question_meta import classify_question
+
+    meta = classify_question("Сколько времени в день вы обычно проводите СИДЯ?", None)
+    assert meta.sedentary and meta.question_order == 0
+    meta = classify_question("Сколько дней в неделю вы бегаете", 3)
+    assert not meta.sedentary and meta.question_order == 3
@@ -0,0 +1,105 @@
+import random
+import uuid
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.domain.models.questionnaire import AnswerCreate
+from app.handlers.submissions import add_answers
+from app.infrastructure.db.models import (
+    Base, Questionnaires, QuestionnaireQuestions, QuestionnaireSubmissions, QuestionnaireAnswers,
+)
+from app.infrastructure.repositories import questionnaire_repository
+from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
+from app.services import met_calculator
+from app.services.met_calculator import recompute_submission_met_minutes
+from app.services.met_sql import recompute_all_met_minutes
+from app.services.question_meta import QuestionMetaCache
+from app.services.template_cache import TemplateCache
+from app.use_cases.questionnaire_use_cases import QuestionnaireService
+
+
+TEXTS = [
+    "Сколько раз в неделю вы бегаете",
+    "Сколько минут в день вы бегаете",
+    "Сколько времени в день вы обычно проводите сидя",
+]
+
+
+@pytest.fixture
+def session(monkeypatch):
+    engine = create_engine("sqlite://")
+    tables = [m.__table__ for m in (Questionnaires, QuestionnaireQuestions,
+                                    QuestionnaireSubmissions, QuestionnaireAnswers)]
+    Base.metadata.create_all(engine, tables=tables)
+    # общая версия шаблонов — последовательность PostgreSQL; здесь она неизменна
+    monkeypatch.setattr(met_calculator, "question_meta_cache",
+                        QuestionMetaCache(TemplateCache(read_version=lambda session: 1)))
+    with Session(engine) as s:
+        yield s
+
+
+def test_sql_recompute_matches_python(session):
+    rng = random.Random(11)
+    session.add(Questionnaires(id=1, name="pa", type="physical_activity"))
+    for qid in range(1, 21):
+        session.add(QuestionnaireQuestions(id=qid, questionnaire_id=1, question_text=rng.choice(TEXTS),
+                                           question_order=rng.choice([None, qid, qid, 3])))
+    submission_ids = []
+    for k in range(60):
+        sid = uuid.uuid4()
+        submission_ids.append(sid)
+        session.add(QuestionnaireSubmissions(id=sid, patient_id=1, responses={},
+                                             questionnaire_type="physical_activity"))
+        for _ in range(rng.randint(0, 15)):
+            session.add(QuestionnaireAnswers(
+                submission_id=sid,
+                question_id=rng.choice([None] + list(range(1, 21))),
+                days_per_week=rng.choice([None, 0, 3, 7]),
+                met_minutes=rng.choice([None, Decimal("0"), Decimal("12.5"), Decimal("40.25")]),
+            ))
+    session.commit()
+
+    assert recompute_all_met_minutes(session, batch_size=7) == 60
+    session.expire_all()
+    from_sql = {sid: session.get(QuestionnaireSubmissions, sid).total_met_minutes for sid in submission_ids}
+    assert any(from_sql.values())
+
+    for sid in submission_ids:
+        recompute_submission_met_minutes(session, sid)
+        assert from_sql[sid] == pytest.approx(session.get(QuestionnaireSubmissions, sid).total_met_minutes)
+
+
+def test_bulk_answers_insert_once_and_score_once(session, monkeypatch):
+    session.add(Questionnaires(id=1, name="pa", type="physical_activity"))
+    for qid, text in enumerate(TEXTS, start=1):
+        session.add(QuestionnaireQuestions(id=qid, questionnaire_id=1, question_text=text, question_order=qid))
+    sid = uuid.uuid4()
+    session.add(QuestionnaireSubmissions(id=sid, patient_id=1, responses={}, questionnaire_type="physical_activity"))
+    session.commit()
+
+    recomputed = []
+    monkeypatch.setattr(questionnaire_repository, "recompute_submission_met_minutes",
+                        lambda s, submission_id: (recomputed.append(submission_id),
+                                                  recompute_submission_met_minutes(s, submission_id)))
+
+    # ответы не по порядку вопросов: сидячее время, затем пара «дни» + «минуты»
+    answers = [{"question_id": 3, "met_minutes": 10}, {"question_id": 1, "days_per_week": 3},
+               {"question_id": 2, "met_minutes": 20}]
+    ids = QuestionnaireRepository(session).add_answers(sid, answers)
+
+    assert recomputed == [sid]
+    stored = dict(session.execute(select(QuestionnaireAnswers.id, QuestionnaireAnswers.question_id)).all())
+    assert len(stored) == 3 and [stored[i] for i in ids] == [3, 1, 2]
+    assert session.get(QuestionnaireSubmissions, sid).total_met_minutes == pytest.approx(10 * 7 + 3 * 20)
+
+
+def test_bulk_answers_for_unknown_submission_is_404(session):
+    svc = QuestionnaireService(QuestionnaireRepository(session))
+    with pytest.raises(HTTPException) as exc:
+        add_answers(uuid.uuid4(), [AnswerCreate(question_id=1, met_minutes=5)], svc)
+    assert exc.value.status_code == 404
+    assert session.scalar(select(QuestionnaireAnswers.id)) is None
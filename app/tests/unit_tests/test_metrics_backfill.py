@@ -0,0 +1,81 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import Anthropometries, BodyMetrics, Patients
+from app.services.metrics_backfill import iter_anthropometry_chunks
+from app.services.metrics_recalculator import FORMULA_VERSION
+
+T0 = datetime.datetime(2025, 1, 1)
+COMPUTED = datetime.datetime(2025, 2, 1)
+LATER = datetime.datetime(2025, 3, 1)
+
+
+def _id(n):
+    return uuid.UUID(int=n)
+
+
+@pytest.fixture
+def session(create_patients_table):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        create_patients_table(conn)
+        conn.execute(text("INSERT INTO patients (id, full_name, birth_date, sex, metrics_inputs_updated_at) VALUES "
+                          "(1, 'A', '1990-05-20', 'male', NULL), (2, 'B', '1980-01-01', 'female', :later), "
+                          "(3, 'C', '1970-01-01', NULL, NULL)"), {"later": LATER})
+    Anthropometries.__table__.create(engine)
+    BodyMetrics.__table__.create(engine)
+    with Session(engine) as s:
+        yield s
+
+
+def _measure(session, n, patient_id=1, updated_at=T0, **metrics):
+    session.add(Anthropometries(id=_id(n), patient_id=patient_id, height_cm=180.0, weight_kg=80.0,
+                                measured_at=T0, updated_at=updated_at))
+    if metrics:
+        values = {"bmi": 24.7, "bsa": 2.0, "bmr": 1800.0, "formula_version": FORMULA_VERSION,
+                  "computed_at": COMPUTED, **metrics}
+        session.add(BodyMetrics(id=uuid.uuid4(), anthropometry_id=_id(n), **values))
+
+
+def test_only_stale_rows_are_selected(session):
+    _measure(session, 1)                                      # метрик нет
+    _measure(session, 2, computed_at=COMPUTED)                # свежие
+    _measure(session, 3, updated_at=LATER, computed_at=COMPUTED)  # антропометрию изменили после расчёта
+    _measure(session, 4, patient_id=2, computed_at=COMPUTED)  # пол/дату рождения изменили после расчёта
+    _measure(session, 5, formula_version=FORMULA_VERSION - 1)
+    _measure(session, 6, bmi=None)
+    _measure(session, 8, patient_id=3)                        # у пациента нет пола — считать не из чего
+    _measure(session, 9, computed_at=COMPUTED)                # свежие
+    session.commit()
+
+    chunks = list(iter_anthropometry_chunks(session, chunk_size=2, only_stale=True))
+    assert [[row.id for row in chunk] for chunk in chunks] == [[_id(1), _id(3)], [_id(4), _id(5)], [_id(6)]]
+    every = [row.id for chunk in iter_anthropometry_chunks(session, chunk_size=4) for row in chunk]
+    assert every == [_id(n) for n in (1, 2, 3, 4, 5, 6, 9)]
+
+
+def _stale_ids(session):
+    return [row.id for chunk in iter_anthropometry_chunks(session, only_stale=True) for row in chunk]
+
+
+def test_only_metric_inputs_of_patient_make_metrics_stale(session):
+    _measure(session, 1, computed_at=COMPUTED)
+    session.commit()
+    patient = session.get(Patients, 1)
+
+    patient.full_name, patient.place_of_residence = "Новое ФИО", "Тверь"
+    session.commit()
+    assert patient.updated_at > COMPUTED and patient.metrics_inputs_updated_at is None
+    assert _stale_ids(session) == []
+
+    patient.sex = "male"  # то же значение — не изменение
+    session.commit()
+    assert _stale_ids(session) == []
+
+    patient.birth_date = datetime.date(1990, 5, 21)
+    session.commit()
+    assert _stale_ids(session) == [_id(1)]
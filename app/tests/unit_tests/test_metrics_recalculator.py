@@ -48,3 +48,36 @@ def test_recompute_body_metrics_adds_metrics():
     expected_bmi = bmi(80.0, 180.0)
     assert pytest.approx(metrics.bmi, rel=1e-6) == expected_bmi
     assert metrics.anthropometry_id == anthropometry.id
+
+
+def test_batch_metrics_match_scalar_recompute():
+    from sqlalchemy.dialects import postgresql
+
+    from app.services.metrics_recalculator import compute_body_metrics_batch, upsert_body_metrics
+
+    measured = datetime(2025, 5, 14, 10, 30)
+    rows = [
+        ("a1", 180.0, 80.0, measured, date(1990, 5, 20), "male"),
+        ("a2", 162.5, 58.3, measured, date(1971, 1, 2), "female"),
+        ("a3", 171.0, 95.1, measured, date(2001, 12, 31), "male"),
+    ]
+    ids, height, weight, measured_at, birth_date, sex = zip(*rows)
+    batch = compute_body_metrics_batch(height, weight, measured_at, birth_date, sex)
+
+    for i, (id_, h, w, m, b, s) in enumerate(rows):
+        session = DummySession()
+        recompute_body_metrics(session, DummyAnthropometry(id_, h, w, m, DummyPatient(b, s)))
+        scalar = session.added[0]
+        assert batch["bmi"][i] == pytest.approx(scalar.bmi, rel=1e-12)
+        assert batch["bsa"][i] == pytest.approx(scalar.bsa, rel=1e-12)
+        assert batch["bmr"][i] == pytest.approx(scalar.bmr, rel=1e-12)
+
+    class RecordingSession:
+        def execute(self, stmt, params=None):
+            self.sql = str(stmt.compile(dialect=postgresql.dialect()))
+            self.params = params
+
+    session = RecordingSession()
+    assert upsert_body_metrics(session, ids, batch) == 3
+    assert "ON CONFLICT ON CONSTRAINT unq_body_metrics_anthropometry_id DO UPDATE" in session.sql
+    assert [p["anthropometry_id"] for p in session.params] == list(ids)
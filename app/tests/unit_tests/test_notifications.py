@@ -0,0 +1,187 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.domain.models.users import NotificationRecipients
+from app.infrastructure.db.models import Notifications
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.infrastructure.repositories import notifications
+from app.services import notification_hub as hub_module
+from app.services.notification_hub import CHANNEL, MAX_PAYLOAD_BYTES, RESYNC, NotificationHub
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notifications.db'}")
+    with engine.begin() as conn:
+        # CHECK роли у users написан для Postgres — для теста таблица без него
+        conn.execute(text(
+            "CREATE TABLE users (id CHAR(32) PRIMARY KEY, email TEXT, full_name TEXT, role TEXT, "
+            "oidc_sub TEXT, position TEXT, unread_notifications INTEGER DEFAULT 0 NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE patient_user_links (user_id CHAR(32), patient_id INTEGER, added_at DATETIME, "
+            "status TEXT DEFAULT 'active', PRIMARY KEY (user_id, patient_id))"
+        ))
+    Notifications.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    local = NotificationHub(dsn=lambda: None, queue_size=2)
+    monkeypatch.setattr(hub_module, "notification_hub", local)
+    return local
+
+
+def _user(factory, role="doctor"):
+    user_id = uuid.uuid4()
+    with unit_of_work(factory) as session:
+        session.execute(text("INSERT INTO users (id, role) VALUES (:id, :role)"), {"id": user_id.hex, "role": role})
+    return user_id
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_counter_follows_create_and_mark_read(factory, hub):
+    user_id = _user(factory)
+    with unit_of_work(factory) as session:
+        ids = [notifications.create_notification(session, user_id, f"n{i}") for i in range(3)]
+    with unit_of_work(factory) as session:
+        assert notifications.unread_count(session, user_id) == 3
+        assert notifications.mark_read(session, user_id, [ids[0], ids[0]]) == (1, 2)
+        assert notifications.mark_read(session, user_id, [ids[0]]) == (0, 2)
+        assert notifications.mark_read(session, user_id) == (2, 0)
+    with unit_of_work(factory) as session:
+        assert notifications.unread_count(session, user_id) == 0
+        assert notifications.unread_count(session, uuid.uuid4()) is None
+
+
+def test_events_are_published_after_commit_only(factory, hub):
+    user_id = _user(factory)
+
+    async def scenario():
+        queue = await hub.subscribe(user_id)
+        with pytest.raises(RuntimeError):
+            with unit_of_work(factory) as session:
+                notifications.create_notification(session, user_id, "rolled back")
+                raise RuntimeError
+        with unit_of_work(factory) as session:
+            notifications.create_notification(session, user_id, "hello")
+        await asyncio.sleep(0)
+        return _drain(queue)
+
+    events = asyncio.run(scenario())
+    assert [(e["type"], e["message"], e["unread"]) for e in events] == [("notification", "hello", 1)]
+
+
+def test_fan_out_by_selector(factory, hub):
+    doctors = [_user(factory) for _ in range(3)]
+    admin = _user(factory, role="admin")
+    with unit_of_work(factory) as session:
+        session.execute(text("INSERT INTO patient_user_links (user_id, patient_id, status) VALUES "
+                             "(:a, 7, 'active'), (:b, 7, 'inactive')"), {"a": doctors[0].hex, "b": doctors[1].hex})
+        notifications.create_notification(session, doctors[0], "earlier")
+
+    async def scenario():
+        queue = await hub.subscribe(doctors[0])
+        with unit_of_work(factory) as session:
+            assert notifications.fan_out(session, NotificationRecipients(role="doctor"), "all") == 3
+            assert notifications.fan_out(session, NotificationRecipients(patient_id=7), "linked") == 1
+            assert notifications.fan_out(session, NotificationRecipients(role="admin", user_ids=doctors), "none") == 0
+        await asyncio.sleep(0)
+        return _drain(queue)
+
+    events = asyncio.run(scenario())
+    assert [(e["message"], e["unread"]) for e in events] == [("all", 2), ("linked", 3)]
+    with unit_of_work(factory) as session:
+        assert [notifications.unread_count(session, u) for u in doctors + [admin]] == [3, 1, 1, 0]
+
+
+def test_slow_subscriber_gets_resync(hub):
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        queue = await hub.subscribe(user_id)
+        for i in range(3):
+            hub.publish(f'{{"type": "unread", "user_id": "{user_id}", "unread": {i}}}')
+        await asyncio.sleep(0)
+        events = _drain(queue)
+        hub.unsubscribe(user_id, queue)
+        return events
+
+    assert asyncio.run(scenario()) == [RESYNC]
+    assert hub._subscribers == {}
+
+
+@pytest.mark.pg
+def test_fan_out_pg_single_statement(pg_url):
+    """INSERT, UPDATE счётчиков и pg_notify в одном data-modifying CTE.
+
+    pg_notify доставляется только после коммита, поэтому таблицы временные:
+    коммит ничего не оставляет в базе после закрытия соединения.
+    """
+    engine = create_engine(pg_url)
+    doctors = [uuid.UUID(int=n) for n in (1, 2, 3)]
+    admin = uuid.UUID(int=9)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text(
+                "CREATE TEMP TABLE users (id UUID PRIMARY KEY, email TEXT, full_name TEXT, role TEXT, "
+                "oidc_sub TEXT, position TEXT, unread_notifications INTEGER DEFAULT 0 NOT NULL)"
+            ))
+            conn.execute(text(
+                "CREATE TEMP TABLE patient_user_links (user_id UUID, patient_id BIGINT, added_at TIMESTAMP, "
+                "status TEXT DEFAULT 'active', PRIMARY KEY (user_id, patient_id))"
+            ))
+            conn.execute(text(
+                "CREATE TEMP TABLE notifications (id SERIAL PRIMARY KEY, "
+                "user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE, message TEXT NOT NULL, "
+                "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, is_read BOOLEAN DEFAULT false NOT NULL)"
+            ))
+            conn.execute(text("INSERT INTO users (id, role, unread_notifications) VALUES "
+                              "(:a, 'doctor', 4), (:b, 'doctor', 0), (:c, 'doctor', 0), (:admin, 'admin', 0)"),
+                         {"a": doctors[0], "b": doctors[1], "c": doctors[2], "admin": admin})
+            conn.execute(text("INSERT INTO patient_user_links (user_id, patient_id, status) VALUES "
+                              "(:a, 7, 'active'), (:b, 7, 'inactive')"), {"a": doctors[0], "b": doctors[1]})
+            conn.execute(text(f"LISTEN {CHANNEL}"))
+            conn.commit()
+
+            statements = []
+            event.listen(conn, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            long_message = "x" * MAX_PAYLOAD_BYTES
+            with Session(bind=conn) as session:
+                assert notifications.fan_out(session, NotificationRecipients(role="doctor"), "all") == 3
+                assert notifications.fan_out(session, NotificationRecipients(patient_id=7), long_message) == 1
+                nobody = NotificationRecipients(role="admin", user_ids=doctors)
+                assert notifications.fan_out(session, nobody, "none") == 0
+                session.commit()
+            assert len(statements) == 3  # по одному запросу на рассылку
+
+            rows = conn.execute(text("SELECT user_id, left(message, 3) FROM notifications ORDER BY id")).all()
+            assert sorted(rows[:3]) == [(d, "all") for d in doctors] and rows[3:] == [(doctors[0], "xxx")]
+            counters = dict(conn.execute(text("SELECT id, unread_notifications FROM users")).all())
+            assert counters == {doctors[0]: 6, doctors[1]: 1, doctors[2]: 1, admin: 0}
+
+            dbapi = conn.connection.dbapi_connection
+            dbapi.poll()
+            events = [json.loads(n.payload) for n in dbapi.notifies if n.channel == CHANNEL]
+    finally:
+        engine.dispose()
+
+    # длинный текст в событие не попадает — клиент дочитает его из списка
+    assert {(e["user_id"], e["unread"]): e["message"] for e in events} == {
+        (str(doctors[0]), 5): "all", (str(doctors[1]), 1): "all", (str(doctors[2]), 1): "all",
+        (str(doctors[0]), 6): None,
+    }
+    ids = {e["id"] for e in events}
+    assert len(ids) == 4 and all(e["type"] == "notification" and e["created_at"] for e in events)
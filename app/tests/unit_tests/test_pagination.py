@@ -0,0 +1,92 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine, select
+from sqlalchemy.orm import Session
+
+from app.domain.models.pagination import InvalidCursor, PageParams
+from app.infrastructure.db.models import Base, Questionnaires, QuestionnaireSubmissions
+from app.infrastructure.repositories.pagination import decode_cursor, encode_cursor, paginate
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Questionnaires.__table__, QuestionnaireSubmissions.__table__])
+    with Session(engine) as s:
+        yield s
+
+
+def _walk(session, stmt, columns, limit, **kw):
+    seen, after = [], None
+    while True:
+        page = paginate(session, stmt, columns, PageParams(limit=limit, after=after), scalars=True, **kw)
+        assert len(page.items) <= limit
+        seen.extend(page.items)
+        if page.next_cursor is None:
+            return seen
+        after = page.next_cursor
+
+
+def test_pages_cover_all_rows_once(session):
+    session.add_all(Questionnaires(id=i, name=f"q{i}", type="nutrition") for i in range(1, 24))
+    session.commit()
+
+    items = _walk(session, select(Questionnaires), [Questionnaires.id], limit=5)
+    assert [q.id for q in items] == list(range(1, 24))
+
+    page = paginate(session, select(Questionnaires), [Questionnaires.id], PageParams(limit=100, with_total=True))
+    assert page.total == 23 and page.next_cursor is None
+
+
+def test_descending_compound_key_with_ties(session):
+    S = QuestionnaireSubmissions
+    base = datetime.datetime(2025, 1, 1)
+    for k in range(17):
+        session.add(S(id=uuid.uuid4(), patient_id=1, responses={}, questionnaire_type="nutrition",
+                      submitted_at=base + datetime.timedelta(days=k // 4)))
+    session.commit()
+
+    items = _walk(session, select(S).where(S.patient_id == 1), [S.submitted_at, S.id], limit=3, descending=True)
+    keys = [(s.submitted_at, s.id) for s in items]
+    assert len(set(keys)) == 17
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_cursor_roundtrip_and_garbage():
+    S = QuestionnaireSubmissions
+    values = (datetime.datetime(2025, 5, 1, 12, 30), uuid.uuid4())
+    assert decode_cursor(encode_cursor(values), [S.submitted_at, S.id]) == values
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", [S.submitted_at, S.id])
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1]), [S.submitted_at, S.id])
+
+
+def test_nullable_key_pages_cover_null_rows():
+    events = Table("events", MetaData(), Column("id", Integer, primary_key=True), Column("at", DateTime))
+    engine = create_engine("sqlite://")
+    events.metadata.create_all(engine)
+    base = datetime.datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(events.insert(), [{"id": i, "at": None if i % 3 == 0 else base + datetime.timedelta(days=i % 4)}
+                                       for i in range(1, 12)])
+
+    def walk(descending):
+        seen, after = [], None
+        with Session(engine) as session:
+            while True:
+                page = paginate(session, select(events), [events.c.at, events.c.id],
+                                PageParams(limit=2, after=after), descending=descending)
+                seen.extend(row.id for row in page.items)
+                if page.next_cursor is None:
+                    return seen
+                after = page.next_cursor
+
+    # NULL — меньше любой даты: последними по убыванию, первыми по возрастанию
+    newest_first = walk(descending=True)
+    assert sorted(newest_first) == list(range(1, 12))
+    assert newest_first[-3:] == [9, 6, 3]
+    assert walk(descending=False) == newest_first[::-1]
+    assert decode_cursor(encode_cursor([None, 3]), [events.c.at, events.c.id]) == (None, 3)
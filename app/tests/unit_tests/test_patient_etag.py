@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.handlers.patients import router
+from app.infrastructure.db.routing import RoutingSession
+from app.infrastructure.db.session import get_db
+
+
+@pytest.fixture
+def client(tmp_path, create_patients_table):
+    def _engine(name, rows):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        with engine.begin() as conn:
+            create_patients_table(conn)
+            conn.execute(text("INSERT INTO patients (id, full_name, birth_date, sex, place_of_residence, updated_at) "
+                              "VALUES (:id, :name, '1990-05-20', 'male', 'Москва', :at)"),
+                         rows)
+        return engine
+
+    # реплика отстаёт: у пациента 1 старое ФИО, пациента 2 ещё нет
+    primary = _engine("primary.db", [
+        {"id": 1, "name": "Новое ФИО", "at": datetime.datetime(2025, 6, 1, 12)},
+        {"id": 2, "name": "Только что создан", "at": datetime.datetime(2025, 6, 1, 12)},
+    ])
+    replica = _engine("replica.db", [
+        {"id": 1, "name": "Старое ФИО", "at": datetime.datetime(2025, 1, 1, 12)},
+    ])
+
+    def db():
+        with RoutingSession(bind=primary, replicas=[replica]) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = db
+    return TestClient(app)
+
+
+def test_body_and_etag_come_from_the_same_row(client):
+    response = client.get("/patients/1")
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Новое ФИО"
+    assert response.headers["etag"] == '"patient-1-20250601120000000000"'
+
+    again = client.get("/patients/1", headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_patient_missing_on_replica_is_found(client):
+    assert client.get("/patients/2").json()["full_name"] == "Только что создан"
+    assert client.get("/patients/3").status_code == 404
@@ -0,0 +1,75 @@
+import datetime
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.domain.models.patient import PatientCreate
+from app.infrastructure.db import patient_ids
+from app.infrastructure.db.patient_ids import PatientIdAllocator
+from app.infrastructure.repositories.patient_repository import PatientRepository
+
+
+class DummySequence:
+    """patient_id_seq: nextval атомарен, как в PostgreSQL."""
+
+    def __init__(self, start=10_000_000):
+        self._counter = itertools.count(start)
+        self._lock = threading.Lock()
+        self.reserve_calls = 0
+
+    def nextval(self, n):
+        with self._lock:
+            self.reserve_calls += 1
+            values = [next(self._counter) for _ in range(n)]
+        time.sleep(0.001)  # окно для гонок между потоками
+        return values
+
+
+class DummySession:
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.added = []
+        self.commits = 0
+
+    def scalars(self, stmt, params):
+        return iter(self.sequence.nextval(params["n"]))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_concurrent_creates_get_unique_ids(monkeypatch):
+    sequence = DummySequence()
+    monkeypatch.setattr(patient_ids, "patient_id_allocator", PatientIdAllocator(block_size=25))
+    monkeypatch.setattr("app.infrastructure.repositories.patient_repository.patient_id_allocator",
+                        patient_ids.patient_id_allocator)
+    data = PatientCreate(full_name="Иванов Иван", birth_date=datetime.date(1990, 5, 20), sex="male",
+                         place_of_residence="Москва")
+
+    def create_many(_):
+        session = DummySession(sequence)
+        repo = PatientRepository(session)
+        ids = [repo.create_patient(data) for _ in range(50)]
+        assert [p.id for p in session.added] == ids and session.commits == 0  # коммитит граница запроса
+        return ids
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        ids = [i for chunk in pool.map(create_many, range(32)) for i in chunk]
+
+    assert len(ids) == len(set(ids)) == 32 * 50
+    assert sequence.reserve_calls == 32 * 50 // 25  # по запросу к БД на блок, без проб
+
+
+def test_block_is_dropped_after_fork(monkeypatch):
+    sequence = DummySequence(start=1)
+    allocator = PatientIdAllocator(block_size=10)
+    session = DummySession(sequence)
+    assert [allocator.next_id(session) for _ in range(3)] == [1, 2, 3]
+
+    monkeypatch.setattr(patient_ids.os, "getpid", lambda: -1)
+    assert allocator.next_id(session) == 11
+    assert sequence.reserve_calls == 2
@@ -0,0 +1,128 @@
+import importlib
+import io
+import itertools
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.models.imports import DoctorNotFound, InvalidEncoding
+from app.infrastructure.db.patient_ids import PatientIdAllocator
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.services import patient_import
+from app.services.patient_import import _copy_value, import_patients
+
+
+class CountingAllocator(PatientIdAllocator):
+    def __init__(self):
+        super().__init__()
+        self._counter = itertools.count(1000)
+        self.reserve_calls = 0
+
+    def _reserve(self, session, n):
+        self.reserve_calls += 1
+        return [next(self._counter) for _ in range(n)]
+
+
+@pytest.fixture
+def factory(tmp_path, monkeypatch, create_patients_table):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    with engine.begin() as conn:
+        # CHECK-ограничения моделей написаны для Postgres — таблицы без них
+        conn.execute(text("CREATE TABLE users (id CHAR(32) PRIMARY KEY, role TEXT)"))
+        create_patients_table(conn)
+        conn.execute(text(
+            "CREATE TABLE patient_user_links (user_id CHAR(32), patient_id BIGINT, added_at DATETIME, "
+            "status TEXT, PRIMARY KEY (user_id, patient_id))"
+        ))
+    monkeypatch.setattr(patient_import, "patient_id_allocator", CountingAllocator())
+    monkeypatch.setattr(patient_import, "CHUNK_ROWS", 2)
+    return sessionmaker(bind=engine)
+
+
+CSV = (
+    "﻿full_name,birth_date,sex,place_of_residence\n"
+    "Иванов Иван,1990-05-20,male,Москва\n"
+    "Петрова Анна,1985-13-01,female,Казань\n"
+    "Сидоров Пётр,1979-02-11,male,\n"
+    "Кузнецова Ольга,1992-07-03,unknown,Тула\n"
+    "Смирнов Олег,2001-12-31,male,Пермь\n"
+)
+
+
+def test_csv_import_reports_bad_rows_and_links_doctor(factory):
+    doctor = uuid.uuid4()
+    with unit_of_work(factory) as session:
+        session.execute(text("INSERT INTO users VALUES (:id, 'doctor')"), {"id": doctor.hex})
+    with unit_of_work(factory) as session:
+        report = import_patients(session, io.BytesIO(CSV.encode()), "csv", doctor)
+
+    assert (report.imported, report.failed, report.linked) == (3, 2, 3)
+    assert [e.row for e in report.errors] == [2, 4]
+    assert report.errors[0].errors[0].startswith("birth_date:")
+    assert patient_import.patient_id_allocator.reserve_calls == 2  # пачки по CHUNK_ROWS
+    with factory() as session:
+        rows = session.execute(text("SELECT id, full_name, place_of_residence FROM patients ORDER BY id")).all()
+        assert rows == [(1000, "Иванов Иван", "Москва"), (1001, "Сидоров Пётр", ""), (1002, "Смирнов Олег", "Пермь")]
+        links = session.execute(text("SELECT patient_id FROM patient_user_links WHERE status = 'active'"))
+        assert sorted(links.scalars()) == [1000, 1001, 1002]
+
+
+def test_ndjson_errors_and_unknown_doctor(factory):
+    data = (
+        b'{"full_name": "A", "birth_date": "2000-01-01", "sex": "female", "place_of_residence": "X"}\n'
+        b'\n'
+        b'{not json\n'
+        b'[1, 2]\n'
+    )
+    with unit_of_work(factory) as session:
+        report = import_patients(session, io.BytesIO(data), "ndjson")
+    assert (report.imported, report.failed) == (1, 2)
+    assert [e.row for e in report.errors] == [2, 3]
+    assert report.errors[0].errors[0].startswith("row: invalid JSON")
+
+    with pytest.raises(DoctorNotFound):
+        with unit_of_work(factory) as session:
+            import_patients(session, io.BytesIO(data), "ndjson", uuid.uuid4())
+
+
+def test_non_utf8_input_aborts_import(factory):
+    data = CSV.encode() + "Орлов Ян,1990-01-01,male,Омск\n".encode("cp1251")
+    with pytest.raises(InvalidEncoding):
+        with unit_of_work(factory) as session:
+            import_patients(session, io.BytesIO(data), "csv")
+    with factory() as session:
+        assert session.scalar(text("SELECT count(*) FROM patients")) == 0
+
+
+@pytest.fixture
+def client(factory, monkeypatch):
+    handlers = importlib.import_module("app.handlers.patients")
+    monkeypatch.setattr(handlers, "SessionLocal", factory)
+    app = FastAPI()
+    app.include_router(handlers.router)
+    return TestClient(app)
+
+
+def test_import_endpoint(client, factory):
+    doctor = uuid.uuid4()
+    with unit_of_work(factory) as session:
+        session.execute(text("INSERT INTO users VALUES (:id, 'doctor')"), {"id": doctor.hex})
+
+    response = client.post("/patients/import", params={"doctor_id": str(doctor)}, content=CSV.encode())
+    assert response.status_code == 200
+    assert response.json()["imported"] == 3 and response.json()["linked"] == 3
+
+    response = client.post("/patients/import", params={"doctor_id": str(uuid.uuid4())}, content=CSV.encode())
+    assert (response.status_code, response.json()["detail"]) == (404, "Doctor not found")
+    response = client.post("/patients/import", content=CSV.lstrip("\ufeff").encode("cp1251"))
+    assert response.status_code == 400 and "UTF-8" in response.json()["detail"]
+    assert client.post("/patients/import", params={"format": "xml"}, content=b"").status_code == 400
+
+
+def test_copy_value_escapes_text_format():
+    assert _copy_value(None) == r"\N"
+    assert _copy_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
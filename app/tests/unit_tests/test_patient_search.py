@@ -0,0 +1,112 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.repositories.user_repository import ROSTER_SCAN_LIMIT, UserRepository, normalize_name
+
+DOCTOR = uuid.uuid4()
+
+
+@pytest.fixture
+def session(tmp_path, create_patients_table):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+
+    @event.listens_for(engine, "connect")
+    def _functions(dbapi_conn, _):
+        # lower() в SQLite не знает кириллицы, translate нет вовсе
+        dbapi_conn.create_function("lower", 1, lambda s: s.lower() if s is not None else None)
+        dbapi_conn.create_function(
+            "translate", 3, lambda s, a, b: s.translate(str.maketrans(a, b)) if s is not None else None)
+
+    with engine.begin() as conn:
+        create_patients_table(conn)
+        conn.execute(text(
+            "CREATE TABLE patient_user_links (user_id CHAR(32), patient_id BIGINT, added_at DATETIME, "
+            "status TEXT, PRIMARY KEY (user_id, patient_id))"
+        ))
+        conn.execute(text("INSERT INTO patients (id, full_name, birth_date, sex) VALUES "
+                          "(1, 'Ёлкина Анна', '1990-05-20', 'female'), "
+                          "(2, 'Елисеев Пётр', '1985-01-01', 'male'), "
+                          "(3, 'Ельцова Мария', '1990-11-02', 'female'), "
+                          "(4, 'Елагин Олег', '1990-03-03', 'male'), "
+                          "(5, 'Иванов Иван', '2001-12-31', 'male')"))
+        conn.execute(text("INSERT INTO patient_user_links VALUES (:d, 1, NULL, 'active'), (:d, 2, NULL, 'active'), "
+                          "(:d, 3, NULL, 'active'), (:d, 4, NULL, 'inactive'), (:d, 5, NULL, 'active')"),
+                     {"d": DOCTOR.hex})
+    with sessionmaker(bind=engine)() as s:
+        yield s
+
+
+def _search(session, **filters):
+    return [p.id for p in UserRepository(session).search_patients(DOCTOR, filters)]
+
+
+def test_normalize_name():
+    assert normalize_name("  ЁЛКИНА \t анна ") == "елкина анна"
+
+
+def test_short_query_is_a_prefix_match_among_active_patients(session):
+    # «Ё» и «е» равны, регистр не важен, порядок — по нормализованному ФИО;
+    # неактивная связь (4) не видна
+    assert _search(session, full_name="ЁЛ") == [2, 1, 3]
+    assert _search(session, full_name="ел", limit=2) == [2, 1]
+    assert _search(session, full_name="%") == []
+
+
+def test_filters_without_name(session):
+    assert _search(session, birth_year_from=1990, birth_year_to=1990) == [1, 3]
+    assert _search(session, birth_date=datetime.date(1985, 1, 1)) == [2]
+    assert _search(session) == [1, 2, 3, 5]
+
+
+class RecordingConnection:
+    def __init__(self, roster):
+        self.roster = roster
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return self
+
+    def scalar_one(self):
+        return self.roster
+
+    def all(self):
+        return []
+
+
+class RecordingSession:
+    def __init__(self, roster=ROSTER_SCAN_LIMIT + 1):
+        self.roster = roster
+        self.info = {}
+        self.connections = []
+
+    def connection(self):
+        self.connections.append(RecordingConnection(self.roster))
+        return self.connections[-1]
+
+
+def test_long_query_sets_threshold_on_the_search_connection():
+    session = RecordingSession()
+    UserRepository(session).search_patients(DOCTOR, {"full_name": "Ёлкина Анна А"})
+
+    [conn] = session.connections
+    roster, set_config, search = conn.statements
+    assert "patient_user_links" in roster and "LIMIT" in roster
+    assert "set_config" in set_config
+    # «а» короче трёх букв — отдельного условия нет, но ранжирует весь запрос
+    assert search.count("<%") == 2 and search.count("word_similarity(") == 1
+
+
+def test_small_roster_is_scanned_without_the_index_operator():
+    session = RecordingSession(roster=ROSTER_SCAN_LIMIT)
+    UserRepository(session).search_patients(DOCTOR, {"full_name": "Ёлкина Анна"})
+
+    [conn] = session.connections
+    _, search = conn.statements
+    assert "<%" not in search and search.count("word_similarity(") == 3
+    assert search.startswith("WITH roster AS MATERIALIZED")
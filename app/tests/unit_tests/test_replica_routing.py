@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app.domain.models.pagination import PageParams
+from app.domain.models.questionnaire import QuestionnaireCreate
+from app.infrastructure.db.models import Base, Questionnaires
+from app.infrastructure.db.routing import RoutingSession, RoutingState, routing_state
+from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
+
+
+def _engine(name):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Questionnaires.__table__])
+    with engine.begin() as conn:
+        conn.execute(Questionnaires.__table__.insert(), {"id": 1, "name": name, "type": "nutrition"})
+    return engine
+
+
+@pytest.fixture
+def session():
+    with RoutingSession(bind=_engine("primary"), replicas=[_engine("replica")]) as s:
+        yield s
+
+
+def _names(session):
+    return [q["name"] for q in QuestionnaireRepository(session).list_questionnaires(PageParams()).items]
+
+
+def test_read_only_methods_go_to_replica(session):
+    assert _names(session) == ["replica"]
+    assert session.get(Questionnaires, 1).name == "primary"
+
+
+def test_sticky_client_reads_primary(session):
+    token = routing_state.set(RoutingState(sticky=True))
+    try:
+        assert _names(session) == ["primary"]
+    finally:
+        routing_state.reset(token)
+
+
+def test_write_in_request_switches_reads_to_primary(session):
+    state = RoutingState()
+    token = routing_state.set(state)
+    try:
+        QuestionnaireRepository(session).create_questionnaire(QuestionnaireCreate(name="new", type="nutrition"))
+        assert state.wrote
+        assert _names(session) == ["primary", "new"]
+    finally:
+        routing_state.reset(token)
+
+
+def test_replica_is_pinned_until_transaction_end():
+    with RoutingSession(bind=_engine("primary"), replicas=[_engine("a"), _engine("b")]) as session:
+        # COUNT и страница paginate — два запроса, оба на одной реплике
+        assert _names(session) == ["a"]
+        assert _names(session) == ["a"]
+        session.commit()
+        assert _names(session) == ["b"]
+        session.rollback()
+        assert _names(session) == ["a"]
@@ -0,0 +1,51 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import tasks
+from app.celery_app import celery
+from app.infrastructure.db.models import Anthropometries
+from app.services import metrics_backfill
+
+
+@pytest.fixture
+def upserts(tmp_path, monkeypatch, create_patients_table):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    with engine.begin() as conn:
+        create_patients_table(conn)
+        conn.execute(text("INSERT INTO patients (id, birth_date, sex) VALUES (1, '1990-05-20', 'male')"))
+    Anthropometries.__table__.create(engine)
+    monkeypatch.setattr(tasks, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setitem(celery.conf, "task_always_eager", True)
+    # eager-группе нужен бэкенд результатов — встроенный in-memory вместо redis
+    monkeypatch.setattr(celery, "backend_cls", "cache+memory://")
+    calls = []
+    # upsert body_metrics — ON CONFLICT ON CONSTRAINT, только для Postgres
+    monkeypatch.setattr(metrics_backfill, "upsert_body_metrics",
+                        lambda session, ids, metrics: calls.append((list(ids), list(metrics["bmi"]))) or len(ids))
+    return engine, calls
+
+
+def test_enqueue_splits_ids_and_task_recomputes_them(upserts):
+    engine, calls = upserts
+    ids = [uuid.UUID(int=n) for n in range(1, 6)]
+    with engine.begin() as conn:
+        conn.execute(Anthropometries.__table__.insert(), [
+            {"id": i, "patient_id": 1, "height_cm": 170.0 + n, "weight_kg": 70.0,
+             "measured_at": datetime.datetime(2025, 5, 14)} for n, i in enumerate(ids)
+        ])
+
+    assert tasks.enqueue_body_metrics_recalc(ids, chunk_size=2) == 3
+    assert [sorted(chunk) for chunk, _ in calls] == [ids[0:2], ids[2:4], ids[4:5]]
+    bmi = {i: value for chunk, values in calls for i, value in zip(chunk, values)}
+    assert bmi[ids[0]] > bmi[ids[4]]  # рост больше — BMI меньше
+    assert tasks.enqueue_body_metrics_recalc([], chunk_size=2) == 0
+
+
+def test_task_skips_unknown_ids(upserts):
+    _, calls = upserts
+    assert tasks.recalc_body_metrics([str(uuid.uuid4())]) == 0
+    assert calls == []
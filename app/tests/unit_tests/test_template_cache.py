@@ -0,0 +1,106 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.models.questionnaire import QuestionUpdate
+from app.infrastructure.db.models import Base, Questionnaires, QuestionnaireQuestions
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.infrastructure.repositories import questionnaire_repository
+from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
+from app.services.question_meta import QuestionMetaCache
+from app.services.template_cache import TemplateCache
+
+
+class SharedVersion:
+    """Общий счётчик версий (в проде — последовательность PostgreSQL)."""
+
+    def __init__(self):
+        self.value = 1
+
+    def read(self, session):
+        return self.value
+
+    def bump(self, engine):
+        self.value += 1
+
+
+@pytest.fixture
+def env(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Questionnaires.__table__, QuestionnaireQuestions.__table__])
+    with engine.begin() as conn:
+        conn.execute(Questionnaires.__table__.insert(), {"id": 1, "name": "pa", "type": "physical_activity",
+                                                         "updated_at": datetime.datetime(2025, 1, 1)})
+        conn.execute(QuestionnaireQuestions.__table__.insert(), [
+            {"id": 11, "questionnaire_id": 1, "question_text": "b", "question_order": 2},
+            {"id": 10, "questionnaire_id": 1, "question_text": "a", "question_order": 1},
+        ])
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    version = SharedVersion()
+    worker_a = TemplateCache(check_interval=0, read_version=version.read, bump_version=version.bump)
+    worker_b = TemplateCache(check_interval=0, read_version=version.read, bump_version=version.bump)
+    monkeypatch.setattr(questionnaire_repository, "template_cache", worker_a)
+    return sessionmaker(bind=engine), statements, worker_b
+
+
+def test_template_reads_are_served_from_memory(env):
+    factory, statements, _ = env
+    with factory() as session:
+        repo = QuestionnaireRepository(session)
+        assert [q["question_text"] for q in repo.list_questions(1)] == ["a", "b"]
+        loaded = len(statements)
+        assert repo.get_questionnaire(1)["name"] == "pa"
+        assert [q.id for q in repo.get_questions(1)] == [10, 11]
+        assert len(statements) == loaded
+
+
+def _first_question(factory, cache, monkeypatch):
+    monkeypatch.setattr(questionnaire_repository, "template_cache", cache)
+    with factory() as session:
+        return QuestionnaireRepository(session).list_questions(1)[0]["question_text"]
+
+
+def test_change_is_seen_by_other_workers_after_commit(env, monkeypatch):
+    factory, _, worker_b = env
+    worker_a = questionnaire_repository.template_cache
+    assert _first_question(factory, worker_a, monkeypatch) == "a"
+    assert _first_question(factory, worker_b, monkeypatch) == "a"  # кэши обоих воркеров прогреты
+
+    monkeypatch.setattr(questionnaire_repository, "template_cache", worker_a)
+    with pytest.raises(RuntimeError):
+        with unit_of_work(factory) as session:
+            QuestionnaireRepository(session).update_question(10, QuestionUpdate(question_text="changed"))
+            raise RuntimeError
+    assert _first_question(factory, worker_b, monkeypatch) == "a"
+
+    monkeypatch.setattr(questionnaire_repository, "template_cache", worker_a)
+    with unit_of_work(factory) as session:
+        QuestionnaireRepository(session).update_question(10, QuestionUpdate(question_text="changed"))
+    assert _first_question(factory, worker_b, monkeypatch) == "changed"
+    assert _first_question(factory, worker_a, monkeypatch) == "changed"
+
+
+def test_question_change_moves_questionnaire_version(env):
+    factory, _, _ = env
+    with factory() as session:
+        before = QuestionnaireRepository(session).get_questionnaire_version(1)
+    with unit_of_work(factory) as session:
+        QuestionnaireRepository(session).update_question(11, QuestionUpdate(question_text="c"))
+    with factory() as session:
+        assert QuestionnaireRepository(session).get_questionnaire_version(1) != before
+
+
+def test_question_meta_of_other_workers_follows_shared_version(env):
+    factory, _, worker_b = env
+    meta_b = QuestionMetaCache(worker_b)
+    with factory() as session:
+        assert meta_b.get(session, 10).question_order == 1
+    with unit_of_work(factory) as session:  # правка в воркере A
+        QuestionnaireRepository(session).update_question(10, QuestionUpdate(
+            question_text="Сколько времени в день вы обычно проводите сидя", question_order=5))
+    with factory() as session:
+        meta = meta_b.get(session, 10)
+    assert (meta.question_order, meta.sedentary) == (5, True)
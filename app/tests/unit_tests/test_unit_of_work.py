@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config.settings import PoolSettings
+from app.domain.models.questionnaire import QuestionCreate, QuestionnaireCreate, QuestionUpdate
+from app.infrastructure.db.models import Base, Questionnaires, QuestionnaireQuestions
+from app.infrastructure.db.pool import engine_options, instrument, pool_stats
+from app.infrastructure.db.unit_of_work import unit_of_work
+from app.infrastructure.repositories.questionnaire_repository import QuestionnaireRepository
+
+
+@pytest.fixture
+def factory(tmp_path):
+    settings = PoolSettings(DB_POOL_LIVENESS="none")
+    engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}", **engine_options(settings))
+    instrument(engine, settings)
+    Base.metadata.create_all(engine, tables=[Questionnaires.__table__, QuestionnaireQuestions.__table__])
+    return sessionmaker(bind=engine)
+
+
+def _create_with_question(repo):
+    qid = repo.create_questionnaire(QuestionnaireCreate(name="pa", type="physical_activity"))
+    return repo.create_question(QuestionCreate(questionnaire_id=qid, question_text="Сколько минут", question_order=1))
+
+
+def test_composite_operation_commits_once(factory):
+    commits = pool_stats(factory.kw["bind"])["commits"]
+    with unit_of_work(factory) as session:
+        _create_with_question(QuestionnaireRepository(session))
+    assert pool_stats(factory.kw["bind"])["commits"] == commits + 1
+
+
+def test_exception_rolls_back_everything(factory):
+    with pytest.raises(RuntimeError):
+        with unit_of_work(factory) as session:
+            _create_with_question(QuestionnaireRepository(session))
+            raise RuntimeError
+    with factory() as session:
+        assert session.scalar(select(func.count()).select_from(Questionnaires)) == 0
+
+
+def test_cache_is_invalidated_only_after_commit(factory, monkeypatch):
+    from app.services import question_meta
+    invalidated = []
+    monkeypatch.setattr(question_meta.question_meta_cache, "invalidate", lambda *ids: invalidated.append(ids))
+    with unit_of_work(factory) as session:
+        question_id = _create_with_question(QuestionnaireRepository(session))
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(factory) as session:
+            QuestionnaireRepository(session).update_question(question_id, QuestionUpdate(question_text="x"))
+            raise RuntimeError
+    assert invalidated == []
+
+    with unit_of_work(factory) as session:
+        QuestionnaireRepository(session).update_question(question_id, QuestionUpdate(question_text="x"))
+        assert invalidated == []
+    assert invalidated == [(question_id,)]
@@ -1,7 +1,8 @@
-from typing import List
 from uuid import UUID
 
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.profile_change_request import ProfileChangeRequestRead
+from app.domain.models.users import BroadcastResult, NotificationBroadcast
 from app.domain.repositories.admin_repository_interface import IAdminRepository
 
 
@@ -9,9 +10,10 @@ class AdminService:
     def __init__(self, repo: IAdminRepository):
         self.repo = repo
 
-    def list_requests(self) -> List[ProfileChangeRequestRead]:
-        raw = self.repo.list_requests()
-        return [ProfileChangeRequestRead(**r.__dict__) for r in raw]
+    def list_requests(self, page: PageParams) -> Page[ProfileChangeRequestRead]:
+        result = self.repo.list_requests(page)
+        result.items = [ProfileChangeRequestRead(**r.__dict__) for r in result.items]
+        return result
 
     def approve(self, request_id: UUID, admin_id: UUID) -> None:
         req = self.repo.update_request_status(request_id, 'approved', admin_id)
@@ -22,3 +24,9 @@ class AdminService:
         req = self.repo.update_request_status(request_id, 'rejected', admin_id)
         msg = f"Ваша заявка {request_id} отклонена администратором"
         self.repo.create_notification(req.user_id, msg)
+
+    def broadcast(self, data: NotificationBroadcast) -> BroadcastResult:
+        if not data.recipients.model_dump(exclude_none=True):
+            # пустая выборка означала бы рассылку всем — это должно быть явным (role)
+            raise ValueError("Recipients selector is empty")
+        return BroadcastResult(sent=self.repo.broadcast_notification(data.recipients, data.message))
@@ -1,6 +1,6 @@
-from typing import Optional
-from app.domain.repositories.body_metrics_repository_interface import IBodyMetricsRepository
-from app.domain.models.anthropometry import AnthropometryCreate, AnthropometryRead
+from typing import Optional, List
+from app.domain.repositories.body_metrics_repository_interface import IAsyncBodyMetricsRepository, IBodyMetricsRepository
+from app.domain.models.anthropometry import AnthropometryCreate, AnthropometryRead, LatestMetricsRead
 
 class BodyMetricsService:
     def __init__(self, repo: IBodyMetricsRepository):
@@ -11,4 +11,19 @@ class BodyMetricsService:
 
     def get_latest(self, patient_id: int) -> Optional[AnthropometryRead]:
         raw = self.repo.get_latest_metrics(patient_id)
-        return AnthropometryRead(**raw) if raw else None
\ No newline at end of file
+        return AnthropometryRead(**raw) if raw else None
+
+    def get_latest_many(self, patient_ids: List[int]) -> List[LatestMetricsRead]:
+        return [LatestMetricsRead(**r) for r in self.repo.get_latest_metrics_many(patient_ids)]
+
+
+class AsyncBodyMetricsService:
+    def __init__(self, repo: IAsyncBodyMetricsRepository):
+        self.repo = repo
+
+    async def get_latest(self, patient_id: int) -> Optional[AnthropometryRead]:
+        raw = await self.repo.get_latest_metrics(patient_id)
+        return AnthropometryRead(**raw) if raw else None
+
+    async def get_latest_many(self, patient_ids: List[int]) -> List[LatestMetricsRead]:
+        return [LatestMetricsRead(**r) for r in await self.repo.get_latest_metrics_many(patient_ids)]
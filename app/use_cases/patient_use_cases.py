@@ -1,4 +1,8 @@
-from app.domain.repositories.patient_repository_interface import AbstractPatientRepository
+import datetime
+from typing import Optional, Tuple
+
+from app.domain.repositories.patient_repository_interface import AbstractAsyncPatientRepository, AbstractPatientRepository
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.patient import PatientCreate, PatientRead
 
 class PatientService:
@@ -15,5 +19,31 @@ class PatientService:
             raise ValueError("Patient not found")
         return patient
 
-    def list_patients(self):
-        return self.repo.list_all()
\ No newline at end of file
+    def get_versioned_patient(self, patient_id: int) -> Tuple[PatientRead, Optional[datetime.datetime]]:
+        versioned = self.repo.get_versioned(patient_id)
+        if not versioned:
+            raise ValueError("Patient not found")
+        return versioned
+
+    def list_patients(self, page: PageParams) -> Page[PatientRead]:
+        return self.repo.list_all(page)
+
+
+class AsyncPatientService:
+    def __init__(self, repo: AbstractAsyncPatientRepository):
+        self.repo = repo
+
+    async def get_patient(self, patient_id: int) -> PatientRead:
+        patient = await self.repo.get_by_id(patient_id)
+        if not patient:
+            raise ValueError("Patient not found")
+        return patient
+
+    async def get_versioned_patient(self, patient_id: int) -> Tuple[PatientRead, Optional[datetime.datetime]]:
+        versioned = await self.repo.get_versioned(patient_id)
+        if not versioned:
+            raise ValueError("Patient not found")
+        return versioned
+
+    async def list_patients(self, page: PageParams) -> Page[PatientRead]:
+        return await self.repo.list_all(page)
@@ -1,14 +1,16 @@
+import datetime
 import uuid
-from typing import List
+from typing import List, Optional
 
 from sqlalchemy.exc import NoResultFound
 
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.questionnaire import (
     QuestionnaireCreate, QuestionnaireRead, QuestionnaireUpdate,
     QuestionCreate, QuestionRead, QuestionUpdate,
     SubmissionCreate, SubmissionRead,
     AnswerCreate, )
-from app.domain.repositories.questionnaire_repository_interface import IQuestionnaireRepository
+from app.domain.repositories.questionnaire_repository_interface import IAsyncQuestionnaireRepository, IQuestionnaireRepository
 
 VALID_TYPES = {"nutrition", "physical_activity"}
 
@@ -18,11 +20,19 @@ class QuestionnaireService:
         self.repo = repo
 
     # ——— Шаблоны опросников ———
-    def list_questionnaires(self) -> List[QuestionnaireRead]:
-        return [QuestionnaireRead(**q) for q in self.repo.list_questionnaires()]
+    def list_questionnaires(self, page: PageParams) -> Page[QuestionnaireRead]:
+        result = self.repo.list_questionnaires(page)
+        result.items = [QuestionnaireRead(**q) for q in result.items]
+        return result
 
     def get_questionnaire(self, questionnaire_id: int) -> QuestionnaireRead:
-        return QuestionnaireRead(**self.repo.get_questionnaire(questionnaire_id))
+        q = self.repo.get_questionnaire(questionnaire_id)
+        if not q:
+            raise ValueError("Questionnaire not found")
+        return QuestionnaireRead(**q)
+
+    def get_questionnaire_version(self, questionnaire_id: int) -> Optional[datetime.datetime]:
+        return self.repo.get_questionnaire_version(questionnaire_id)
 
     def create_questionnaire(self, data: QuestionnaireCreate) -> int:
         return self.repo.create_questionnaire(data)
@@ -59,8 +69,41 @@ class QuestionnaireService:
     def create_submission(self, patient_id: int, data: SubmissionCreate) -> uuid.UUID:
         return self.repo.create_submission(patient_id, data.questionnaire_type, data.responses)
 
-    def get_submissions(self, patient_id: int) -> List[SubmissionRead]:
-        return [SubmissionRead(**s) for s in self.repo.get_submissions_by_patient(patient_id)]
+    def get_submissions(self, patient_id: int, page: PageParams) -> Page[SubmissionRead]:
+        result = self.repo.get_submissions_by_patient(patient_id, page)
+        result.items = [SubmissionRead(**s) for s in result.items]
+        return result
 
     def add_answer(self, submission_id: uuid.UUID, data: AnswerCreate) -> int:
         return self.repo.add_answer(submission_id, data.question_id, data.dict(exclude_unset=True))
+
+    def add_answers(self, submission_id: uuid.UUID, data: List[AnswerCreate]) -> List[int]:
+        return self.repo.add_answers(submission_id, [a.dict(exclude_unset=True) for a in data])
+
+
+class AsyncQuestionnaireService:
+    """Read-часть QuestionnaireService поверх асинхронного репозитория."""
+    def __init__(self, repo: IAsyncQuestionnaireRepository):
+        self.repo = repo
+
+    async def list_questionnaires(self, page: PageParams) -> Page[QuestionnaireRead]:
+        result = await self.repo.list_questionnaires(page)
+        result.items = [QuestionnaireRead(**q) for q in result.items]
+        return result
+
+    async def get_questionnaire(self, questionnaire_id: int) -> QuestionnaireRead:
+        q = await self.repo.get_questionnaire(questionnaire_id)
+        if not q:
+            raise ValueError("Questionnaire not found")
+        return QuestionnaireRead(**q)
+
+    async def get_questionnaire_version(self, questionnaire_id: int) -> Optional[datetime.datetime]:
+        return await self.repo.get_questionnaire_version(questionnaire_id)
+
+    async def list_questions(self, questionnaire_id: int) -> List[QuestionRead]:
+        return [QuestionRead(**q) for q in await self.repo.list_questions(questionnaire_id)]
+
+    async def get_submissions(self, patient_id: int, page: PageParams) -> Page[SubmissionRead]:
+        result = await self.repo.get_submissions_by_patient(patient_id, page)
+        result.items = [SubmissionRead(**s) for s in result.items]
+        return result
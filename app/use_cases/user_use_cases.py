@@ -1,6 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.domain.repositories.user_repository_interface import IUserRepository
-from app.domain.models.users import UserUpdate, ProfileChangeRequestCreate, NotificationRead
+from app.domain.models.users import (
+    UserUpdate, ProfileChangeRequestCreate, NotificationRead, UnreadCount, NotificationsMarked
+)
+from app.domain.models.pagination import Page, PageParams
 from app.domain.models.patient import PatientRead
 
 
@@ -22,8 +25,8 @@ class UserService:
     def remove_patient(self, doctor_id: str, patient_id: int):
         self.repo.deactivate_patient_link(doctor_id, patient_id)
 
-    def list_patients(self, doctor_id: str) -> List[PatientRead]:
-        return self.repo.list_patients(doctor_id)
+    def list_patients(self, doctor_id: str, page: PageParams) -> Page[PatientRead]:
+        return self.repo.list_patients(doctor_id, page)
 
     def search_patients(self, doctor_id: str, filters: Dict[str, Any]):
         return self.repo.search_patients(doctor_id, filters)
@@ -31,6 +34,20 @@ class UserService:
     def stats(self, doctor_id: str, all_patients: bool=False) -> Dict[str, Any]:
         return self.repo.get_patient_stats(doctor_id, all_patients)
 
-    def get_notifications(self, user_id: str) -> list[NotificationRead]:
-        data = self.repo.list_notifications(user_id)
-        return [NotificationRead(**n) for n in data]
+    def get_notifications(self, user_id: str, page: PageParams) -> Page[NotificationRead]:
+        result = self.repo.list_notifications(user_id, page)
+        # в таблице флаг называется is_read, в ответе API — read
+        result.items = [NotificationRead(**n, read=n["is_read"]) for n in result.items]
+        return result
+
+    def get_unread_count(self, user_id: str) -> UnreadCount:
+        unread = self.repo.get_unread_count(user_id)
+        if unread is None:
+            raise ValueError("User not found")
+        return UnreadCount(unread=unread)
+
+    def mark_notifications_read(self, user_id: str, ids: Optional[List[int]] = None) -> NotificationsMarked:
+        marked, unread = self.repo.mark_notifications_read(user_id, ids)
+        if unread is None:
+            raise ValueError("User not found")
+        return NotificationsMarked(marked=marked, unread=unread)